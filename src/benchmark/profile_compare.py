@@ -0,0 +1,125 @@
+import os
+import sys
+import csv
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import yaml
+
+from src.constants.paths import ARTIFACTS_DIR, PROFILING_DIR
+
+DEFAULT_BASE_CONFIG = "configs/model_parameters.yaml"
+DEFAULT_OUTPUT_DIR = "artifacts/benchmarks"
+
+
+def run_profile(base_config: dict, profile: str, epochs: int | None, workdir: Path, timestamp: str) -> dict:
+    """
+    Runs the full pipeline (`python -m src.main`) with one performance
+    profile in a fresh process, since threading and precision policy are
+    process-wide, and collects step time and test accuracy.
+    """
+    config = json.loads(json.dumps(base_config))
+    config.setdefault("performance", {})["profile"] = profile
+    if epochs:
+        config["model_config"]["epochs"] = epochs
+
+    config_path = workdir / f"model_parameters_{profile}.yaml"
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+
+    run_id = f"profile_{profile}_{timestamp}"
+    env = {**os.environ, "MODEL_PARAMS_FILE": str(config_path), "RUN_ID": run_id}
+
+    print(f"Training with profile '{profile}' (RUN_ID={run_id})...", flush=True)
+    # a cached training stage would leave no epoch timings to compare
+    subprocess.run([sys.executable, "-m", "src.main", "--no-cache"], env=env, check=True)
+
+    profiling_dir = Path(config.get("profiling", {}).get("output_dir", PROFILING_DIR))
+    with open(profiling_dir / f"profile_{run_id}.json", "r") as f:
+        profile_data = json.load(f)
+
+    # first epoch includes tracing / XLA compilation
+    epochs_data = profile_data["epochs"][1:] or profile_data["epochs"]
+    steps = sum(e["steps"] for e in epochs_data)
+    compute = sum(e["compute_s"] for e in epochs_data)
+
+    # steps must be train steps, not `tf.function` executions
+    expected = (
+        config["performance"].get("profiles", {}).get(profile, {}).get("steps_per_execution", 1)
+    )
+    recorded = {e.get("steps_per_execution", 1) for e in epochs_data}
+    if recorded != {expected}:
+        raise RuntimeError(
+            f"Profile '{profile}' ran with steps_per_execution {sorted(recorded)}, "
+            f"expected {expected}"
+        )
+
+    return {
+        "run_id": run_id,
+        "steps_per_execution": expected,
+        "step_ms": compute / steps * 1000 if steps else None,
+        "accuracy": read_accuracy(Path(ARTIFACTS_DIR) / "evaluation" / f"classification_report_{run_id}.csv"),
+    }
+
+
+def read_accuracy(report_path: Path) -> float:
+    with open(report_path, newline="") as f:
+        for row in csv.reader(f):
+            if row and row[0] == "accuracy":
+                return float(row[1])
+    raise ValueError(f"No accuracy row in {report_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.benchmark.profile_compare",
+        description="Train with each performance profile and report step-time speedup and accuracy delta."
+    )
+    parser.add_argument("--config", default=DEFAULT_BASE_CONFIG)
+    parser.add_argument("--profiles", nargs="+", help="default: every profile in the config")
+    parser.add_argument("--baseline-profile", default="default")
+    parser.add_argument("--epochs", type=int, help="override model_config.epochs")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r") as f:
+        base_config = yaml.safe_load(f)
+
+    profiles = args.profiles or list(base_config.get("performance", {}).get("profiles", {}))
+    if args.baseline_profile not in profiles:
+        profiles.insert(0, args.baseline_profile)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    with tempfile.TemporaryDirectory(prefix="profiles_") as tmp:
+        results = {
+            name: run_profile(base_config, name, args.epochs, Path(tmp), timestamp)
+            for name in profiles
+        }
+
+    baseline = results[args.baseline_profile]
+    for name, r in results.items():
+        r["speedup"] = (
+            baseline["step_ms"] / r["step_ms"]
+            if r["step_ms"] and baseline["step_ms"] else None
+        )
+        r["accuracy_delta"] = r["accuracy"] - baseline["accuracy"]
+
+    output = args.output or Path(DEFAULT_OUTPUT_DIR) / f"profiles_{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"baseline": args.baseline_profile, "profiles": results}, f, indent=2)
+
+    print(f"\n{'profile':<20}{'step ms':>10}{'speedup':>10}{'accuracy':>10}{'delta':>10}")
+    for name, r in results.items():
+        step = f"{r['step_ms']:.1f}" if r["step_ms"] else "n/a"
+        speedup = f"{r['speedup']:.2f}x" if r["speedup"] else "n/a"
+        print(f"{name:<20}{step:>10}{speedup:>10}{r['accuracy']:>10.4f}{r['accuracy_delta']:>+10.4f}")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
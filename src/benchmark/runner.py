@@ -0,0 +1,546 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import yaml
+import numpy as np
+
+from src.benchmark.synthetic_data import generate_dataset
+
+# the benchmark points MODEL_PARAMS_FILE at a generated config, so no
+# module reading src.constants may be imported before `prepare_workspace`
+DEFAULT_BASE_CONFIG = "configs/model_parameters.yaml"
+DEFAULT_OUTPUT_DIR = "artifacts/benchmarks"
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> dict:
+    return {
+        "value": float(value),
+        "unit": unit,
+        "higher_is_better": higher_is_better
+    }
+
+
+def prepare_workspace(
+    workspace: Path,
+    base_config: str,
+    num_classes: int,
+    images_per_class: int,
+    source_size: tuple[int, int] | None
+) -> Path:
+    """
+    Generates a synthetic dataset and a config pointing at it.
+
+    Everything else (batch size, augmentation, caching, model settings)
+    is taken from `base_config`, so config changes show up in the results.
+    VGG16 is built without pretrained weights so no download is needed.
+    """
+    with open(base_config, "r") as f:
+        config = yaml.safe_load(f)
+
+    data_cfg = config["data_config"]
+    class_names = [f"class_{i}" for i in range(num_classes)]
+    image_size = tuple(source_size or data_cfg["IMG_SIZE"])
+
+    generate_dataset(workspace / "Training", class_names, images_per_class, image_size, seed=1)
+    generate_dataset(workspace / "Testing", class_names, max(1, images_per_class // 4), image_size, seed=2)
+
+    data_cfg["TRAIN_DIR"] = str(workspace / "Training")
+    data_cfg["TEST_DIR"] = str(workspace / "Testing")
+    if "materialization" in data_cfg:
+        data_cfg["materialization"]["output_dir"] = str(workspace / "processed")
+
+    tl_cfg = config.setdefault("transfer_learning", {})
+    tl_cfg["weights"] = None
+    if "feature_cache" in tl_cfg:
+        tl_cfg["feature_cache"]["cache_dir"] = str(workspace / "feature_cache")
+
+    cache_cfg = config.get("preprocessing", {}).get("cache")
+    if cache_cfg:
+        cache_cfg["cache_dir"] = str(workspace / "tf_cache")
+
+    config_path = workspace / "model_parameters.yaml"
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+
+    return config_path
+
+
+def bench_data(ctx: dict) -> dict:
+    """
+    Images/sec of DataIngestion + DataPreprocessing, first (cold) and
+    second (warm) pass over the training set.
+    """
+    from src.data.data_ingestion import DataIngestion
+    from src.data.data_preprocessing import DataPreprocessing
+
+    train_ds, test_ds, _, _ = DataIngestion().load()
+    train_ds, _ = DataPreprocessing().process(train_ds, test_ds)
+
+    results = {}
+    for phase in ("cold", "warm"):
+        start = time.perf_counter()
+        count = sum(int(images.shape[0]) for images, _ in train_ds)
+        elapsed = time.perf_counter() - start
+        results[f"data.{phase}_images_per_sec"] = metric(count / elapsed, "img/s", True)
+
+    ctx["train_ds"] = train_ds
+    return results
+
+
+def bench_decode(ctx: dict) -> dict:
+    """
+    Full decode + resize against scaled JPEG decoding, on synthetic
+    images of `--decode-source-size`: images/sec, decoded pixels per image
+    (peak decode memory) and the mean difference of the outputs.
+    """
+    from src.data.image_decoding import compare_decoders
+
+    args = ctx["args"]
+    img_size = ctx["config"]["data_config"]["IMG_SIZE"]
+
+    source_dir = ctx["workspace"] / "decode"
+    generate_dataset(
+        source_dir, ["images"], args.decode_images, tuple(args.decode_source_size), seed=3
+    )
+    paths = sorted(str(p) for p in source_dir.rglob("*.jpg"))
+
+    report = compare_decoders(paths, img_size)
+    if not report["within_tolerance"]:
+        print(
+            f"WARNING: scaled decoding differs from full decoding by "
+            f"{report['mean_abs_diff']:.2f} / 255 on average"
+        )
+
+    full, scaled = report["full"], report["scaled_jpeg"]
+    return {
+        "decode.full_images_per_sec": metric(full["images_per_sec"], "img/s", True),
+        "decode.scaled_images_per_sec": metric(scaled["images_per_sec"], "img/s", True),
+        "decode.speedup": metric(scaled["images_per_sec"] / full["images_per_sec"], "x", True),
+        "decode.memory_ratio": metric(
+            scaled["decoded_pixels_per_image"] / full["decoded_pixels_per_image"], "ratio", False
+        ),
+        "decode.mean_abs_diff": metric(report["mean_abs_diff"], "px", False),
+    }
+
+
+def bench_augmentation(ctx: dict) -> dict:
+    """
+    Images/sec of the fused augmentation against the Keras
+    RandomFlip -> RandomRotation -> RandomZoom chain it replaces, and how
+    far their output statistics (pixel mean / std, mean change per pixel)
+    are apart, relative to the chain.
+    """
+    import tensorflow as tf
+    from tensorflow.keras import layers
+    from src.data.augmentation import FusedAugmentation
+
+    args = ctx["args"]
+    aug_cfg = ctx["config"].get("augmentation", {})
+    img_size = ctx["config"]["data_config"]["IMG_SIZE"]
+
+    def load(path):
+        img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        return tf.image.resize(img, img_size) / 255.0
+
+    paths = sorted(str(p) for p in (ctx["workspace"] / "Training").rglob("*.jpg"))
+    batch = tf.stack([load(p) for p in paths[:args.inference_batch_size]])
+
+    chain = tf.keras.Sequential([
+        layers.RandomFlip("horizontal"),
+        layers.RandomRotation(aug_cfg.get("rotation", 0.1)),
+        layers.RandomZoom(aug_cfg.get("zoom", 0.1))
+    ])
+    fused = FusedAugmentation.from_config({**aug_cfg, "horizontal_flip": True})
+
+    results, stats = {}, {}
+    for name, augment in (("keras_chain", chain), ("fused", fused)):
+        step = tf.function(lambda x: augment(x, training=True))
+        step(batch)
+
+        timings, outputs = [], []
+        for _ in range(max(1, args.repeats // 4)):
+            start = time.perf_counter()
+            out = step(batch).numpy()
+            timings.append(time.perf_counter() - start)
+            outputs.append(out)
+
+        outputs = np.stack(outputs)
+        stats[name] = {
+            "mean": float(outputs.mean()),
+            "std": float(outputs.std()),
+            "change": float(np.abs(outputs - batch.numpy()[None]).mean()),
+        }
+        results[f"augmentation.{name}_images_per_sec"] = metric(
+            len(batch) / float(np.median(timings)), "img/s", True
+        )
+
+    results["augmentation.speedup"] = metric(
+        results["augmentation.fused_images_per_sec"]["value"]
+        / results["augmentation.keras_chain_images_per_sec"]["value"],
+        "x", True
+    )
+    for key in ("mean", "std", "change"):
+        reference = stats["keras_chain"][key]
+        delta = abs(stats["fused"][key] - reference) / reference if reference else 0.0
+        results[f"augmentation.{key}_delta"] = metric(delta, "ratio", False)
+        if delta > 0.05:
+            print(
+                f"WARNING: fused augmentation {key} differs from the Keras chain "
+                f"by {delta:.1%} ({stats['fused'][key]:.4f} vs {reference:.4f})"
+            )
+
+    return results
+
+
+def bench_train(ctx: dict) -> dict:
+    """
+    Median train step time for SimpleCNN and VGG16Model on one batch.
+    """
+    import tensorflow as tf
+    from src.models.simple_cnn import SimpleCNN
+    from src.models.vgg16_model import VGG16Model
+    from src.constants.training import DEFAULT_INPUT_SHAPE
+
+    images, labels = next(iter(ctx["train_ds"]))
+    model_cfg = ctx["config"]["model_config"]
+    steps = ctx["args"].steps
+
+    results = {}
+    for name, model_cls in (("simple_cnn", SimpleCNN), ("vgg16", VGG16Model)):
+        model = model_cls()
+        model.build(input_shape=DEFAULT_INPUT_SHAPE, num_classes=ctx["num_classes"])
+        model.compile(
+            optimizer=model_cfg["optimizer"],
+            loss=model_cfg["loss"],
+            metrics=model_cfg["metrics"]
+        )
+
+        for _ in range(2):
+            model.model.train_on_batch(images, labels)
+
+        timings = []
+        for _ in range(steps):
+            start = time.perf_counter()
+            model.model.train_on_batch(images, labels)
+            timings.append(time.perf_counter() - start)
+
+        step_s = float(np.median(timings))
+        results[f"train.{name}.step_ms"] = metric(step_s * 1000, "ms", False)
+        results[f"train.{name}.images_per_sec"] = metric(len(images) / step_s, "img/s", True)
+
+        tf.keras.backend.clear_session()
+
+    return results
+
+
+def bench_inference(ctx: dict) -> dict:
+    """
+    ModelInference latency: one `predict` call per image versus
+    `predict_batch` over a preloaded batch.
+    """
+    from src.inference.predictor import ModelInference, load_inference_model
+    from src.entity.model_trainer_entity import ModelTrainerArtifact
+    from src.models.simple_cnn import SimpleCNN
+    from src.models.vgg16_model import VGG16Model
+    from src.constants.training import DEFAULT_INPUT_SHAPE
+
+    args = ctx["args"]
+    model_cls = VGG16Model if ctx["config"].get("model_type") == "vgg16" else SimpleCNN
+    model = model_cls()
+    model.build(input_shape=DEFAULT_INPUT_SHAPE, num_classes=ctx["num_classes"])
+
+    model_path = ctx["workspace"] / "model.keras"
+    model.save(str(model_path))
+
+    artifact = ModelTrainerArtifact(
+        model=load_inference_model(model_path),
+        history=None,
+        model_path=str(model_path)
+    )
+    class_names = ctx["class_names"]
+    inference = ModelInference()
+
+    image_paths = sorted((ctx["workspace"] / "Testing").rglob("*.jpg"))
+    repeats = args.repeats
+
+    inference.predict(artifact, class_names, image_paths[0])
+    timings = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        inference.predict(artifact, class_names, image_paths[i % len(image_paths)])
+        timings.append(time.perf_counter() - start)
+    single_s = float(np.median(timings))
+
+    batch = np.stack([
+        inference.load_image(image_paths[i % len(image_paths)])
+        for i in range(args.inference_batch_size)
+    ])
+    inference.predict_batch(artifact, class_names, batch)
+    timings = []
+    for _ in range(max(1, repeats // 4)):
+        start = time.perf_counter()
+        inference.predict_batch(artifact, class_names, batch)
+        timings.append(time.perf_counter() - start)
+    batch_s = float(np.median(timings))
+
+    return {
+        "inference.single_latency_ms": metric(single_s * 1000, "ms", False),
+        "inference.batched_latency_per_image_ms": metric(batch_s * 1000 / len(batch), "ms", False),
+        "inference.batched_images_per_sec": metric(len(batch) / batch_s, "img/s", True),
+    }
+
+
+def bench_tta(ctx: dict) -> dict:
+    """
+    Batched test-time augmentation: throughput per view count, and its
+    cost relative to plain batched inference (1.0 = free, `views` = as
+    slow as scoring every view separately).
+    """
+    from src.inference.predictor import make_predict_fn
+    from src.inference.tta import TestTimeAugmentation
+    from src.models.simple_cnn import SimpleCNN
+    from src.models.vgg16_model import VGG16Model
+    from src.constants.training import DEFAULT_INPUT_SHAPE
+
+    args = ctx["args"]
+    aug_cfg = ctx["config"].get("augmentation", {})
+    model_cls = VGG16Model if ctx["config"].get("model_type") == "vgg16" else SimpleCNN
+    model = model_cls()
+    model.build(input_shape=DEFAULT_INPUT_SHAPE, num_classes=ctx["num_classes"])
+    predict_fn = make_predict_fn(model.model)
+
+    rng = np.random.default_rng(0)
+    batch = rng.random((args.inference_batch_size, *DEFAULT_INPUT_SHAPE), dtype=np.float32)
+
+    def timed(fn) -> float:
+        fn(batch)
+        timings = []
+        for _ in range(max(1, args.repeats // 8)):
+            start = time.perf_counter()
+            fn(batch)
+            timings.append(time.perf_counter() - start)
+        return float(np.median(timings))
+
+    base_s = timed(predict_fn)
+    results = {}
+    for views in args.tta_views:
+        tta = TestTimeAugmentation(
+            num_views=views,
+            horizontal_flip=aug_cfg.get("horizontal_flip", True),
+            rotation=aug_cfg.get("rotation", 0.1),
+            zoom=aug_cfg.get("zoom", 0.1)
+        )
+        tta_s = timed(lambda images: tta.predict(predict_fn, images))
+        results[f"inference.tta{views}_images_per_sec"] = metric(len(batch) / tta_s, "img/s", True)
+        results[f"inference.tta{views}_cost_ratio"] = metric(tta_s / base_s, "x", False)
+
+    return results
+
+
+def bench_workers(ctx: dict) -> dict:
+    """
+    Inference worker pool: throughput with 1 to N worker processes (the
+    CPUs split evenly between them) and its scaling relative to one
+    worker (1.0 = no gain, N = linear).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from src.inference.worker_pool import InferenceWorkerPool
+    from src.models.simple_cnn import SimpleCNN
+    from src.models.vgg16_model import VGG16Model
+    from src.constants.training import DEFAULT_INPUT_SHAPE
+
+    args = ctx["args"]
+    model_cls = VGG16Model if ctx["config"].get("model_type") == "vgg16" else SimpleCNN
+    model = model_cls()
+    model.build(input_shape=DEFAULT_INPUT_SHAPE, num_classes=ctx["num_classes"])
+
+    model_path = ctx["workspace"] / "model.keras"
+    model.save(str(model_path))
+
+    rng = np.random.default_rng(0)
+    batch = rng.random((args.inference_batch_size, *DEFAULT_INPUT_SHAPE), dtype=np.float32)
+
+    results = {}
+    base_ips = None
+    for num_workers in args.pool_workers:
+        pool = InferenceWorkerPool(
+            num_workers=num_workers,
+            num_classes=ctx["num_classes"],
+            max_batch_size=args.inference_batch_size
+        )
+        pool.start(str(model_path))
+        try:
+            # enough concurrent callers to keep every slot busy
+            with ThreadPoolExecutor(max_workers=pool.capacity) as executor:
+                list(executor.map(pool.predict, [batch] * pool.capacity))
+                start = time.perf_counter()
+                list(executor.map(pool.predict, [batch] * args.repeats))
+                elapsed = time.perf_counter() - start
+        finally:
+            pool.stop()
+
+        ips = args.repeats * len(batch) / elapsed
+        base_ips = base_ips or ips
+        results[f"serving.workers{num_workers}_images_per_sec"] = metric(ips, "img/s", True)
+        results[f"serving.workers{num_workers}_scaling"] = metric(ips / base_ips, "x", True)
+
+    return results
+
+
+BENCHMARKS = {
+    "decode": bench_decode,
+    "data": bench_data,
+    "augmentation": bench_augmentation,
+    "train": bench_train,
+    "inference": bench_inference,
+    "tta": bench_tta,
+    "workers": bench_workers,
+}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Returns a description of every metric that got worse than the
+    baseline by more than `threshold` (relative).
+    """
+    regressions = []
+    for name, current in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if previous is None or previous["value"] == 0:
+            continue
+
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse = -change if current["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append(
+                f"{name}: {previous['value']:.3f} -> {current['value']:.3f} "
+                f"{current['unit']} ({worse:+.1%} worse)"
+            )
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.benchmark.runner",
+        description="Offline CPU benchmarks for data, training and inference throughput."
+    )
+    parser.add_argument("--config", default=DEFAULT_BASE_CONFIG)
+    parser.add_argument("--only", help=f"comma separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--num-classes", type=int, default=4)
+    parser.add_argument("--images-per-class", type=int, default=64)
+    parser.add_argument("--source-size", type=int, nargs=2, help="synthetic image height width")
+    parser.add_argument("--decode-source-size", type=int, nargs=2, default=[1024, 1024])
+    parser.add_argument("--decode-images", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=10, help="timed train steps per model")
+    parser.add_argument("--repeats", type=int, default=40, help="timed inference calls")
+    parser.add_argument("--inference-batch-size", type=int, default=32)
+    parser.add_argument("--tta-views", type=int, nargs="+", default=[4, 8])
+    parser.add_argument(
+        "--pool-workers", type=int, nargs="+", default=[1, 2, 4],
+        help="worker counts of the inference worker pool benchmark, the first is the baseline"
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {sorted(unknown)}")
+
+    # CPU-only and reproducible, regardless of the host
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    os.environ.setdefault("RUN_ID", f"benchmark_{timestamp}")
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        workspace = Path(tmp)
+        config_path = prepare_workspace(
+            workspace, args.config, args.num_classes,
+            args.images_per_class, args.source_size
+        )
+        os.environ["MODEL_PARAMS_FILE"] = str(config_path)
+
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+
+        import tensorflow as tf
+        tf.keras.utils.set_random_seed(config["data_config"]["SEED"])
+
+        ctx = {
+            "args": args,
+            "config": config,
+            "workspace": workspace,
+            "class_names": [f"class_{i}" for i in range(args.num_classes)],
+            "num_classes": args.num_classes,
+        }
+
+        metrics = {}
+        # the training and inference benchmarks reuse the data pipeline
+        if "data" not in selected and "train" in selected:
+            bench_data(ctx)
+        for name in BENCHMARKS:
+            if name in selected:
+                print(f"Running {name} benchmark...", flush=True)
+                metrics.update(BENCHMARKS[name](ctx))
+
+    results = {
+        "meta": {
+            "timestamp": timestamp,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "cpu_count": os.cpu_count(),
+            "machine": platform.machine(),
+            "model_type": config.get("model_type"),
+            "batch_size": config["data_config"]["BATCH_SIZE"],
+            "images_per_class": args.images_per_class,
+        },
+        "metrics": metrics,
+    }
+
+    output = args.output or Path(DEFAULT_OUTPUT_DIR) / f"bench_{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for name, m in metrics.items():
+        print(f"{name:<45}{m['value']:>12.3f} {m['unit']}")
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+from pathlib import Path
+
+
+def generate_dataset(
+    root: Path,
+    class_names: list[str],
+    images_per_class: int,
+    image_size: tuple[int, int],
+    seed: int = 42
+) -> Path:
+    """
+    Writes a class-folder JPEG dataset in the layout expected by
+    `DataIngestion`:
+
+        root/
+            class_1/img_00000.jpg
+            ...
+
+    Images are random noise with a per-class tint, so the content is
+    deterministic for a given seed but not trivially compressible.
+    """
+    import tensorflow as tf
+
+    rng = np.random.default_rng(seed)
+    root = Path(root)
+
+    for label, class_name in enumerate(class_names):
+        class_dir = root / class_name
+        class_dir.mkdir(parents=True, exist_ok=True)
+        tint = rng.integers(0, 256, size=3)
+
+        for i in range(images_per_class):
+            noise = rng.integers(0, 256, size=(*image_size, 3))
+            pixels = ((noise + tint) // 2).astype(np.uint8)
+            encoded = tf.io.encode_jpeg(pixels, quality=90)
+            (class_dir / f"img_{i:05d}.jpg").write_bytes(encoded.numpy())
+
+    return root
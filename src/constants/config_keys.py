@@ -4,3 +4,17 @@ OPTIMIZER_CONFIG = "optimizer_config"
 CALLBACKS = "callbacks"
 AUGMENTATION = "augmentation"
 TRAINING = "training"
+TRANSFER_LEARNING = "transfer_learning"
+SERVING = "serving"
+INFERENCE = "inference"
+PREPROCESSING = "preprocessing"
+EXPORT = "export"
+PROFILING = "profiling"
+VALIDATION = "validation"
+PERFORMANCE = "performance"
+DISTRIBUTED = "distributed"
+SWEEP_TRIAL = "sweep_trial"
+TRACKING = "tracking"
+CHECKPOINTING = "checkpointing"
+DISTILLATION = "distillation"
+STAGE_CACHE = "stage_cache"
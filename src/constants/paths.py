@@ -1,9 +1,25 @@
 # src/constants/paths.py
+import os
+
 CONFIG_DIR = "configs"
-MODEL_PARAMS_FILE = "configs/model_parameters.yaml"
+# overridable so benchmarks / sweeps can run against a generated config
+MODEL_PARAMS_FILE = os.getenv("MODEL_PARAMS_FILE", "configs/model_parameters.yaml")
 GENERAL_CONFIG_FILE = "configs/config.yaml"
 
 ARTIFACTS_DIR = "artifacts"
 MODEL_DIR = "artifacts/model"
 CHECKPOINT_DIR = "artifacts/checkpoints"
 LOG_DIR = "logs"
+FEATURE_CACHE_DIR = "artifacts/feature_cache"
+TEACHER_CACHE_DIR = "artifacts/teacher_cache"
+# per-image content hashes kept inside the feature / teacher cache dirs
+FILE_HASHES_NAME = "file_hashes.json"
+PROCESSED_DATA_DIR = "data/processed"
+TF_CACHE_DIR = "artifacts/tf_cache"
+EXPORT_DIR = "artifacts/export"
+PROFILING_DIR = "artifacts/profiling"
+VALIDATION_DIR = "artifacts/validation"
+SWEEP_CONFIG_FILE = "configs/sweep.yaml"
+SWEEP_DIR = "artifacts/sweeps"
+PREDICTION_CACHE_FILE = "artifacts/prediction_cache.sqlite"
+STAGE_CACHE_DIR = "artifacts/stages"
@@ -1 +1,2 @@
 DEFAULT_INPUT_SHAPE = (224, 224, 3)
+MLFLOW_EXPERIMENT_NAME = "brain_tumor_classification"
@@ -0,0 +1,117 @@
+import math
+import tensorflow as tf
+
+
+def affine_transforms(flips, angles, scales, height: int, width: int) -> tf.Tensor:
+    """
+    Composes horizontal flip, rotation and zoom about the image center
+    into one projective transform per image.
+
+    Args:
+        flips: (N,) 1.0 to flip horizontally, 0.0 otherwise
+        angles: (N,) rotation in radians
+        scales: (N,) zoom; > 1 zooms out, < 1 zooms in (as `RandomZoom`)
+
+    Returns:
+        (N, 8) float32 transforms in the `ImageProjectiveTransformV3`
+        layout, mapping output pixel coordinates to input coordinates.
+    """
+    flips = tf.cast(flips, tf.float32)
+    angles = tf.cast(angles, tf.float32)
+    scales = tf.cast(scales, tf.float32)
+
+    cx = (tf.cast(width, tf.float32) - 1.0) / 2.0
+    cy = (tf.cast(height, tf.float32) - 1.0) / 2.0
+
+    cos = tf.cos(angles) * scales
+    sin = tf.sin(angles) * scales
+    # flipping the input mirrors the x row of the sampling matrix
+    sign = 1.0 - 2.0 * flips
+
+    a0, a1 = sign * cos, -sign * sin
+    b0, b1 = sin, cos
+    # input = center + A @ (output - center)
+    a2 = cx - a0 * cx - a1 * cy
+    b2 = cy - b0 * cx - b1 * cy
+
+    zeros = tf.zeros_like(a0)
+    return tf.stack([a0, a1, a2, b0, b1, b2, zeros, zeros], axis=1)
+
+
+def apply_transforms(images: tf.Tensor, transforms: tf.Tensor) -> tf.Tensor:
+    """
+    Resamples every image once with its transform (bilinear,
+    reflected borders, as the Keras random layers).
+    """
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=tf.shape(images)[1:3],
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="REFLECT"
+    )
+
+
+class FusedAugmentation:
+    """
+    Random horizontal flip, rotation and zoom as a single resampling pass.
+
+    Equivalent to the `RandomFlip("horizontal")` -> `RandomRotation` ->
+    `RandomZoom` chain: each image draws a flip, an angle in
+    ±rotation * 2π and a zoom in 1 ± zoom, the three are composed into one
+    affine matrix, and the batch is resampled once instead of three times.
+
+    Called like a Keras layer: `augmentation(images, training=True)`.
+    With `seed`, the flip, angle and zoom draws each get their own op
+    seed (`seed`, `seed + 1`, `seed + 2`); one shared seed would make
+    the three streams identical and the transforms fully correlated.
+    """
+
+    def __init__(
+        self,
+        horizontal_flip: bool = True,
+        rotation: float = 0.1,
+        zoom: float = 0.1,
+        seed: int | None = None
+    ):
+        self.horizontal_flip = horizontal_flip
+        self.rotation = rotation
+        self.zoom = zoom
+        self.seed = seed
+        self._seeds = (None,) * 3 if seed is None else (seed, seed + 1, seed + 2)
+
+    @classmethod
+    def from_config(cls, aug_cfg: dict, seed: int | None = None) -> "FusedAugmentation":
+        return cls(
+            horizontal_flip=aug_cfg.get("horizontal_flip", True),
+            rotation=aug_cfg.get("rotation", 0.1),
+            zoom=aug_cfg.get("zoom", 0.1),
+            seed=seed
+        )
+
+    def __call__(self, images, training: bool = True):
+        if not training:
+            return images
+
+        images = tf.convert_to_tensor(images)
+        shape = tf.shape(images)
+        batch = shape[0]
+
+        flip_seed, angle_seed, zoom_seed = self._seeds
+
+        flips = tf.zeros([batch])
+        if self.horizontal_flip:
+            flips = tf.cast(
+                tf.random.uniform([batch], seed=flip_seed) < 0.5, tf.float32
+            )
+
+        max_angle = self.rotation * 2.0 * math.pi
+        angles = tf.random.uniform([batch], -max_angle, max_angle, seed=angle_seed)
+        scales = 1.0 + tf.random.uniform([batch], -self.zoom, self.zoom, seed=zoom_seed)
+
+        transforms = affine_transforms(flips, angles, scales, shape[1], shape[2])
+        return tf.cast(
+            apply_transforms(tf.cast(images, tf.float32), transforms),
+            images.dtype
+        )
@@ -0,0 +1,185 @@
+import os
+import re
+import time
+import hashlib
+import tensorflow as tf
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from src.data.image_index import ImageIndex
+from src.utilities.logger import app_logger
+from src.utilities.utils import worker_task
+from src.constants.paths import TF_CACHE_DIR
+
+logger = app_logger(__name__)
+
+CACHE_MODES = ("memory", "disk", "off")
+
+
+class DatasetCache:
+    """
+    Decides where a decoded, normalized dataset is cached and applies it.
+
+    Modes:
+    - memory: `dataset.cache()` in RAM
+    - disk: `dataset.cache(filename)` under cache_dir, keyed by a
+      fingerprint of the source files, the image size and the decoding
+      path (`decoder_id`) so stale caches are never reused
+    - off: no caching
+
+    In memory mode the estimated dataset size is checked against
+    `max_memory_mb` and the available RAM; if it does not fit, the disk
+    cache is used instead.
+
+    With `read_only` (sweep trials) a disk cache is only read: it has to
+    be filled beforehand (`DataPreprocessing.fill_cache`), a missing one
+    leaves the dataset uncached, and nothing is written or cleaned up, so
+    concurrent processes never touch each other's files. A process that
+    writes a disk cache holds an exclusive lock on `<cache>.fill.lock`
+    until it exits; another process finding the lock taken reads its
+    split uncached instead of touching the cache files.
+    """
+
+    def __init__(self, cache_config: dict, img_size: tuple[int, int], decoder: str):
+        self.mode = cache_config.get("mode", "off")
+        if self.mode not in CACHE_MODES:
+            raise ValueError(
+                f"Unknown cache mode '{self.mode}', expected one of {CACHE_MODES}"
+            )
+
+        self.cache_dir = Path(cache_config.get("cache_dir", TF_CACHE_DIR))
+        self.max_memory_bytes = cache_config.get("max_memory_mb", 4096) * 1024 ** 2
+        self.read_only = cache_config.get("read_only", False)
+        # open lock files of the caches this process fills
+        self._fill_locks = {}
+        self.img_size = tuple(img_size)
+        self.decoder = decoder
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def apply(
+        self,
+        dataset: tf.data.Dataset,
+        split: str,
+        index: ImageIndex
+    ) -> tf.data.Dataset:
+        """
+        Caches `dataset` according to the configured mode.
+        `index` lists the source images of the split; it sizes the
+        in-memory estimate and keys the disk cache.
+        """
+        if not self.enabled:
+            return dataset
+
+        estimate = len(index) * self.img_size[0] * self.img_size[1] * 3 * 4
+        mode = self.mode
+
+        if mode == "memory":
+            budget = min(self.max_memory_bytes, self._available_memory() // 2)
+            if estimate > budget:
+                logger.warning(
+                    f"{split} cache estimate {estimate / 1024 ** 2:.0f} MB exceeds "
+                    f"memory budget {budget / 1024 ** 2:.0f} MB, using disk cache"
+                )
+                mode = "disk"
+
+        if mode == "memory":
+            logger.info(f"Caching {split} dataset in memory (~{estimate / 1024 ** 2:.0f} MB)")
+            return dataset.cache()
+
+        cache_path = self._cache_path(split, index)
+        if self.read_only and not Path(f"{cache_path}.index").exists():
+            logger.warning(
+                f"No prepared {split} cache at {cache_path}, reading it uncached"
+            )
+            return dataset
+
+        if not self.read_only and not self._claim(cache_path):
+            logger.warning(
+                f"{split} cache at {cache_path} is being filled by another process, "
+                "reading it uncached"
+            )
+            return dataset
+
+        logger.info(f"Caching {split} dataset on disk at {cache_path}")
+        return dataset.cache(str(cache_path))
+
+    def _cache_path(self, split: str, index: ImageIndex) -> Path:
+        key = hashlib.sha256(
+            f"{index.stat_fingerprint()}|{self.img_size}|{self.decoder}".encode()
+        ).hexdigest()[:16]
+
+        # workers of a multi-worker run on one host each fill their own cache
+        _, task_index, num_workers = worker_task()
+        if num_workers > 1:
+            key = f"{key}_w{task_index}"
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self.cache_dir / f"{split}_{key}"
+
+    def _claim(self, cache_path: Path) -> bool:
+        """
+        Takes the fill lock of `cache_path` for the rest of this process
+        and removes the files of an interrupted fill. False when another
+        process holds the lock.
+        """
+        if cache_path in self._fill_locks:
+            return True
+
+        lock_file = open(f"{cache_path}.fill.lock", "w")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False
+        self._fill_locks[cache_path] = lock_file
+
+        # an interrupted fill leaves data/lock files without an index,
+        # which tf.data refuses to reuse or overwrite; only this cache's
+        # own files match (not e.g. the `_w<N>` caches of other workers)
+        if not Path(f"{cache_path}.index").exists():
+            own_file = re.compile(
+                rf"{re.escape(cache_path.name)}"
+                rf"(\.index|\.data-\d+-of-\d+|(_\d+)?\.lockfile)"
+            )
+            for leftover in self.cache_dir.iterdir():
+                if own_file.fullmatch(leftover.name):
+                    leftover.unlink()
+
+        return True
+
+    @staticmethod
+    def _available_memory() -> int:
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+        except (ValueError, OSError, AttributeError):
+            return 2 ** 63 - 1
+
+
+class CacheTimingCallback(tf.keras.callbacks.Callback):
+    """
+    Logs epoch wall time split into the cache fill (first epoch run,
+    which is not epoch 0 when training resumes) and cache hits (later
+    epochs).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._first_epoch = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        if self._first_epoch is None:
+            self._first_epoch = epoch
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._start
+        phase = "fill" if epoch == self._first_epoch else "hit"
+        logger.info(f"Epoch {epoch + 1} (cache {phase}): {elapsed:.2f}s")
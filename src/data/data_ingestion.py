@@ -1,6 +1,10 @@
 import tensorflow as tf
+from src.data.image_index import ImageIndex
+from src.data.image_decoding import decode_resized
+from src.data.data_materialization import DataMaterialization
 from src.utilities.logger import app_logger
 from src.utilities.utils import load_config
+from src.constants.paths import MODEL_PARAMS_FILE
 
 logger = app_logger(__name__)
 
@@ -36,8 +40,9 @@ class DataIngestion:
         - IMG_SIZE: Target image size (height, width)
         - BATCH_SIZE: Number of samples per batch
         - SEED: Random seed for reproducibility
+        - scaled_jpeg_decode: Downscale large JPEGs while decoding
         """
-        config = load_config("configs/model_parameters.yaml")
+        config = load_config(MODEL_PARAMS_FILE)
         data_config = config["data_config"]
 
         self.TRAIN_DIR = data_config["TRAIN_DIR"]
@@ -45,6 +50,7 @@ class DataIngestion:
         self.IMG_SIZE = tuple(data_config["IMG_SIZE"])
         self.BATCH_SIZE = data_config["BATCH_SIZE"]
         self.SEED = data_config["SEED"]
+        self.scaled_decode = data_config.get("scaled_jpeg_decode", True)
 
     def load(self):
         """
@@ -66,22 +72,75 @@ class DataIngestion:
             num_classes (int):
                 Total number of target classes.
         """
+        materializer = DataMaterialization()
+        if materializer.enabled:
+            return self._load_materialized(materializer)
+
         logger.info("Loading training dataset")
-        train_ds = tf.keras.utils.image_dataset_from_directory(
-            self.TRAIN_DIR,
-            image_size=self.IMG_SIZE,
-            batch_size=self.BATCH_SIZE,
-            seed=self.SEED
-        )
+        train_index = ImageIndex.from_directory(self.TRAIN_DIR)
+        train_ds = self._from_index(train_index, shuffle=True)
 
-        class_names = train_ds.class_names
+        class_names = train_index.class_names
         num_classes = len(class_names)
         logger.info(f"Classes detected: {class_names}")
 
         logger.info("Loading test dataset")
-        test_ds = tf.keras.utils.image_dataset_from_directory(
-            self.TEST_DIR,
-            image_size=self.IMG_SIZE,
+        test_index = ImageIndex.from_directory(self.TEST_DIR, class_names)
+        test_ds = self._from_index(test_index, shuffle=False)
+
+        return train_ds, test_ds, class_names, num_classes
+
+    def _from_index(self, index: ImageIndex, shuffle: bool) -> tf.data.Dataset:
+        """
+        Batched (image, label) dataset with the layout of
+        `image_dataset_from_directory`: float32 images in [0, 255] resized
+        (bilinear) to IMG_SIZE, int32 labels.
+
+        Images are decoded in parallel; large JPEGs are downscaled during
+        decoding (see `decode_resized`) instead of after a full decode.
+        """
+        if len(index) == 0:
+            raise ValueError("No images found")
+        logger.info(f"Found {len(index)} files belonging to {len(index.class_names)} classes")
+
+        ds = tf.data.Dataset.from_tensor_slices(
+            (index.paths, tf.constant(index.labels, dtype=tf.int32))
+        )
+        if shuffle:
+            # file names only, shuffling the whole set is cheap
+            ds = ds.shuffle(len(index), seed=self.SEED, reshuffle_each_iteration=True)
+
+        return ds.map(
+            lambda path, label: (
+                decode_resized(tf.io.read_file(path), self.IMG_SIZE, self.scaled_decode),
+                label
+            ),
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).batch(self.BATCH_SIZE)
+
+    def _load_materialized(self, materializer: DataMaterialization):
+        """
+        Same outputs as `load`, read from pre-resized TFRecord shards.
+        Shards are (re)built first if missing or out of date.
+        """
+        train_manifest = materializer.materialize("train", self.TRAIN_DIR)
+        class_names = train_manifest["class_names"]
+        num_classes = len(class_names)
+        logger.info(f"Classes detected: {class_names}")
+
+        test_manifest = materializer.materialize("test", self.TEST_DIR, class_names)
+
+        logger.info("Loading training dataset from shards")
+        train_ds = materializer.read(
+            train_manifest,
+            batch_size=self.BATCH_SIZE,
+            shuffle=True,
+            seed=self.SEED
+        )
+
+        logger.info("Loading test dataset from shards")
+        test_ds = materializer.read(
+            test_manifest,
             batch_size=self.BATCH_SIZE,
             shuffle=False
         )
@@ -0,0 +1,255 @@
+import os
+import json
+import math
+import shutil
+import hashlib
+import tensorflow as tf
+from pathlib import Path
+
+from src.data.image_index import ImageIndex
+from src.data.image_decoding import decode_resized, decoder_id
+from src.utilities.logger import app_logger
+from src.utilities.utils import load_config
+from src.constants.paths import MODEL_PARAMS_FILE, PROCESSED_DATA_DIR
+from src.constants.config_keys import DATA_CONFIG
+
+logger = app_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+class DataMaterialization:
+    """
+    Converts class-folder image datasets into sharded TFRecord files.
+
+    Every image is decoded and resized to IMG_SIZE once, and stored as
+    raw uint8 pixels with its label. Later runs read the shards directly
+    and never decode JPEGs again.
+
+    Output layout:
+        output_dir/<split>/
+            shard-00000-of-00016.tfrecord
+            ...
+            manifest.json
+
+    The manifest records class names, image size, compression, record
+    counts per shard and a fingerprint of the source files (path, size,
+    mtime). Shards are rebuilt only when the fingerprint changes.
+    """
+
+    def __init__(self):
+        """
+        Configuration keys used:
+        - data_config.IMG_SIZE
+        - data_config.materialization.enabled
+        - data_config.materialization.output_dir
+        - data_config.materialization.num_shards
+        - data_config.materialization.compression: "GZIP", "ZLIB" or null
+        - data_config.materialization.shuffle_buffer
+        """
+        config = load_config(MODEL_PARAMS_FILE)
+        data_config = config[DATA_CONFIG]
+        mat_config = data_config.get("materialization", {})
+
+        self.IMG_SIZE = tuple(data_config["IMG_SIZE"])
+        self.scaled_decode = data_config.get("scaled_jpeg_decode", True)
+
+        self.enabled = mat_config.get("enabled", False)
+        self.output_dir = Path(mat_config.get("output_dir", PROCESSED_DATA_DIR))
+        self.num_shards = mat_config.get("num_shards", 16)
+        self.compression = mat_config.get("compression") or ""
+        self.shuffle_buffer = mat_config.get("shuffle_buffer", 1024)
+
+    def materialize(
+        self,
+        split: str,
+        source_dir: str,
+        class_names: list[str] | None = None
+    ) -> dict:
+        """
+        Ensures up-to-date shards exist for `source_dir` and returns
+        the manifest.
+        """
+        index = ImageIndex.from_directory(source_dir, class_names)
+        if len(index) == 0:
+            raise ValueError(f"No images found in {source_dir}")
+
+        fingerprint = self._fingerprint(index)
+        split_dir = self.output_dir / split
+
+        manifest = self.load_manifest(split)
+        if manifest is not None and manifest["fingerprint"] == fingerprint:
+            logger.info(f"Using materialized {split} shards from {split_dir}")
+            return manifest
+
+        logger.info(
+            f"Materializing {len(index)} {split} images "
+            f"into {self.num_shards} shards at {split_dir}"
+        )
+        return self._write_shards(split, index, fingerprint)
+
+    def load_manifest(self, split: str) -> dict | None:
+        manifest_path = self.output_dir / split / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    def read(
+        self,
+        manifest: dict,
+        batch_size: int,
+        shuffle: bool,
+        seed: int | None = None,
+        num_workers: int = 1,
+        worker_index: int = 0
+    ) -> tf.data.Dataset:
+        """
+        Builds a batched (image, label) dataset from materialized shards.
+
+        Images are float32 in [0, 255], like `image_dataset_from_directory`.
+        Shards are read with parallel interleave. With `num_workers > 1`
+        each worker reads a disjoint subset of the shards.
+        """
+        split_dir = self.output_dir / manifest["split"]
+        shards = manifest["shards"][worker_index::num_workers]
+        if not shards:
+            raise ValueError(
+                f"Worker {worker_index}/{num_workers} has no shards to read"
+            )
+
+        files = [str(split_dir / shard["file"]) for shard in shards]
+        num_records = sum(shard["num_records"] for shard in shards)
+        height, width = manifest["img_size"]
+        compression = manifest["compression"]
+
+        def parse(record):
+            example = tf.io.parse_single_example(record, {
+                "image": tf.io.FixedLenFeature([], tf.string),
+                "label": tf.io.FixedLenFeature([], tf.int64),
+            })
+            image = tf.io.decode_raw(example["image"], tf.uint8)
+            image = tf.reshape(image, (height, width, 3))
+            return tf.cast(image, tf.float32), tf.cast(example["label"], tf.int32)
+
+        ds = tf.data.Dataset.from_tensor_slices(files)
+        if shuffle:
+            ds = ds.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+
+        ds = ds.interleave(
+            lambda f: tf.data.TFRecordDataset(f, compression_type=compression),
+            cycle_length=min(len(files), os.cpu_count() or 1),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not shuffle
+        ).map(parse, num_parallel_calls=tf.data.AUTOTUNE)
+
+        if shuffle:
+            ds = ds.shuffle(self.shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+        ds = ds.batch(batch_size)
+
+        # TFRecord datasets have unknown length, the manifest knows it
+        return ds.apply(
+            tf.data.experimental.assert_cardinality(
+                math.ceil(num_records / batch_size)
+            )
+        )
+
+    def _fingerprint(self, index: ImageIndex) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "img_size": list(self.IMG_SIZE),
+            "num_shards": self.num_shards,
+            "compression": self.compression,
+            "class_names": index.class_names,
+            "decoder": decoder_id(self.scaled_decode),
+        }, sort_keys=True).encode())
+        digest.update(index.stat_fingerprint().encode())
+
+        return digest.hexdigest()
+
+    def _write_shards(
+        self,
+        split: str,
+        index: ImageIndex,
+        fingerprint: str
+    ) -> dict:
+        split_dir = self.output_dir / split
+        tmp_dir = self.output_dir / f"{split}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        num_shards = min(self.num_shards, len(index))
+        options = tf.io.TFRecordOptions(compression_type=self.compression)
+        shard_files = [
+            f"shard-{i:05d}-of-{num_shards:05d}.tfrecord"
+            for i in range(num_shards)
+        ]
+        writers = [
+            tf.io.TFRecordWriter(str(tmp_dir / name), options)
+            for name in shard_files
+        ]
+        counts = [0] * num_shards
+
+        ds = tf.data.Dataset.from_tensor_slices(
+            (index.paths, index.labels)
+        ).map(
+            lambda path, label: (self._load_image(path), label),
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).prefetch(tf.data.AUTOTUNE)
+
+        try:
+            for i, (image, label) in enumerate(ds):
+                example = tf.train.Example(features=tf.train.Features(feature={
+                    "image": tf.train.Feature(
+                        bytes_list=tf.train.BytesList(value=[image.numpy().tobytes()])
+                    ),
+                    "label": tf.train.Feature(
+                        int64_list=tf.train.Int64List(value=[int(label)])
+                    ),
+                }))
+                shard = i % num_shards
+                writers[shard].write(example.SerializeToString())
+                counts[shard] += 1
+        finally:
+            for writer in writers:
+                writer.close()
+
+        manifest = {
+            "split": split,
+            "class_names": index.class_names,
+            "img_size": list(self.IMG_SIZE),
+            "compression": self.compression,
+            "num_records": len(index),
+            "fingerprint": fingerprint,
+            "shards": [
+                {"file": name, "num_records": count}
+                for name, count in zip(shard_files, counts)
+            ],
+        }
+        with open(tmp_dir / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        if split_dir.exists():
+            shutil.rmtree(split_dir)
+        tmp_dir.rename(split_dir)
+
+        logger.info(f"Materialized {len(index)} {split} images into {split_dir}")
+
+        return manifest
+
+    def _load_image(self, path):
+        """
+        Decodes and resizes like `DataIngestion`, then rounds to uint8
+        for compact storage.
+        """
+        img = decode_resized(tf.io.read_file(path), self.IMG_SIZE, self.scaled_decode)
+        return tf.cast(tf.clip_by_value(tf.round(img), 0, 255), tf.uint8)
+
+
+if __name__ == "__main__":
+    config = load_config(MODEL_PARAMS_FILE)[DATA_CONFIG]
+    materializer = DataMaterialization()
+    train_manifest = materializer.materialize("train", config["TRAIN_DIR"])
+    materializer.materialize("test", config["TEST_DIR"], train_manifest["class_names"])
@@ -1,7 +1,14 @@
+import math
 import tensorflow as tf
 from tensorflow.keras import layers
+from src.data.data_cache import DatasetCache
+from src.data.augmentation import FusedAugmentation
+from src.data.image_index import ImageIndex
+from src.data.image_decoding import decoder_id
 from src.utilities.logger import app_logger
 from src.utilities.utils import load_config
+from src.constants.config_keys import DATA_CONFIG, PREPROCESSING
+from src.constants.paths import MODEL_PARAMS_FILE
 
 logger = app_logger(__name__)
 
@@ -11,34 +18,54 @@ class DataPreprocessing:
 
     Responsibilities:
     - Normalize pixel values
+    - Cache decoded, normalized images (memory / disk / off)
     - Apply optional data augmentation
     - Optimize input pipelines using parallel mapping and prefetching
 
     All preprocessing behavior is controlled via `model_parameters.yaml`.
     """
 
-    def __init__(self):
+    def __init__(self, cache_config: dict | None = None):
         """
         Initializes preprocessing components based on configuration.
+        `cache_config` replaces `preprocessing.cache` when given.
 
         Configuration keys used:
         - augmentation.enabled: Toggle data augmentation
         - augmentation.horizontal_flip
         - augmentation.rotation
         - augmentation.zoom
+        - data_config.scaled_jpeg_decode: keys the disk cache
+        - preprocessing.cache.mode: memory | disk | off
+        - preprocessing.cache.cache_dir
+        - preprocessing.cache.max_memory_mb
+        - preprocessing.cache.read_only
+        - preprocessing.cache.shuffle_buffer
         """
-        config = load_config("configs/model_parameters.yaml")
+        config = load_config(MODEL_PARAMS_FILE)
         aug_config = config.get("augmentation", {})
+        data_config = config[DATA_CONFIG]
+        if cache_config is None:
+            cache_config = config.get(PREPROCESSING, {}).get("cache", {})
+
+        self.TRAIN_DIR = data_config["TRAIN_DIR"]
+        self.TEST_DIR = data_config["TEST_DIR"]
+        self.BATCH_SIZE = data_config["BATCH_SIZE"]
+        self.SEED = data_config["SEED"]
+
+        self.cache = DatasetCache(
+            cache_config,
+            data_config["IMG_SIZE"],
+            decoder_id(data_config.get("scaled_jpeg_decode", True))
+        )
+        self.shuffle_buffer = cache_config.get("shuffle_buffer", 1024)
 
         self.normalization = layers.Rescaling(1.0 / 255.0)
 
+        # flip, rotation and zoom in one resampling pass per batch
         self.augmentation = None
         if aug_config.get("enabled", False):
-            self.augmentation = tf.keras.Sequential([
-                layers.RandomFlip("horizontal"),
-                layers.RandomRotation(aug_config.get("rotation", 0.1)),
-                layers.RandomZoom(aug_config.get("zoom", 0.1))
-            ])
+            self.augmentation = FusedAugmentation.from_config(aug_config)
 
     def process(self, train_ds, test_ds):
         """
@@ -46,6 +73,8 @@ class DataPreprocessing:
 
         Processing steps:
         - Normalize all images
+        - Cache normalized images (if enabled)
+        - Shuffle cached training samples
         - Apply data augmentation to training data only
         - Enable parallel execution and prefetching
 
@@ -65,15 +94,15 @@ class DataPreprocessing:
         """
         logger.info("Applying data preprocessing")
 
-        train_ds = train_ds.map(
-            self._train_map,
-            num_parallel_calls=tf.data.AUTOTUNE
-        )
+        if self.cache.enabled:
+            train_ds = self._cached_train(train_ds)
+        else:
+            train_ds = train_ds.map(
+                self._train_map,
+                num_parallel_calls=tf.data.AUTOTUNE
+            )
 
-        test_ds = test_ds.map(
-            lambda x, y: (self.normalization(x), y),
-            num_parallel_calls=tf.data.AUTOTUNE
-        )
+        test_ds = self._cached_test(test_ds)
 
         train_ds = train_ds.prefetch(tf.data.AUTOTUNE)
         test_ds = test_ds.prefetch(tf.data.AUTOTUNE)
@@ -82,6 +111,65 @@ class DataPreprocessing:
 
         return train_ds, test_ds
 
+    def _cached_train(self, train_ds):
+        """
+        normalize -> cache -> shuffle -> batch -> augment
+
+        Batches are split into samples before caching so that every
+        epoch reshuffles samples instead of replaying the cached batches.
+        """
+        index = ImageIndex.from_directory(self.TRAIN_DIR)
+        train_ds = self._cached_samples(train_ds, index)
+
+        train_ds = train_ds.shuffle(
+            self.shuffle_buffer,
+            seed=self.SEED,
+            reshuffle_each_iteration=True
+        ).batch(self.BATCH_SIZE)
+
+        if self.augmentation:
+            train_ds = train_ds.map(
+                lambda x, y: (self.augmentation(x), y),
+                num_parallel_calls=tf.data.AUTOTUNE
+            )
+
+        return train_ds.apply(
+            tf.data.experimental.assert_cardinality(
+                math.ceil(len(index) / self.BATCH_SIZE)
+            )
+        )
+
+    def fill_cache(self, train_ds, test_ds) -> None:
+        """
+        Fills the cache of both splits by reading them once, e.g. before
+        the trials of a sweep, which then only read it.
+        """
+        train_ds = self._cached_samples(train_ds, ImageIndex.from_directory(self.TRAIN_DIR))
+        for ds in (train_ds, self._cached_test(test_ds)):
+            for _ in ds:
+                pass
+        logger.info("Dataset cache filled")
+
+    def _cached_samples(self, train_ds, index: ImageIndex):
+        """
+        Normalized training samples (unbatched), cached.
+        """
+        train_ds = train_ds.map(
+            lambda x, y: (self.normalization(x), y),
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).unbatch()
+
+        return self.cache.apply(train_ds, "train", index)
+
+    def _cached_test(self, test_ds):
+        test_ds = test_ds.map(
+            lambda x, y: (self.normalization(x), y),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+        return self.cache.apply(
+            test_ds, "test", ImageIndex.from_directory(self.TEST_DIR)
+        )
+
     def _train_map(self, x, y):
         """
         Applies preprocessing to a single training batch.
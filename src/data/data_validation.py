@@ -1,26 +1,63 @@
+import os
+import csv
+import json
 from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from src.data.image_index import ImageIndex, file_sha256
 from src.utilities.logger import app_logger
 from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE, VALIDATION_DIR
+from src.constants.config_keys import VALIDATION
 
 logger = get_logger(__name__)
 
+MANIFEST_COLUMNS = [
+    "path", "split", "class", "size", "mtime_ns",
+    "sha256", "dhash", "width", "height", "status", "error"
+]
+
+
 class DataValidation:
     """
-    Performs lightweight structural validation on image datasets.
+    Validates image datasets before ingestion.
 
-    This module intentionally avoids heavy data validation and focuses on:
+    Structural checks (always):
     - directory presence
     - class consistency
     - non-empty datasets
+
+    Content checks (validation.content_checks):
+    - every image is fully decoded in a process pool, catching corrupt
+      or truncated files before they crash training
+    - images smaller than validation.min_image_size are rejected
+    - exact (SHA-256) and near (perceptual dHash) duplicates are reported,
+      including duplicates shared between train and test (leakage)
+
+    Results are written to a manifest CSV (path, size, mtime, hash, dims,
+    class, status). On re-validation only files whose size or mtime
+    changed are decoded again.
     """
 
     def __init__(self):
-        config = load_config("configs/model_parameters.yaml")
+        config = load_config(MODEL_PARAMS_FILE)
         data_cfg = config["data_config"]
+        val_cfg = config.get(VALIDATION, {})
 
         self.train_dir = Path(data_cfg["TRAIN_DIR"])
         self.test_dir = Path(data_cfg["TEST_DIR"])
 
+        self.content_checks = val_cfg.get("content_checks", True)
+        self.workers = val_cfg.get("workers") or os.cpu_count()
+        self.min_image_size = val_cfg.get("min_image_size", 32)
+        self.near_duplicate_bits = val_cfg.get("near_duplicate_max_bits", 4)
+        self.fail_on_corrupt = val_cfg.get("fail_on_corrupt", True)
+        self.fail_on_leakage = val_cfg.get("fail_on_leakage", False)
+
+        output_dir = Path(val_cfg.get("output_dir", VALIDATION_DIR))
+        self.manifest_path = output_dir / "manifest.csv"
+        self.report_path = output_dir / "validation_report.json"
+
     def validate(self):
         logger.info("Running data validation checks")
 
@@ -43,4 +80,220 @@ class DataValidation:
             if not any((self.train_dir / cls).iterdir()):
                 raise ValueError(f"Empty class folder: {cls}")
 
+        if self.content_checks:
+            self._validate_content()
+
         logger.info("Data validation passed")
+
+    def _validate_content(self):
+        rows = self._build_manifest()
+        self._write_manifest(rows)
+
+        invalid = [r for r in rows if r["status"] != "ok"]
+        exact_groups = self._exact_duplicates(rows)
+        near_pairs = self._near_duplicates(rows)
+
+        leaked_exact = [g for g in exact_groups if len({r["split"] for r in g}) > 1]
+        leaked_near = [p for p in near_pairs if p[0]["split"] != p[1]["split"]]
+
+        report = {
+            "num_images": len(rows),
+            "invalid": [
+                {"path": r["path"], "status": r["status"], "error": r["error"]}
+                for r in invalid
+            ],
+            "exact_duplicates": [[r["path"] for r in g] for g in exact_groups],
+            "near_duplicates": [[a["path"], b["path"]] for a, b in near_pairs],
+            "leakage": {
+                "exact": [[r["path"] for r in g] for g in leaked_exact],
+                "near": [[a["path"], b["path"]] for a, b in leaked_near],
+            },
+        }
+        with open(self.report_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+        logger.info(
+            f"Content checks: {len(rows)} images, {len(invalid)} invalid, "
+            f"{len(exact_groups)} exact duplicate groups, "
+            f"{len(near_pairs)} near-duplicate pairs"
+        )
+        logger.info(f"Validation manifest saved at {self.manifest_path}")
+
+        if leaked_exact or leaked_near:
+            message = (
+                f"Train/test leakage: {len(leaked_exact)} exact and "
+                f"{len(leaked_near)} near-duplicate cases (see {self.report_path})"
+            )
+            if self.fail_on_leakage:
+                raise ValueError(message)
+            logger.warning(message)
+
+        if invalid:
+            message = (
+                f"{len(invalid)} invalid images, e.g. {invalid[0]['path']}: "
+                f"{invalid[0]['error']} (see {self.report_path})"
+            )
+            if self.fail_on_corrupt:
+                raise ValueError(message)
+            logger.warning(message)
+
+    def _build_manifest(self) -> list[dict]:
+        previous = self._load_manifest()
+
+        rows, pending = [], []
+        for split, root in (("train", self.train_dir), ("test", self.test_dir)):
+            index = ImageIndex.from_directory(str(root))
+            for path, label in zip(index.paths, index.labels):
+                stat = os.stat(path)
+                row = {
+                    "path": path,
+                    "split": split,
+                    "class": index.class_names[label],
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+
+                cached = previous.get(path)
+                if (
+                    cached is not None
+                    and int(cached["size"]) == stat.st_size
+                    and int(cached["mtime_ns"]) == stat.st_mtime_ns
+                ):
+                    for key in ("sha256", "dhash", "width", "height", "status", "error"):
+                        row[key] = cached[key]
+                else:
+                    pending.append(row)
+                rows.append(row)
+
+        logger.info(
+            f"Checking {len(pending)} new or changed images "
+            f"({len(rows) - len(pending)} unchanged)"
+        )
+
+        if pending:
+            paths = [row["path"] for row in pending]
+            if len(paths) < 64 or self.workers == 1:
+                results = [inspect_image(p) for p in paths]
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    results = list(executor.map(
+                        inspect_image, paths,
+                        chunksize=max(1, len(paths) // (self.workers * 8))
+                    ))
+
+            for row, result in zip(pending, results):
+                row.update(result)
+                if row["status"] == "ok" and min(row["width"], row["height"]) < self.min_image_size:
+                    row["status"] = "too_small"
+                    row["error"] = f"{row['width']}x{row['height']}"
+
+        return rows
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, newline="", encoding="utf-8") as f:
+            return {row["path"]: row for row in csv.DictReader(f)}
+
+    def _write_manifest(self, rows: list[dict]) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".csv.tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _exact_duplicates(rows: list[dict]) -> list[list[dict]]:
+        groups = defaultdict(list)
+        for row in rows:
+            if row["sha256"]:
+                groups[row["sha256"]].append(row)
+        return [g for g in groups.values() if len(g) > 1]
+
+    def _near_duplicates(self, rows: list[dict]) -> list[tuple[dict, dict]]:
+        """
+        Pairs of different files whose dHashes differ in at most
+        `near_duplicate_max_bits` bits.
+
+        The 64-bit hash is split into (max_bits + 1) bands: two hashes
+        within max_bits must agree on at least one band, so only rows
+        sharing a band value are compared.
+        """
+        max_bits = self.near_duplicate_bits
+        candidates = [r for r in rows if r["status"] == "ok" and r["dhash"]]
+        hashes = [int(r["dhash"], 16) for r in candidates]
+
+        num_bands = max_bits + 1
+        band_width = 64 // num_bands
+        buckets = defaultdict(list)
+        for i, h in enumerate(hashes):
+            for band in range(num_bands):
+                key = (band, (h >> (band * band_width)) & ((1 << band_width) - 1))
+                buckets[key].append(i)
+
+        seen = set()
+        pairs = []
+        for members in buckets.values():
+            for a_pos, a in enumerate(members):
+                for b in members[a_pos + 1:]:
+                    if (a, b) in seen:
+                        continue
+                    seen.add((a, b))
+                    if candidates[a]["sha256"] == candidates[b]["sha256"]:
+                        continue
+                    if bin(hashes[a] ^ hashes[b]).count("1") <= max_bits:
+                        pairs.append((candidates[a], candidates[b]))
+
+        return pairs
+
+
+def inspect_image(path: str) -> dict:
+    """
+    Hashes and fully decodes one image. Runs in a worker process.
+    """
+    from PIL import Image
+
+    result = {
+        "sha256": file_sha256(path),
+        "dhash": "",
+        "width": 0,
+        "height": 0,
+        "status": "ok",
+        "error": "",
+    }
+
+    try:
+        with Image.open(path) as img:
+            img.verify()
+        # verify() leaves the image unusable, decoding needs a fresh handle
+        with Image.open(path) as img:
+            img.load()
+            result["width"], result["height"] = img.size
+            result["dhash"] = dhash(img)
+    except Exception as e:
+        result["status"] = "corrupt"
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def dhash(img, hash_size: int = 8) -> str:
+    """
+    Difference hash: compares neighbouring pixels of a small grayscale
+    thumbnail, robust to resizing and recompression.
+    """
+    from PIL import Image
+
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | int(left > right)
+
+    return f"{value:016x}"
@@ -0,0 +1,109 @@
+import time
+import numpy as np
+import tensorflow as tf
+
+# largest first; libjpeg scales by 1/2, 1/4 or 1/8 while decoding
+JPEG_RATIOS = (8, 4, 2, 1)
+
+
+def decoder_id(scaled: bool) -> str:
+    """
+    Identifies the decoding path, for caches of decoded images.
+    """
+    return "scaled_jpeg" if scaled else "full"
+
+
+def jpeg_ratio(height, width, target_size) -> tf.Tensor:
+    """
+    Largest JPEG scale denominator that still decodes to at least
+    `target_size` in both dimensions, so the final resize only ever
+    downsamples.
+    """
+    target_h, target_w = target_size
+    ratio = tf.constant(1, tf.int32)
+    for r in reversed(JPEG_RATIOS[:-1]):
+        fits = tf.logical_and(height // r >= target_h, width // r >= target_w)
+        ratio = tf.where(fits, tf.constant(r, tf.int32), ratio)
+    return ratio
+
+
+def decode_resized(contents, target_size, scaled: bool = True) -> tf.Tensor:
+    """
+    Decodes encoded image bytes to a (H, W, 3) float32 image in [0, 255]
+    resized (bilinear) to `target_size`, as `image_dataset_from_directory`.
+
+    With `scaled`, JPEGs much larger than the target are downscaled in
+    the DCT domain while decoding (1/2, 1/4 or 1/8, chosen per image), so
+    the full-resolution image is never materialized. Other formats are
+    fully decoded.
+    """
+    target_size = tuple(int(s) for s in target_size)
+
+    def full():
+        img = tf.io.decode_image(contents, channels=3, expand_animations=False)
+        return tf.image.resize(img, target_size)
+
+    if not scaled:
+        return full()
+
+    def jpeg():
+        shape = tf.io.extract_jpeg_shape(contents)
+        ratio = jpeg_ratio(shape[0], shape[1], target_size)
+
+        # `ratio` is an op attribute, one branch per scale
+        branches = {
+            r: (lambda r=r: tf.io.decode_jpeg(contents, channels=3, ratio=r))
+            for r in JPEG_RATIOS
+        }
+        img = tf.case(
+            [(tf.equal(ratio, r), branches[r]) for r in JPEG_RATIOS[:-1]],
+            default=branches[1]
+        )
+        img.set_shape([None, None, 3])
+        return tf.image.resize(img, target_size)
+
+    return tf.cond(tf.io.is_jpeg(contents), jpeg, full)
+
+
+def compare_decoders(paths: list[str], target_size, tolerance: float = 4.0) -> dict:
+    """
+    Decodes `paths` with full and scaled decoding and compares them.
+
+    Returns throughput of both paths, decoded pixels per image before the
+    resize (a proxy for peak decode memory), and the mean / max absolute
+    difference of the outputs on the [0, 255] scale. `within_tolerance`
+    is True when the mean difference is at most `tolerance`.
+    """
+    encoded = [tf.io.read_file(p) for p in paths]
+    target_size = tuple(int(s) for s in target_size)
+
+    results = {}
+    outputs = {}
+    for scaled in (False, True):
+        decode = tf.function(lambda c, s=scaled: decode_resized(c, target_size, scaled=s))
+        decode(encoded[0])
+
+        start = time.perf_counter()
+        outputs[scaled] = np.stack([decode(c).numpy() for c in encoded])
+        elapsed = time.perf_counter() - start
+
+        pixels = []
+        for c in encoded:
+            if not scaled or not tf.io.is_jpeg(c):
+                shape = tf.io.decode_image(c, channels=3, expand_animations=False).shape
+                pixels.append(shape[0] * shape[1])
+            else:
+                h, w = (int(v) for v in tf.io.extract_jpeg_shape(c)[:2])
+                r = int(jpeg_ratio(h, w, target_size))
+                pixels.append(-(-h // r) * -(-w // r))
+
+        results[decoder_id(scaled)] = {
+            "images_per_sec": len(encoded) / elapsed,
+            "decoded_pixels_per_image": float(np.mean(pixels)),
+        }
+
+    diff = np.abs(outputs[True] - outputs[False])
+    results["mean_abs_diff"] = float(diff.mean())
+    results["max_abs_diff"] = float(diff.max())
+    results["within_tolerance"] = results["mean_abs_diff"] <= tolerance
+    return results
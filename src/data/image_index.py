@@ -0,0 +1,123 @@
+import os
+import json
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Same formats accepted by `image_dataset_from_directory`
+IMAGE_EXTENSIONS = (".bmp", ".gif", ".jpeg", ".jpg", ".png")
+
+
+@dataclass
+class ImageIndex:
+    """
+    Ordered listing of the images inside a class-folder dataset.
+
+    Files are enumerated the same way `image_dataset_from_directory`
+    does it (sorted class folders, sorted files), so labels line up
+    with the `class_names` exposed by `DataIngestion`.
+    """
+    paths: list[str] = field(default_factory=list)
+    labels: list[int] = field(default_factory=list)
+    class_names: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory: str,
+        class_names: list[str] | None = None
+    ) -> "ImageIndex":
+        root = Path(directory)
+        if not root.exists():
+            raise FileNotFoundError(f"Image directory not found: {root}")
+
+        if class_names is None:
+            class_names = sorted(d.name for d in root.iterdir() if d.is_dir())
+
+        index = cls(class_names=list(class_names))
+
+        for label, class_name in enumerate(class_names):
+            class_files = []
+            for dirpath, _, filenames in os.walk(root / class_name):
+                for fname in filenames:
+                    if fname.lower().endswith(IMAGE_EXTENSIONS):
+                        class_files.append(os.path.join(dirpath, fname))
+
+            for path in sorted(class_files):
+                index.paths.append(path)
+                index.labels.append(label)
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def content_fingerprint(self, memo_path: str | Path | None = None) -> str:
+        """
+        Hash of every file's content and label.
+
+        Any added, removed, relabelled or modified image changes
+        the fingerprint. With `memo_path`, per-file hashes are kept in
+        that JSON file by path, size and mtime, so unchanged images are
+        not read again on later runs.
+        """
+        memo = _load_hash_memo(memo_path)
+        changed = False
+
+        digest = hashlib.sha256()
+        for path, label in zip(self.paths, self.labels):
+            stat = os.stat(path)
+            entry = memo.get(path)
+            if entry is None or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+                entry = [stat.st_size, stat.st_mtime_ns, file_sha256(path)]
+                memo[path] = entry
+                changed = True
+            digest.update(entry[2].encode())
+            digest.update(str(label).encode())
+
+        if memo_path is not None and changed:
+            _save_hash_memo(memo_path, memo)
+        return digest.hexdigest()
+
+    def stat_fingerprint(self) -> str:
+        """
+        Cheap fingerprint from path, label, size and mtime of every file.
+        """
+        digest = hashlib.sha256()
+        for path, label in zip(self.paths, self.labels):
+            stat = os.stat(path)
+            digest.update(
+                f"{path}|{label}|{stat.st_size}|{stat.st_mtime_ns}".encode()
+            )
+        return digest.hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_hash_memo(memo_path) -> dict:
+    if memo_path is None or not Path(memo_path).exists():
+        return {}
+    try:
+        with open(memo_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_hash_memo(memo_path, memo: dict) -> None:
+    memo_path = Path(memo_path)
+    memo_path.parent.mkdir(parents=True, exist_ok=True)
+    # replaced in whole, concurrent runs never read a partial file
+    tmp_path = memo_path.with_name(f"{memo_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(memo, f)
+    os.replace(tmp_path, memo_path)
@@ -1,7 +1,10 @@
 # src/entity/data_ingestion_entity.py
+from __future__ import annotations
 from dataclasses import dataclass
-import tensorflow as tf
-from typing import List
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import tensorflow as tf
 
 @dataclass
 class DataIngestionArtifact:
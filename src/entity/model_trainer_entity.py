@@ -1,10 +1,16 @@
 # src/entity/model_trainer_entity.py
-import tensorflow as tf
-from typing import Optional
+from __future__ import annotations
+from typing import Optional, TYPE_CHECKING
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    import tensorflow as tf
+
 @dataclass
 class ModelTrainerArtifact:
     model: tf.keras.Model
     history: object
     model_path: Optional[str] = None
+    mlflow_run_id: Optional[str] = None
+    # set when the model was distilled from a teacher
+    teacher_model_path: Optional[str] = None
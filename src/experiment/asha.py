@@ -0,0 +1,144 @@
+import os
+import json
+from pathlib import Path
+
+import tensorflow as tf
+
+from src.utilities.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def asha_milestones(min_epochs: int, reduction_factor: int, max_epochs: int) -> list[int]:
+    """
+    Epochs at which a trial is compared against the others:
+    min_epochs * reduction_factor ** k, below max_epochs.
+    """
+    milestones = []
+    epoch = min_epochs
+    while epoch < max_epochs:
+        milestones.append(epoch)
+        epoch *= reduction_factor
+    return milestones
+
+
+class AshaPruner:
+    """
+    Asynchronous successive halving (ASHA, Li et al. 2018), stopping variant.
+
+    Every trial records its metric when it reaches a milestone epoch and
+    continues only if it is in the best 1 / reduction_factor of all
+    values recorded at that milestone so far. Until reduction_factor
+    values exist a trial always continues.
+
+    Values are exchanged through files in `rung_dir/<milestone>/`, so
+    trials running in separate processes need no coordinator.
+    """
+
+    def __init__(
+        self,
+        rung_dir: str,
+        milestones: list[int],
+        reduction_factor: int,
+        mode: str = "min"
+    ):
+        if mode not in ("min", "max"):
+            raise ValueError(f"Unknown mode '{mode}', expected 'min' or 'max'")
+
+        self.rung_dir = Path(rung_dir)
+        self.milestones = set(milestones)
+        self.reduction_factor = reduction_factor
+        self.mode = mode
+
+    def report(self, trial_id: str, epochs_done: int, value: float) -> bool:
+        """
+        Records `value` after `epochs_done` epochs.
+        Returns False when the trial should stop.
+        """
+        if epochs_done not in self.milestones:
+            return True
+
+        milestone_dir = self.rung_dir / str(epochs_done)
+        milestone_dir.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = milestone_dir / f".{trial_id}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"trial_id": trial_id, "value": value}, f)
+        os.replace(tmp_path, milestone_dir / f"{trial_id}.json")
+
+        values = []
+        for path in milestone_dir.glob("*.json"):
+            with open(path, "r") as f:
+                values.append(json.load(f)["value"])
+
+        if len(values) < self.reduction_factor:
+            return True
+
+        ranked = sorted(values, reverse=self.mode == "max")
+        keep = max(1, len(ranked) // self.reduction_factor)
+        cutoff = ranked[keep - 1]
+
+        if self.mode == "min":
+            return value <= cutoff
+        return value >= cutoff
+
+
+class SweepTrialCallback(tf.keras.callbacks.Callback):
+    """
+    Reports the monitored metric of a sweep trial to the ASHA pruner after
+    every epoch, stops training once the trial is pruned and writes the
+    trial result to `sweep_dir/trials/<trial_id>.json`.
+    """
+
+    def __init__(self, trial_config: dict, mlflow_run_id: str | None = None):
+        super().__init__()
+        self.mlflow_run_id = mlflow_run_id
+        self.trial_id = trial_config["trial_id"]
+        self.sweep_dir = Path(trial_config["sweep_dir"])
+        self.metric = trial_config.get("metric", "val_loss")
+        self.mode = trial_config.get("mode", "min")
+
+        self.pruner = AshaPruner(
+            rung_dir=str(self.sweep_dir / "rungs"),
+            milestones=trial_config.get("milestones", []),
+            reduction_factor=trial_config.get("reduction_factor", 3),
+            mode=self.mode
+        )
+
+        self.history: list[float] = []
+        self.pruned = False
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.metric)
+        if value is None:
+            logger.warning(f"Sweep metric '{self.metric}' missing from epoch logs")
+            return
+
+        self.history.append(float(value))
+        if not self.pruner.report(self.trial_id, epoch + 1, float(value)):
+            self.pruned = True
+            self.model.stop_training = True
+            logger.info(
+                f"Trial {self.trial_id} pruned after {epoch + 1} epochs "
+                f"({self.metric}={value:.4f})"
+            )
+
+    def on_train_end(self, logs=None):
+        best = None
+        if self.history:
+            best = min(self.history) if self.mode == "min" else max(self.history)
+
+        result = {
+            "trial_id": self.trial_id,
+            "metric": self.metric,
+            "best": best,
+            "history": self.history,
+            "epochs": len(self.history),
+            "pruned": self.pruned,
+            "mlflow_run_id": self.mlflow_run_id,
+        }
+
+        trials_dir = self.sweep_dir / "trials"
+        trials_dir.mkdir(parents=True, exist_ok=True)
+        with open(trials_dir / f"{self.trial_id}.json", "w") as f:
+            json.dump(result, f, indent=2)
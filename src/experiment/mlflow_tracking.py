@@ -0,0 +1,301 @@
+import time
+import queue
+import atexit
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+import tensorflow as tf
+
+from src.utilities.utils import get_logger
+from src.training.profiling_callbacks import TrainStepCounter
+
+logger = get_logger(__name__)
+
+# MLflow log_batch limits per request
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+_STOP = object()
+
+# loggers still running, flushed by `shutdown()` / at interpreter exit
+_active_loggers: list["AsyncMlflowLogger"] = []
+
+
+class AsyncMlflowLogger:
+    """
+    Logs to one MLflow run from a background thread.
+
+    Metrics, params and tags are queued and sent with `log_batch` every
+    `flush_interval_s` seconds (or once MAX_METRICS_PER_BATCH are pending);
+    artifact and model uploads run on the same thread after the metrics
+    queued before them. Callers never wait for the tracking server: when
+    the queue is full new records are dropped and counted.
+
+    Tracking errors are logged, never raised. `close()` flushes the queue
+    and marks the run terminated.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        tracking_uri: str | None = None,
+        flush_interval_s: float = 5.0,
+        max_queue_size: int = 10000
+    ):
+        from mlflow.tracking import MlflowClient
+
+        self.run_id = run_id
+        self.client = MlflowClient(tracking_uri)
+        self.flush_interval_s = flush_interval_s
+
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.errors = 0
+        self._closed = False
+
+        self._metrics = []
+        self._params = []
+        self._tags = []
+
+        self._thread = threading.Thread(
+            target=self._work,
+            name=f"mlflow-logger-{run_id[:8]}",
+            daemon=True
+        )
+        self._thread.start()
+        _active_loggers.append(self)
+
+    @classmethod
+    def start_run(
+        cls,
+        experiment_id: str,
+        run_name: str,
+        tags: dict | None = None,
+        tracking_uri: str | None = None,
+        **kwargs
+    ) -> "AsyncMlflowLogger":
+        """
+        Creates a new run (one synchronous request) and returns its logger.
+        """
+        from mlflow.tracking import MlflowClient
+
+        run = MlflowClient(tracking_uri).create_run(
+            experiment_id, run_name=run_name, tags=tags or {}
+        )
+        return cls(run.info.run_id, tracking_uri=tracking_uri, **kwargs)
+
+    def log_metrics(self, metrics: dict, step: int = 0) -> None:
+        from mlflow.entities import Metric
+
+        timestamp = int(time.time() * 1000)
+        for key, value in metrics.items():
+            self._put(("metric", Metric(key, float(value), timestamp, step)))
+
+    def log_params(self, params: dict) -> None:
+        from mlflow.entities import Param
+
+        for key, value in params.items():
+            self._put(("param", Param(key, str(value))))
+
+    def set_tags(self, tags: dict) -> None:
+        from mlflow.entities import RunTag
+
+        for key, value in tags.items():
+            self._put(("tag", RunTag(key, str(value))))
+
+    def log_artifact(self, local_path: str, artifact_path: str | None = None) -> None:
+        self._put(("task", lambda: self.client.log_artifact(
+            self.run_id, local_path, artifact_path
+        )))
+
+    def log_model(self, model: tf.keras.Model, artifact_path: str = "model") -> None:
+        """
+        Saves `model` in the MLflow TensorFlow flavor and uploads it,
+        both on the background thread.
+        """
+        def upload():
+            import mlflow.tensorflow
+
+            with tempfile.TemporaryDirectory(prefix="mlflow_model_") as tmp:
+                local_dir = Path(tmp) / artifact_path
+                mlflow.tensorflow.save_model(model, str(local_dir))
+                self.client.log_artifacts(self.run_id, str(local_dir), artifact_path)
+
+        self._put(("task", upload))
+
+    def close(self, status: str = "FINISHED", timeout: float | None = None) -> None:
+        """
+        Flushes everything queued, waits for pending uploads and marks
+        the run `status`. Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"MLflow logger did not finish within {timeout}s")
+
+        try:
+            self.client.set_terminated(self.run_id, status=status)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not terminate MLflow run {self.run_id}: {e}")
+
+        if self.dropped or self.errors:
+            logger.warning(
+                f"MLflow logger: {self.dropped} records dropped, {self.errors} errors"
+            )
+
+        if self in _active_loggers:
+            _active_loggers.remove(self)
+
+    def _put(self, item) -> None:
+        if self._closed:
+            logger.warning("MLflow logger already closed, record dropped")
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _work(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval_s - (time.monotonic() - last_flush))
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush()
+                return
+
+            if item is not None:
+                kind, payload = item
+                if kind == "metric":
+                    self._metrics.append(payload)
+                elif kind == "param":
+                    self._params.append(payload)
+                elif kind == "tag":
+                    self._tags.append(payload)
+                else:
+                    # uploads see every metric queued before them
+                    self._flush()
+                    self._run(payload)
+
+            if (
+                len(self._metrics) >= MAX_METRICS_PER_BATCH
+                or time.monotonic() - last_flush >= self.flush_interval_s
+            ):
+                self._flush()
+                last_flush = time.monotonic()
+
+    def _flush(self) -> None:
+        for pending, limit, field in (
+            (self._params, MAX_PARAMS_PER_BATCH, "params"),
+            (self._tags, MAX_TAGS_PER_BATCH, "tags"),
+            (self._metrics, MAX_METRICS_PER_BATCH, "metrics"),
+        ):
+            while pending:
+                chunk = pending[:limit]
+                del pending[:limit]
+                self._run(lambda: self.client.log_batch(self.run_id, **{field: chunk}))
+
+    def _run(self, task) -> None:
+        try:
+            task()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"MLflow logging failed for run {self.run_id}: {e}")
+
+
+def shutdown(timeout: float | None = None) -> None:
+    """
+    Closes every running logger, waiting for queued records and uploads.
+    """
+    for tracker in list(_active_loggers):
+        tracker.close(timeout=timeout)
+
+
+atexit.register(shutdown)
+
+
+class MlflowMetricsCallback(tf.keras.callbacks.Callback):
+    """
+    Queues Keras logs on an `AsyncMlflowLogger`:
+    - every `log_every_n_steps` training steps as `step_<name>`
+      (0 disables per-step logging); steps are counted across epochs
+      (see `TrainStepCounter`), so with `steps_per_execution` > 1 the
+      logs of the execution crossing each multiple are used
+    - every epoch, with `loss` / `accuracy` renamed to
+      `train_loss` / `train_accuracy`
+    """
+
+    EPOCH_NAMES = {"loss": "train_loss", "accuracy": "train_accuracy"}
+
+    def __init__(self, tracker: AsyncMlflowLogger, log_every_n_steps: int = 0):
+        super().__init__()
+        self.tracker = tracker
+        self.log_every_n_steps = log_every_n_steps
+        self._steps = TrainStepCounter()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._steps.begin_epoch(epoch, self.params)
+
+    def on_train_batch_end(self, batch, logs=None):
+        n = self.log_every_n_steps
+        previous = self._steps.step
+        step = self._steps.end_batch(batch)
+        if n and step // n > previous // n:
+            self.tracker.log_metrics(
+                {f"step_{k}": v for k, v in (logs or {}).items()},
+                step=step
+            )
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.tracker.log_metrics(
+            {self.EPOCH_NAMES.get(k, k): v for k, v in (logs or {}).items()},
+            step=epoch
+        )
+
+
+if __name__ == "__main__":
+    # smoke test against a (local) tracking store:
+    # python -m src.experiment.mlflow_tracking --tracking-uri file:/tmp/mlruns
+    parser = argparse.ArgumentParser(prog="python -m src.experiment.mlflow_tracking")
+    parser.add_argument("--tracking-uri", default=f"file:{tempfile.mkdtemp(prefix='mlruns_')}")
+    parser.add_argument("--steps", type=int, default=5000)
+    args = parser.parse_args()
+
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient(args.tracking_uri)
+    experiment_id = client.create_experiment(f"async_logger_{int(time.time())}")
+    tracker = AsyncMlflowLogger.start_run(
+        experiment_id, "smoke", tracking_uri=args.tracking_uri, flush_interval_s=0.5
+    )
+
+    start = time.perf_counter()
+    tracker.log_params({"steps": args.steps})
+    for step in range(args.steps):
+        tracker.log_metrics({"loss": 1.0 / (step + 1)}, step=step)
+    enqueue_s = time.perf_counter() - start
+
+    tracker.close()
+    total_s = time.perf_counter() - start
+
+    logged = client.get_metric_history(tracker.run_id, "loss")
+    status = client.get_run(tracker.run_id).info.status
+    print(
+        f"{len(logged)}/{args.steps} metrics logged to {args.tracking_uri} "
+        f"(enqueue {enqueue_s * 1000:.1f} ms, total {total_s:.2f}s), run {status}"
+    )
+    if len(logged) != args.steps - tracker.dropped or status != "FINISHED":
+        raise SystemExit(1)
@@ -0,0 +1,339 @@
+import os
+import sys
+import csv
+import copy
+import json
+import math
+import random
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from src.experiment.asha import asha_milestones
+from src.utilities.utils import load_config, get_logger, load_environment
+from src.constants.paths import MODEL_PARAMS_FILE, SWEEP_CONFIG_FILE, SWEEP_DIR
+from src.constants.config_keys import (
+    DATA_CONFIG,
+    MODEL_CONFIG,
+    OPTIMIZER_CONFIG,
+    AUGMENTATION,
+    TRANSFER_LEARNING,
+    PREPROCESSING,
+    VALIDATION,
+    EXPORT,
+    PROFILING,
+    PERFORMANCE,
+    DISTRIBUTED,
+    SWEEP_TRIAL
+)
+from src.constants.training import MLFLOW_EXPERIMENT_NAME
+
+logger = get_logger(__name__)
+
+SEARCHABLE_SECTIONS = (MODEL_CONFIG, OPTIMIZER_CONFIG, AUGMENTATION, TRANSFER_LEARNING)
+
+
+def sample_params(search_space: dict, rng: random.Random) -> dict:
+    """
+    Draws one value per dotted key of the search space.
+    """
+    params = {}
+    for key, spec in search_space.items():
+        kind = spec.get("type", "choice")
+        if kind == "choice":
+            params[key] = rng.choice(spec["values"])
+        elif kind == "uniform":
+            params[key] = rng.uniform(spec["low"], spec["high"])
+        elif kind == "loguniform":
+            params[key] = math.exp(
+                rng.uniform(math.log(spec["low"]), math.log(spec["high"]))
+            )
+        elif kind == "int":
+            params[key] = rng.randint(spec["low"], spec["high"])
+        else:
+            raise ValueError(f"Unknown search space type '{kind}' for {key}")
+    return params
+
+
+def set_dotted(config: dict, key: str, value) -> None:
+    *parents, leaf = key.split(".")
+    node = config
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[leaf] = value
+
+
+class SweepRunner:
+    """
+    Runs a hyperparameter sweep over `model_parameters.yaml`.
+
+    - trials are sampled from `search_space` (dotted keys below
+      model_config, optimizer_config, augmentation and transfer_learning)
+    - up to `max_concurrent` trials run at once, each as its own
+      `python -m src.main` process limited to `threads_per_trial` threads
+    - data is validated, materialized to TFRecord shards and decoded into
+      the disk dataset cache once; trials only read that cache and share
+      the backbone feature cache
+    - losing trials are stopped early by ASHA on the per-epoch metric
+    - every trial is an MLflow child run of one sweep run, and a ranked
+      summary is written to `artifacts/sweeps/<sweep_id>/summary.csv`
+    """
+
+    def __init__(self, sweep_config_path: str = SWEEP_CONFIG_FILE):
+        self.base_config = load_config(MODEL_PARAMS_FILE)
+        self.sweep_config = load_config(sweep_config_path)
+
+        search_space = self.sweep_config.get("search_space", {})
+        for key in search_space:
+            if key.split(".")[0] not in SEARCHABLE_SECTIONS:
+                raise ValueError(
+                    f"Search space key '{key}' must start with one of {SEARCHABLE_SECTIONS}"
+                )
+        self.search_space = search_space
+
+        self.num_trials = self.sweep_config.get("num_trials", 10)
+        self.seed = self.sweep_config.get("seed", 42)
+        self.max_concurrent = self.sweep_config.get("max_concurrent", 2)
+        self.threads_per_trial = (
+            self.sweep_config.get("threads_per_trial")
+            or max(1, (os.cpu_count() or 1) // self.max_concurrent)
+        )
+        self.metric = self.sweep_config.get("metric", "val_loss")
+        self.mode = self.sweep_config.get("mode", "min")
+
+        asha_cfg = self.sweep_config.get("asha", {})
+        self.max_epochs = asha_cfg.get("max_epochs") or self.base_config[MODEL_CONFIG]["epochs"]
+        self.reduction_factor = asha_cfg.get("reduction_factor", 3)
+        self.milestones = asha_milestones(
+            asha_cfg.get("min_epochs", 1),
+            self.reduction_factor,
+            self.max_epochs
+        )
+
+        self.sweep_id = os.getenv("RUN_ID") or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.sweep_dir = Path(SWEEP_DIR) / self.sweep_id
+
+    def run(self) -> list[dict]:
+        import mlflow
+
+        load_environment()
+        mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+
+        self.sweep_dir.mkdir(parents=True, exist_ok=True)
+        self._prepare_data()
+
+        rng = random.Random(self.seed)
+        trials = [
+            {"trial_id": f"trial_{i:03d}", "params": sample_params(self.search_space, rng)}
+            for i in range(self.num_trials)
+        ]
+
+        with mlflow.start_run(run_name=f"sweep_{self.sweep_id}") as parent_run:
+            mlflow.log_params({
+                "num_trials": self.num_trials,
+                "max_concurrent": self.max_concurrent,
+                "threads_per_trial": self.threads_per_trial,
+                "metric": self.metric,
+                "asha_milestones": self.milestones,
+                "asha_reduction_factor": self.reduction_factor,
+            })
+
+            for trial in trials:
+                trial["config_path"] = self._write_trial_config(
+                    trial, parent_run.info.run_id
+                )
+
+            logger.info(
+                f"Sweep {self.sweep_id}: {self.num_trials} trials, "
+                f"{self.max_concurrent} at a time with {self.threads_per_trial} threads each, "
+                f"ASHA milestones {self.milestones}"
+            )
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+                return_codes = list(executor.map(self._run_trial, trials))
+
+            summary = self._summarize(trials, return_codes)
+            summary_path = self._write_summary(summary)
+
+            mlflow.log_artifact(str(summary_path))
+            best = next((row for row in summary if row["best"] is not None), None)
+            if best is not None:
+                mlflow.log_metric(f"best_{self.metric}", best["best"])
+                mlflow.set_tag("best_trial", best["trial_id"])
+
+        return summary
+
+    def _prepare_data(self) -> None:
+        """
+        Validates the data, writes TFRecord shards and fills the
+        preprocessed dataset cache once, so trials neither re-validate
+        nor decode and normalize the images again.
+        """
+        from src.data.data_validation import DataValidation
+        from src.data.data_materialization import DataMaterialization
+        from src.data.data_preprocessing import DataPreprocessing
+
+        data_cfg = self.base_config[DATA_CONFIG]
+
+        DataValidation().validate()
+
+        materializer = DataMaterialization()
+        train_manifest = materializer.materialize("train", data_cfg["TRAIN_DIR"])
+        test_manifest = materializer.materialize(
+            "test", data_cfg["TEST_DIR"], train_manifest["class_names"]
+        )
+
+        # same source and cache key as the trials' `DataIngestion`
+        cache_config = {**self._trial_cache_config(), "read_only": False}
+        DataPreprocessing(cache_config).fill_cache(
+            materializer.read(train_manifest, batch_size=data_cfg["BATCH_SIZE"], shuffle=False),
+            materializer.read(test_manifest, batch_size=data_cfg["BATCH_SIZE"], shuffle=False)
+        )
+
+    def _trial_cache_config(self) -> dict:
+        """
+        Disk cache filled by `_prepare_data`, read-only for the trials.
+        """
+        cache_cfg = self.base_config.get(PREPROCESSING, {}).get("cache", {})
+        return {**cache_cfg, "mode": "disk", "read_only": True}
+
+    def _write_trial_config(self, trial: dict, parent_run_id: str) -> str:
+        config = copy.deepcopy(self.base_config)
+
+        for key, value in trial["params"].items():
+            set_dotted(config, key, value)
+
+        config[MODEL_CONFIG]["epochs"] = self.max_epochs
+
+        # shared, already prepared inputs
+        config[DATA_CONFIG].setdefault("materialization", {})["enabled"] = True
+        config.setdefault(VALIDATION, {})["content_checks"] = False
+        # the prepared disk cache; trials never write it, so they cannot
+        # race filling or cleaning it up
+        config.setdefault(PREPROCESSING, {})["cache"] = self._trial_cache_config()
+
+        # per-trial CPU budget
+        perf_cfg = config.setdefault(PERFORMANCE, {})
+        profile = perf_cfg.setdefault("profiles", {}).setdefault(
+            perf_cfg.get("profile", "default"), {}
+        )
+        profile["intra_op_threads"] = self.threads_per_trial
+        profile["inter_op_threads"] = min(2, self.threads_per_trial)
+
+        config.setdefault(EXPORT, {})["enabled"] = False
+        config.setdefault(PROFILING, {}).setdefault("tf_profiler", {})["enabled"] = False
+        config.setdefault(DISTRIBUTED, {})["enabled"] = False
+
+        config[SWEEP_TRIAL] = {
+            "trial_id": trial["trial_id"],
+            "sweep_dir": str(self.sweep_dir),
+            "parent_run_id": parent_run_id,
+            "params": trial["params"],
+            "metric": self.metric,
+            "mode": self.mode,
+            "milestones": self.milestones,
+            "reduction_factor": self.reduction_factor,
+        }
+
+        config_dir = self.sweep_dir / "configs"
+        config_dir.mkdir(parents=True, exist_ok=True)
+        config_path = config_dir / f"{trial['trial_id']}.yaml"
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+
+        return str(config_path)
+
+    def _run_trial(self, trial: dict) -> int:
+        log_dir = self.sweep_dir / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        env = {
+            **os.environ,
+            "MODEL_PARAMS_FILE": trial["config_path"],
+            "RUN_ID": f"{self.sweep_id}_{trial['trial_id']}",
+            "OMP_NUM_THREADS": str(self.threads_per_trial),
+        }
+
+        logger.info(f"Starting {trial['trial_id']}: {trial['params']}")
+        with open(log_dir / f"{trial['trial_id']}.log", "w") as log_file:
+            result = subprocess.run(
+                [sys.executable, "-m", "src.main"],
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+
+        if result.returncode != 0:
+            logger.warning(
+                f"{trial['trial_id']} failed with exit code {result.returncode} "
+                f"(see {log_dir / (trial['trial_id'] + '.log')})"
+            )
+        return result.returncode
+
+    def _summarize(self, trials: list[dict], return_codes: list[int]) -> list[dict]:
+        rows = []
+        for trial, code in zip(trials, return_codes):
+            result_path = self.sweep_dir / "trials" / f"{trial['trial_id']}.json"
+            result = {}
+            if result_path.exists():
+                with open(result_path, "r") as f:
+                    result = json.load(f)
+
+            if code != 0:
+                status = "failed"
+            elif result.get("pruned"):
+                status = "pruned"
+            else:
+                status = "completed"
+
+            rows.append({
+                "trial_id": trial["trial_id"],
+                "status": status,
+                "best": result.get("best"),
+                "epochs": result.get("epochs", 0),
+                "mlflow_run_id": result.get("mlflow_run_id"),
+                **trial["params"],
+            })
+
+        sign = 1 if self.mode == "min" else -1
+        rows.sort(key=lambda r: (r["best"] is None, sign * (r["best"] or 0)))
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank
+
+        return rows
+
+    def _write_summary(self, summary: list[dict]) -> Path:
+        summary_path = self.sweep_dir / "summary.csv"
+        columns = ["rank", "trial_id", "status", "best", "epochs", "mlflow_run_id"]
+        columns += list(self.search_space)
+
+        with open(summary_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(summary)
+
+        print(f"\n{'rank':<6}{'trial':<12}{'status':<11}{self.metric:>12}{'epochs':>8}")
+        for row in summary:
+            best = f"{row['best']:.4f}" if row["best"] is not None else "n/a"
+            print(
+                f"{row['rank']:<6}{row['trial_id']:<12}{row['status']:<11}"
+                f"{best:>12}{row['epochs']:>8}"
+            )
+        print(f"\nSweep summary written to {summary_path}")
+
+        return summary_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m src.experiment.sweep",
+        description="Run a parallel hyperparameter sweep with ASHA early stopping."
+    )
+    parser.add_argument("--config", default=SWEEP_CONFIG_FILE)
+    args = parser.parse_args()
+
+    SweepRunner(args.config).run()
@@ -0,0 +1,194 @@
+import time
+import asyncio
+import numpy as np
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from src.utilities.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class DynamicBatcher:
+    """
+    Groups concurrent single-image requests into micro-batches.
+
+    Requests are queued and drained into a batch until either
+    `max_batch_size` images are collected or `max_wait_ms` has passed
+    since the first image of the batch arrived. The batch runs through
+    `predict_fn` in one forward pass on a dedicated thread, and each
+    caller receives its own row of the output.
+
+    With `concurrency` > 1 (e.g. an `InferenceWorkerPool`), up to that
+    many batches run at once, each on its own thread; the next batch is
+    only collected once a thread is free.
+
+    `stop` lets batches already running finish and fails every request
+    that has not reached `predict_fn` yet.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 1024,
+        latency_window: int = 10000,
+        concurrency: int = 1
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.concurrency = concurrency
+
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self._closed = False
+        # by default a single thread keeps forward passes serialized and off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batcher")
+
+        self._batch_sizes = Counter()
+        self._latencies = deque(maxlen=latency_window)
+        self._requests = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Dynamic batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f}, concurrency={self.concurrency})"
+        )
+
+    async def stop(self) -> None:
+        self._closed = True
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._fail_queued()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        logger.info("Dynamic batcher stopped")
+
+    async def submit(self, image: np.ndarray) -> np.ndarray:
+        """
+        Queues one preprocessed image and waits for its output row.
+        """
+        if self._queue is None:
+            raise RuntimeError("Batcher must be started before submitting")
+        if self._closed:
+            raise RuntimeError("Batcher is stopped")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future, time.perf_counter()))
+        if self._closed:
+            # queued after stop() drained the queue (it was full)
+            self._fail_queued()
+        return await future
+
+    def _fail_queued(self, batch: list | None = None) -> None:
+        """
+        Fails the requests of `batch` and every request still queued.
+        """
+        pending = list(batch or [])
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped before the request was scored"))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # a free slot first, so requests keep accumulating while all are busy
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            try:
+                while len(batch) < self.max_batch_size:
+                    # take whatever is already queued without waiting
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # stopped while collecting, these requests left the queue already
+                self._fail_queued(batch)
+                raise
+
+            task = asyncio.create_task(self._process(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _process(self, batch: list) -> None:
+        try:
+            await self._predict(batch)
+        finally:
+            self._slots.release()
+
+    async def _predict(self, batch: list) -> None:
+        images = np.stack([item[0] for item in batch])
+
+        try:
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.predict_fn, images
+            )
+        except Exception as e:
+            logger.error(f"Batch inference failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        done = time.perf_counter()
+        self._batch_sizes[len(batch)] += 1
+        self._requests += len(batch)
+
+        for (_, future, enqueued), output in zip(batch, outputs):
+            self._latencies.append(done - enqueued)
+            if not future.done():
+                future.set_result(output)
+
+    def stats(self) -> dict:
+        """
+        Serving metrics used to tune batch size and wait time.
+        """
+        latencies_ms = np.asarray(self._latencies) * 1000.0
+        percentiles = {}
+        if len(latencies_ms):
+            percentiles = {
+                f"p{q}": float(np.percentile(latencies_ms, q))
+                for q in (50, 90, 99)
+            }
+
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "requests": self._requests,
+            "batches": sum(self._batch_sizes.values()),
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "latency_ms": percentiles
+        }
@@ -0,0 +1,96 @@
+import argparse
+from pathlib import Path
+
+from src.inference.predictor import ModelInference, resolve_class_names
+from src.inference.model_manager import get_model_manager, model_spec
+from src.inference.prediction_cache import PredictionCache
+from src.inference.tta import TestTimeAugmentation
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE
+from src.constants.config_keys import SERVING, INFERENCE, AUGMENTATION
+
+logger = get_logger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.inference.cli",
+        description="Run inference with a trained brain tumor classifier."
+    )
+    parser.add_argument(
+        "--model",
+        help=(
+            "latest, best, a RUN_ID, a .keras / .tflite path or an MLflow "
+            "models:/ URI (default: serving.model_path or serving.model)"
+        )
+    )
+
+    parser.add_argument(
+        "--tta",
+        type=int,
+        metavar="VIEWS",
+        help="test-time augmentation with VIEWS views per image (default: inference.tta)"
+    )
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    predict = sub.add_parser("predict", help="Classify a single image")
+    predict.add_argument("image", type=Path)
+
+    predict_many = sub.add_parser(
+        "predict-many",
+        help="Classify a list of images, a directory or a glob pattern"
+    )
+    predict_many.add_argument(
+        "sources", nargs="+",
+        help="Image files, directories or glob patterns"
+    )
+    predict_many.add_argument(
+        "--output", type=Path, required=True,
+        help="*.csv file or a Parquet part directory (resumable)"
+    )
+    predict_many.add_argument("--batch-size", type=int)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    config = load_config(MODEL_PARAMS_FILE)
+    serving_cfg = dict(config.get(SERVING, {}))
+    if args.model:
+        serving_cfg["model_path"] = args.model
+
+    # heavy imports happen here, after argument parsing
+    model_artifact = get_model_manager().load(model_spec(serving_cfg)).artifact()
+    class_names = resolve_class_names(config)
+
+    tta_cfg = dict(config.get(INFERENCE, {}).get("tta", {}))
+    if args.tta:
+        tta_cfg.update(enabled=True, num_views=args.tta)
+
+    inference = ModelInference(
+        cache=PredictionCache.from_config(
+            config.get(INFERENCE, {}).get("prediction_cache", {})
+        ),
+        tta=TestTimeAugmentation.from_config(tta_cfg, config.get(AUGMENTATION, {}))
+    )
+
+    if args.command == "predict":
+        label, confidence = inference.predict(model_artifact, class_names, args.image)
+        print(f"{args.image}\t{label}\t{confidence:.4f}")
+
+    elif args.command == "predict-many":
+        batch_size = args.batch_size or config.get(INFERENCE, {}).get("batch_size", 128)
+        inference.predict_many(
+            model_artifact,
+            class_names,
+            args.sources,
+            args.output,
+            batch_size=batch_size
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import csv
+import re
+import time
+import threading
+import numpy as np
+from pathlib import Path
+from dataclasses import dataclass, field
+
+from src.inference.predictor import load_inference_model, make_predict_fn
+from src.inference.prediction_cache import model_version
+from src.entity.model_trainer_entity import ModelTrainerArtifact
+from src.utilities.utils import get_logger, load_environment
+from src.constants.paths import MODEL_DIR, ARTIFACTS_DIR
+from src.constants.training import DEFAULT_INPUT_SHAPE
+
+logger = get_logger(__name__)
+
+MLFLOW_URI_PREFIXES = ("models:/", "runs:/")
+
+
+@dataclass
+class LoadedModel:
+    """
+    A model loaded, warmed up and ready to be shared between threads.
+    """
+    spec: str
+    path: Path
+    model: object
+    predict_fn: object
+    version: str
+    loaded_at: float = field(default_factory=time.time)
+
+    def artifact(self) -> ModelTrainerArtifact:
+        """
+        The model as the `ModelTrainerArtifact` expected by `ModelInference`.
+        """
+        return ModelTrainerArtifact(
+            model=self.model,
+            history=None,
+            model_path=str(self.path)
+        )
+
+    def info(self) -> dict:
+        return {
+            "spec": self.spec,
+            "model_path": str(self.path),
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelManager:
+    """
+    Loads models once and shares them between callers.
+
+    A model is requested by spec:
+    - "latest": most recent `.keras` file in MODEL_DIR
+    - "best": the model in MODEL_DIR with the highest test accuracy
+      in its `classification_report_<run_id>.csv`
+    - a RUN_ID: `MODEL_DIR/<run_id>.keras`
+    - a path to a `.keras` / `.tflite` file
+    - an MLflow URI (`models:/<name>/<version or stage>`, `runs:/<id>/model`),
+      downloaded once to `artifacts/registry`
+
+    Each model file is loaded and warmed up (forward passes at
+    `warmup_batch_sizes`, so graph tracing happens before the first
+    request) at most once, even when several threads ask for it at the
+    same time.
+
+    `activate(spec)` makes a model the current one. The new model is fully
+    loaded before the reference is swapped, and callers that already hold
+    the previous `LoadedModel` finish with it, so in-flight requests are
+    never dropped during a hot swap.
+    """
+
+    def __init__(
+        self,
+        warmup_batch_sizes: tuple = (1,),
+        num_threads: int | None = None
+    ):
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes)
+        self.num_threads = num_threads
+
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._models: dict[str, LoadedModel] = {}
+        self._current: LoadedModel | None = None
+        self.swaps = 0
+
+    @property
+    def current(self) -> LoadedModel:
+        loaded = self._current
+        if loaded is None:
+            raise RuntimeError("No model activated, call activate() first")
+        return loaded
+
+    def predict(self, images) -> np.ndarray:
+        """
+        Runs a batch through the current model. The reference is read
+        once, so a concurrent swap does not affect a running call.
+        """
+        return self.current.predict_fn(images)
+
+    def load(self, spec: str = "latest") -> LoadedModel:
+        """
+        Returns the model for `spec`, loading and warming it up on first use.
+        """
+        path = self.resolve(spec)
+        key = str(path.resolve())
+
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is not None and loaded.version == model_version(path):
+                return loaded
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # one load per file; other threads asking for it wait here
+        with load_lock:
+            with self._lock:
+                loaded = self._models.get(key)
+            if loaded is not None and loaded.version == model_version(path):
+                return loaded
+
+            loaded = self._load(spec, path)
+            with self._lock:
+                self._models[key] = loaded
+            return loaded
+
+    def activate(self, spec: str = "latest") -> LoadedModel:
+        """
+        Loads `spec` and makes it the current model. Returns it.
+        """
+        loaded = self.load(spec)
+
+        with self._lock:
+            previous = self._current
+            self._current = loaded
+            if previous is not None and previous is not loaded:
+                self.swaps += 1
+                # drop our reference; callers still holding it finish normally
+                if self._models.get(str(previous.path.resolve())) is previous:
+                    del self._models[str(previous.path.resolve())]
+
+        if previous is not None and previous is not loaded:
+            logger.info(f"Model swapped: {previous.path} -> {loaded.path}")
+        return loaded
+
+    def refresh(self) -> bool:
+        """
+        Re-resolves the spec of the current model ("latest" may now point
+        to a newer file) and activates the result if it changed.
+
+        Returns:
+            True if a different model is now current.
+        """
+        current = self.current
+        path = self.resolve(current.spec)
+        if (
+            path.resolve() == current.path.resolve()
+            and model_version(path) == current.version
+        ):
+            return False
+
+        self.activate(current.spec)
+        return True
+
+    def stats(self) -> dict:
+        stats = {"swaps": self.swaps, "loaded_models": len(self._models)}
+        if self._current is not None:
+            stats.update(self._current.info())
+        return stats
+
+    def _load(self, spec: str, path: Path) -> LoadedModel:
+        logger.info(f"Loading model '{spec}' from {path}")
+        start = time.perf_counter()
+
+        model = load_inference_model(path, num_threads=self.num_threads)
+        predict_fn = make_predict_fn(model)
+
+        for batch_size in self.warmup_batch_sizes:
+            predict_fn(np.zeros((batch_size, *DEFAULT_INPUT_SHAPE), dtype=np.float32))
+
+        logger.info(
+            f"Model loaded and warmed up in {time.perf_counter() - start:.2f}s "
+            f"(batch sizes {list(self.warmup_batch_sizes)})"
+        )
+        return LoadedModel(
+            spec=spec,
+            path=path,
+            model=model,
+            predict_fn=predict_fn,
+            version=model_version(path)
+        )
+
+    @classmethod
+    def resolve(cls, spec: str) -> Path:
+        """
+        Maps a model spec to a local model file (or MLflow model directory).
+        """
+        spec = str(spec)
+
+        if spec.startswith(MLFLOW_URI_PREFIXES):
+            return cls._download_mlflow_model(spec)
+
+        if spec == "latest":
+            candidates = sorted(
+                Path(MODEL_DIR).glob("*.keras"),
+                key=lambda p: p.stat().st_mtime
+            )
+            if not candidates:
+                raise FileNotFoundError(f"No trained model found in {MODEL_DIR}")
+            return candidates[-1]
+
+        if spec == "best":
+            return cls._best_local_model()
+
+        path = Path(spec)
+        if path.exists():
+            return path
+
+        path = Path(MODEL_DIR) / f"{spec}.keras"
+        if path.exists():
+            return path
+
+        raise FileNotFoundError(
+            f"Model '{spec}' is neither a file nor a run in {MODEL_DIR}"
+        )
+
+    @staticmethod
+    def _best_local_model() -> Path:
+        best_path, best_accuracy = None, None
+
+        report_dir = Path(ARTIFACTS_DIR) / "evaluation"
+        for report_path in report_dir.glob("classification_report_*.csv"):
+            run_id = report_path.stem[len("classification_report_"):]
+            model_path = Path(MODEL_DIR) / f"{run_id}.keras"
+            if not model_path.exists():
+                continue
+
+            accuracy = _report_accuracy(report_path)
+            if accuracy is not None and (best_accuracy is None or accuracy > best_accuracy):
+                best_path, best_accuracy = model_path, accuracy
+
+        if best_path is None:
+            raise FileNotFoundError(
+                f"No model in {MODEL_DIR} has an evaluation report in {report_dir}"
+            )
+
+        logger.info(f"Best model: {best_path} (test accuracy {best_accuracy:.4f})")
+        return best_path
+
+    @staticmethod
+    def _download_mlflow_model(uri: str) -> Path:
+        import mlflow
+
+        load_environment()
+
+        # registry stages move between versions; pin what they point to now
+        if uri.startswith("models:/"):
+            name, _, ref = uri[len("models:/"):].partition("/")
+            if ref and not ref.isdigit():
+                client = mlflow.tracking.MlflowClient()
+                versions = client.get_latest_versions(name, stages=[ref])
+                if not versions:
+                    raise FileNotFoundError(f"No version of '{name}' in stage '{ref}'")
+                uri = f"models:/{name}/{versions[0].version}"
+
+        target = Path(ARTIFACTS_DIR) / "registry" / re.sub(r"[^\w.-]+", "_", uri)
+        mlmodel = next(target.rglob("MLmodel"), None)
+        if mlmodel is None:
+            target.mkdir(parents=True, exist_ok=True)
+            mlflow.artifacts.download_artifacts(artifact_uri=uri, dst_path=str(target))
+            mlmodel = next(target.rglob("MLmodel"), None)
+            if mlmodel is None:
+                raise FileNotFoundError(f"{uri} is not an MLflow model")
+
+        return mlmodel.parent
+
+
+def model_spec(serving_cfg: dict) -> str:
+    """
+    The model to serve: `serving.model_path` if set, otherwise
+    `serving.model` ("latest" by default).
+    """
+    return str(serving_cfg.get("model_path") or serving_cfg.get("model") or "latest")
+
+
+def _report_accuracy(report_path: Path) -> float | None:
+    with open(report_path, newline="") as f:
+        for row in csv.reader(f):
+            if row and row[0] == "accuracy":
+                return float(row[1])
+    return None
+
+
+_manager: ModelManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager(**kwargs) -> ModelManager:
+    """
+    Process-wide model manager, created with `kwargs` on first use.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager(**kwargs)
+        return _manager
@@ -0,0 +1,256 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+
+from src.utilities.utils import get_logger
+from src.constants.paths import PREDICTION_CACHE_FILE
+
+logger = get_logger(__name__)
+
+
+def model_version(model_path, variant: str = "") -> str:
+    """
+    Identifies the exact model file: path, size and modification time,
+    plus `variant` for settings that change the outputs (e.g. TTA).
+    """
+    stat = os.stat(model_path)
+    return hashlib.sha256(
+        f"{Path(model_path).resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{variant}".encode()
+    ).hexdigest()[:16]
+
+
+class PredictionCache:
+    """
+    Caches class probabilities keyed by (image content hash, model version).
+
+    Tiers:
+    - memory: in-process LRU of `max_memory_entries` entries
+    - disk: SQLite file shared between processes and restarts, trimmed to
+      `max_disk_mb` by evicting the least recently used rows
+
+    `use_model(path)` binds the cache to a model file. When the file
+    changes (size / mtime), both tiers are purged of the old version;
+    this is checked at most every `version_check_interval_s` seconds.
+
+    Callers pass the version `use_model` returned before scoring to
+    `get` and `put`; `put` drops the result when the cache has been bound
+    to another version in the meantime (e.g. a model reload while the
+    image was scored), so probabilities are never stored under a model
+    that did not produce them.
+
+    Image hashes of files are memoized by (path, size, mtime), so a
+    repeated request for the same file does not re-read it.
+    """
+
+    def __init__(
+        self,
+        disk_path: str | None = PREDICTION_CACHE_FILE,
+        max_memory_entries: int = 10000,
+        max_disk_mb: float = 512,
+        version_check_interval_s: float = 1.0
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = int(max_disk_mb * 1024 ** 2)
+        self.version_check_interval_s = version_check_interval_s
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._file_hashes: dict[str, tuple[int, int, str]] = {}
+
+        self.model_path = None
+        self.variant = ""
+        self.model_version = None
+        self._last_version_check = 0.0
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self._db = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS predictions (
+                    image_hash TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    probabilities BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (image_hash, model_version)
+                )
+                """
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_config(cls, cache_cfg: dict) -> "PredictionCache | None":
+        """
+        Builds the cache from `inference.prediction_cache`,
+        None when it is disabled.
+        """
+        if not cache_cfg.get("enabled", False):
+            return None
+        return cls(
+            disk_path=cache_cfg.get("disk_path", PREDICTION_CACHE_FILE),
+            max_memory_entries=cache_cfg.get("max_memory_entries", 10000),
+            max_disk_mb=cache_cfg.get("max_disk_mb", 512),
+            version_check_interval_s=cache_cfg.get("version_check_interval_s", 1.0)
+        )
+
+    def use_model(self, model_path, variant: str = "") -> str:
+        """
+        Binds the cache to `model_path` (scored with `variant` settings),
+        invalidating entries of any other version of the model.
+        Returns the bound version.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if (
+                self.model_path == str(model_path)
+                and self.variant == variant
+                and now - self._last_version_check < self.version_check_interval_s
+            ):
+                return self.model_version
+
+        version = model_version(model_path, variant)
+        with self._lock:
+            self._last_version_check = now
+            self.model_path = str(model_path)
+            self.variant = variant
+            if version == self.model_version:
+                return version
+
+            if self.model_version is not None:
+                logger.info(f"Model changed ({self.model_version} -> {version}), cache invalidated")
+            self.model_version = version
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM predictions WHERE model_version != ?", (version,)
+                )
+                self._db.commit()
+            return version
+
+    def hash_file(self, path) -> str:
+        path = str(path)
+        stat = os.stat(path)
+        memo = self._file_hashes.get(path)
+        if memo is not None and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+
+        with open(path, "rb") as f:
+            digest = self.hash_bytes(f.read())
+        self._file_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, image_hash: str, version: str | None = None) -> np.ndarray | None:
+        """
+        Cached probabilities of `image_hash` under `version`
+        (default: the bound one).
+        """
+        if self.model_version is None:
+            raise RuntimeError("Call use_model() before using the prediction cache")
+
+        with self._lock:
+            if version is not None and version != self.model_version:
+                self.misses += 1
+                return None
+
+            probs = self._memory.get(image_hash)
+            if probs is not None:
+                self._memory.move_to_end(image_hash)
+                self.hits_memory += 1
+                return probs
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT probabilities FROM predictions "
+                    "WHERE image_hash = ? AND model_version = ?",
+                    (image_hash, self.model_version)
+                ).fetchone()
+                if row is not None:
+                    probs = np.frombuffer(row[0], dtype=np.float32)
+                    self._db.execute(
+                        "UPDATE predictions SET last_access = ? "
+                        "WHERE image_hash = ? AND model_version = ?",
+                        (time.time(), image_hash, self.model_version)
+                    )
+                    self._db.commit()
+                    self._remember(image_hash, probs)
+                    self.hits_disk += 1
+                    return probs
+
+            self.misses += 1
+            return None
+
+    def put(self, image_hash: str, probabilities, version: str | None = None) -> None:
+        """
+        Stores probabilities scored by model `version`; skipped when the
+        cache has been bound to another version since.
+        """
+        probs = np.asarray(probabilities, dtype=np.float32).copy()
+        probs.setflags(write=False)
+
+        with self._lock:
+            if version is not None and version != self.model_version:
+                logger.debug("Model changed while scoring, prediction not cached")
+                return
+
+            self._remember(image_hash, probs)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                    (image_hash, self.model_version, probs.tobytes(), time.time())
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "model_version": self.model_version,
+            "memory_entries": len(self._memory),
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, image_hash: str, probs: np.ndarray) -> None:
+        self._memory[image_hash] = probs
+        self._memory.move_to_end(image_hash)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        # pages in use; freed pages are reused, the file itself does not shrink
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        if (page_count - free_pages) * page_size <= self.max_disk_bytes:
+            return
+
+        count = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        # drop the least recently used quarter in one go
+        self._db.execute(
+            "DELETE FROM predictions WHERE rowid IN ("
+            "SELECT rowid FROM predictions ORDER BY last_access LIMIT ?)",
+            (max(1, count // 4),)
+        )
@@ -1,15 +1,52 @@
+import io
+import os
+import glob
 import numpy as np
 from pathlib import Path
-from tensorflow.keras.preprocessing.image import load_img, img_to_array
+from src.data.image_index import IMAGE_EXTENSIONS
+from src.inference.result_writers import get_result_writer
+from src.inference.prediction_cache import PredictionCache
+from src.inference.tta import TestTimeAugmentation
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE
 from src.constants.training import DEFAULT_INPUT_SHAPE
+from src.constants.config_keys import DATA_CONFIG, SERVING
 from src.entity.model_trainer_entity import ModelTrainerArtifact
 
+logger = get_logger(__name__)
+
 
 class ModelInference:
     """
-    Handles single-image inference using a trained model.
+    Handles single-image and batched inference using a trained model.
+
+    With a `PredictionCache`, `predict` returns cached probabilities for
+    images (by content) already scored by the same model file.
+
+    With `TestTimeAugmentation`, every prediction averages (or maxes) the
+    probabilities of several augmented views, scored in one forward pass.
+
+    Images are decoded with the training settings (`IMG_SIZE`,
+    `scaled_jpeg_decode`), so served inputs match the trained ones.
     """
 
+    def __init__(
+        self,
+        cache: PredictionCache | None = None,
+        tta: TestTimeAugmentation | None = None
+    ):
+        """
+        Configuration keys used:
+        - data_config.IMG_SIZE
+        - data_config.scaled_jpeg_decode
+        """
+        data_cfg = load_config(MODEL_PARAMS_FILE)[DATA_CONFIG]
+
+        self.cache = cache
+        self.tta = tta
+        self.img_size = tuple(data_cfg.get("IMG_SIZE", DEFAULT_INPUT_SHAPE[:2]))
+        self.scaled_decode = data_cfg.get("scaled_jpeg_decode", True)
+
     def predict(
         self,
         model_artifact: ModelTrainerArtifact,
@@ -26,14 +63,282 @@ class ModelInference:
         if model_artifact.model is None:
             raise RuntimeError("Model not loaded")
 
-        img = load_img(
-            img_path,
-            target_size=DEFAULT_INPUT_SHAPE[:2]
-        )
-        img = img_to_array(img) / 255.0
+        # in-memory models without a file have no version to key on
+        use_cache = self.cache is not None and model_artifact.model_path is not None
+        if use_cache:
+            version = self.cache.use_model(model_artifact.model_path, variant=self.cache_variant())
+            image_hash = self.cache.hash_file(img_path)
+            probs = self.cache.get(image_hash, version)
+            if probs is not None:
+                idx = int(np.argmax(probs))
+                return class_names[idx], float(probs[idx])
+
+        img = self.load_image(img_path)
         img = np.expand_dims(img, axis=0)
 
-        preds = model_artifact.model.predict(img)
+        if self.tta is not None:
+            preds = self.tta.predict(
+                lambda x: np.asarray(model_artifact.model(x, training=False)), img
+            )
+        else:
+            preds = model_artifact.model.predict(img)
         idx = int(np.argmax(preds))
 
+        if use_cache:
+            self.cache.put(image_hash, preds[0], version)
+
         return class_names[idx], float(preds[0][idx])
+
+    def predict_batch(
+        self,
+        model_artifact: ModelTrainerArtifact,
+        class_names: list[str],
+        images: np.ndarray
+    ) -> list[tuple[str, float]]:
+        """
+        Runs one forward pass over a batch of preprocessed images
+        (N, H, W, 3) and returns (class, confidence) per image.
+        Works with Keras and TFLite models.
+        """
+        if model_artifact.model is None:
+            raise RuntimeError("Model not loaded")
+
+        predict_fn = lambda x: np.asarray(model_artifact.model(x, training=False))
+        if self.tta is not None:
+            preds = self.tta.predict(predict_fn, images)
+        else:
+            preds = predict_fn(images)
+        idx = preds.argmax(axis=1)
+
+        return [
+            (class_names[i], float(p[i]))
+            for i, p in zip(idx, preds)
+        ]
+
+    def predict_many(
+        self,
+        model_artifact: ModelTrainerArtifact,
+        class_names: list[str],
+        source,
+        output_path: Path,
+        batch_size: int = 128
+    ) -> int:
+        """
+        Scores many images and streams the results to disk.
+
+        Args:
+            source: a directory (searched recursively), a glob pattern,
+                an image path, or a list of any of these.
+            output_path: `*.csv` file, or a directory of Parquet parts.
+            batch_size: images per forward pass (with TTA, divided by
+                the number of views).
+
+        Files are read, decoded and resized in parallel by `tf.data`
+        (as in `DataIngestion`). Results are written after every
+        batch; images already present in `output_path` are skipped, so a
+        crashed job resumes by calling this again with the same arguments.
+
+        Returns:
+            Number of images scored in this call.
+        """
+        if model_artifact.model is None:
+            raise RuntimeError("Model not loaded")
+
+        columns = ["path", "predicted_class", "confidence"] + [
+            f"prob_{name}" for name in class_names
+        ]
+        writer = get_result_writer(output_path, columns)
+
+        paths = self.resolve_sources(source)
+        done = writer.completed_paths()
+        pending = [p for p in paths if p not in done]
+
+        logger.info(
+            f"Batch prediction: {len(paths)} images found, "
+            f"{len(paths) - len(pending)} already scored"
+        )
+        if not pending:
+            return 0
+
+        import tensorflow as tf
+
+        predict_fn = make_predict_fn(model_artifact.model)
+        if self.tta is not None:
+            model_predict = predict_fn
+            predict_fn = lambda images: self.tta.predict(model_predict, images)
+            batch_size = max(1, batch_size // self.tta.num_views)
+
+        ds = tf.data.Dataset.from_tensor_slices(pending).map(
+            lambda path: (path, self._decode_path(path)),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=False
+        ).ignore_errors().batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+        scored = 0
+        try:
+            for batch_paths, images in ds:
+                probs = predict_fn(images)
+                idx = probs.argmax(axis=1)
+
+                rows = []
+                for path, i, p in zip(batch_paths.numpy(), idx, probs):
+                    row = {
+                        "path": path.decode("utf-8"),
+                        "predicted_class": class_names[i],
+                        "confidence": float(p[i])
+                    }
+                    row.update({
+                        f"prob_{name}": float(v)
+                        for name, v in zip(class_names, p)
+                    })
+                    rows.append(row)
+
+                writer.write(rows)
+                scored += len(rows)
+        finally:
+            writer.close()
+
+        skipped = len(pending) - scored
+        if skipped:
+            logger.warning(f"{skipped} images could not be decoded and were skipped")
+
+        logger.info(f"Batch prediction complete: {scored} images scored")
+
+        return scored
+
+    def cache_variant(self) -> str:
+        """
+        Scoring settings besides the model file that change predictions.
+        """
+        from src.data.image_decoding import decoder_id
+
+        tta = self.tta.signature() if self.tta is not None else ""
+        return f"{tta}|{decoder_id(self.scaled_decode)}|{self.img_size}"
+
+    @staticmethod
+    def resolve_sources(source) -> list[str]:
+        """
+        Expands a directory, a glob pattern or a file into a sorted list
+        of image file paths; a list of sources is expanded element by
+        element and concatenated in order.
+        """
+        if isinstance(source, (list, tuple)):
+            paths = []
+            for item in source:
+                expanded = ModelInference.resolve_sources(str(item))
+                if not expanded:
+                    logger.warning(f"No images found for {item}")
+                paths.extend(expanded)
+            return paths
+
+        source = str(source)
+
+        if os.path.isdir(source):
+            paths = []
+            for dirpath, _, filenames in os.walk(source):
+                paths.extend(
+                    os.path.join(dirpath, f)
+                    for f in filenames
+                    if f.lower().endswith(IMAGE_EXTENSIONS)
+                )
+            return sorted(paths)
+
+        if os.path.isfile(source):
+            return [source]
+
+        return sorted(
+            p for p in glob.glob(source, recursive=True)
+            if os.path.isfile(p)
+        )
+
+    def _decode_path(self, path):
+        import tensorflow as tf
+        from src.data.image_decoding import decode_resized
+
+        img = decode_resized(tf.io.read_file(path), self.img_size, self.scaled_decode)
+        return img / 255.0
+
+    def load_image(self, img_path) -> np.ndarray:
+        """
+        Loads an image (path or file-like object) as a normalized
+        float32 array of shape (*IMG_SIZE, 3), decoded and resized
+        like the training images (`scaled_jpeg_decode`).
+        """
+        import tensorflow as tf
+        from src.data.image_decoding import decode_resized
+
+        if hasattr(img_path, "read"):
+            data = img_path.read()
+        else:
+            data = Path(img_path).read_bytes()
+
+        img = decode_resized(tf.constant(data), self.img_size, self.scaled_decode)
+        return img.numpy() / 255.0
+
+    def decode_image_bytes(self, data: bytes) -> np.ndarray:
+        """
+        Same preprocessing as `load_image`, for in-memory image bytes.
+        """
+        return self.load_image(io.BytesIO(data))
+
+
+def resolve_class_names(config: dict) -> list[str]:
+    """
+    Returns the class labels used at serving time.
+
+    Taken from `serving.class_names` when set, otherwise inferred from
+    the training directory the same way `DataIngestion` does.
+    """
+    class_names = config.get(SERVING, {}).get("class_names")
+    if class_names:
+        return list(class_names)
+
+    train_dir = Path(config[DATA_CONFIG]["TRAIN_DIR"])
+    if not train_dir.exists():
+        raise FileNotFoundError(
+            f"Cannot infer class names, train dir not found: {train_dir}"
+        )
+
+    return sorted(d.name for d in train_dir.iterdir() if d.is_dir())
+
+
+def load_inference_model(model_path, num_threads: int | None = None):
+    """
+    Loads a `.keras` model, a `.tflite` export or an MLflow TensorFlow
+    model directory behind the same inference interface
+    (`predict` / `model(x, training=False)`).
+    """
+    model_path = Path(model_path)
+    if model_path.suffix == ".tflite":
+        from src.inference.tflite_model import TFLiteModel
+        return TFLiteModel(model_path, num_threads=num_threads)
+
+    if (model_path / "MLmodel").exists():
+        import mlflow.tensorflow
+        return mlflow.tensorflow.load_model(str(model_path))
+
+    import tensorflow as tf
+    return tf.keras.models.load_model(model_path)
+
+
+def make_predict_fn(model):
+    """
+    Returns a callable mapping an image batch to a probability array.
+
+    Keras models are wrapped in a `tf.function` so repeated calls skip
+    the Python-level `predict` overhead; TFLite models are called directly.
+    """
+    from src.inference.tflite_model import TFLiteModel
+    if isinstance(model, TFLiteModel):
+        return model.predict
+
+    import tensorflow as tf
+    predict_step = tf.function(
+        lambda x: model(x, training=False),
+        reduce_retracing=True
+    )
+
+    def predict_fn(images) -> np.ndarray:
+        return predict_step(images).numpy()
+
+    return predict_fn
@@ -0,0 +1,108 @@
+import os
+import csv
+from pathlib import Path
+
+
+class CsvResultWriter:
+    """
+    Appends prediction rows to a CSV file, flushing after every batch.
+
+    Rows already present in the file are reported by `completed_paths`
+    so an interrupted job can resume where it stopped.
+    """
+
+    def __init__(self, output_path: Path, columns: list[str]):
+        self.output_path = Path(output_path)
+        self.columns = columns
+        self._file = None
+        self._writer = None
+
+    def completed_paths(self) -> set[str]:
+        if not self.output_path.exists():
+            return set()
+
+        self._drop_partial_row()
+
+        done = set()
+        with open(self.output_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                done.add(row["path"])
+        return done
+
+    def _drop_partial_row(self) -> None:
+        """
+        Removes a trailing row left without its newline by a crash.
+        """
+        with open(self.output_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write(self, rows: list[dict]) -> None:
+        if self._file is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            new_file = not self.output_path.exists() or self.output_path.stat().st_size == 0
+            self._file = open(self.output_path, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns)
+            if new_file:
+                self._writer.writeheader()
+
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetResultWriter:
+    """
+    Writes prediction rows as a directory of Parquet part files.
+
+    Each batch becomes one part, written to a temporary name and renamed,
+    so a crash never leaves a partial part that would break resuming.
+    """
+
+    def __init__(self, output_path: Path, columns: list[str]):
+        self.output_path = Path(output_path)
+        self.columns = columns
+        self._next_part = None
+
+    def completed_paths(self) -> set[str]:
+        if not self.output_path.exists():
+            return set()
+
+        import pandas as pd
+
+        done = set()
+        for part in sorted(self.output_path.glob("part-*.parquet")):
+            done.update(pd.read_parquet(part, columns=["path"])["path"])
+        return done
+
+    def write(self, rows: list[dict]) -> None:
+        if self._next_part is None:
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            self._next_part = len(list(self.output_path.glob("part-*.parquet")))
+
+        import pandas as pd
+
+        part_path = self.output_path / f"part-{self._next_part:05d}.parquet"
+        tmp_path = part_path.with_suffix(".parquet.tmp")
+
+        pd.DataFrame(rows, columns=self.columns).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, part_path)
+        self._next_part += 1
+
+    def close(self) -> None:
+        pass
+
+
+def get_result_writer(output_path: Path, columns: list[str]):
+    """
+    CSV for `*.csv` outputs, otherwise a Parquet part directory.
+    """
+    if Path(output_path).suffix.lower() == ".csv":
+        return CsvResultWriter(output_path, columns)
+    return ParquetResultWriter(output_path, columns)
@@ -0,0 +1,187 @@
+import numpy as np
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from src.inference.batcher import DynamicBatcher
+from src.inference.prediction_cache import PredictionCache
+from src.inference.model_manager import get_model_manager, model_spec
+from src.inference.tta import TestTimeAugmentation
+from src.inference.worker_pool import InferenceWorkerPool
+from src.inference.predictor import ModelInference, resolve_class_names
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE
+from src.constants.config_keys import SERVING, INFERENCE, AUGMENTATION
+from src.constants.training import DEFAULT_INPUT_SHAPE
+
+logger = get_logger(__name__)
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the inference service.
+
+    The model is loaded and warmed up once at startup by the shared
+    `ModelManager`. Requests are decoded on the thread pool and scored
+    through a shared `DynamicBatcher`. `POST /reload` swaps in another
+    model without dropping requests in flight.
+
+    With `serving.worker_pool.num_workers` > 0 the batches are scored by
+    an `InferenceWorkerPool` of model processes instead, fed through
+    shared memory, with up to `capacity` batches in flight.
+    """
+    config = load_config(MODEL_PARAMS_FILE)
+    serving_cfg = config.get(SERVING, {})
+    tta = TestTimeAugmentation.from_config(
+        config.get(INFERENCE, {}).get("tta", {}), config.get(AUGMENTATION, {})
+    )
+    # decodes uploads with the training image settings
+    decoder = ModelInference(tta=tta)
+    cache_variant = decoder.cache_variant()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        max_batch_size = serving_cfg.get("max_batch_size", 32)
+        views = tta.num_views if tta is not None else 1
+        class_names = resolve_class_names(config)
+
+        pool = InferenceWorkerPool.from_config(
+            serving_cfg.get("worker_pool", {}), len(class_names), max_batch_size
+        )
+        if pool is not None:
+            # every worker loads, warms up and applies TTA itself;
+            # the pool stands in for the manager (current, activate, stats)
+            manager = pool
+            await run_in_threadpool(pool.start, model_spec(serving_cfg))
+            predict_fn = pool.predict
+            concurrency = pool.capacity
+        else:
+            # trace the forward pass for single and full batches before accepting traffic
+            manager = get_model_manager(warmup_batch_sizes=(views, max_batch_size * views))
+            await run_in_threadpool(manager.activate, model_spec(serving_cfg))
+
+            predict_fn = manager.predict
+            if tta is not None:
+                predict_fn = lambda images: tta.predict(manager.predict, images)
+                tta.expand(np.zeros((1, *DEFAULT_INPUT_SHAPE), dtype=np.float32))
+            concurrency = 1
+
+        batcher = DynamicBatcher(
+            predict_fn,
+            max_batch_size=max_batch_size,
+            max_wait_ms=serving_cfg.get("max_wait_ms", 5.0),
+            max_queue_size=serving_cfg.get("max_queue_size", 1024),
+            concurrency=concurrency
+        )
+        await batcher.start()
+
+        cache = PredictionCache.from_config(
+            config.get(INFERENCE, {}).get("prediction_cache", {})
+        )
+        if cache is not None:
+            cache.use_model(manager.current.path, variant=cache_variant)
+
+        app.state.manager = manager
+        app.state.class_names = class_names
+        app.state.batcher = batcher
+        app.state.cache = cache
+
+        logger.info("Inference service ready")
+        yield
+
+        await batcher.stop()
+        if pool is not None:
+            await run_in_threadpool(pool.stop)
+        if cache is not None:
+            cache.close()
+
+    app = FastAPI(title="brain_tumor_classification", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "model_path": str(app.state.manager.current.path)}
+
+    @app.post("/reload")
+    async def reload(model: str | None = None):
+        """
+        Activates `model` (a model spec, default: the configured one,
+        re-resolved) once it is loaded and warmed up.
+        """
+        try:
+            loaded = await run_in_threadpool(
+                app.state.manager.activate, model or model_spec(serving_cfg)
+            )
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        if app.state.cache is not None:
+            await run_in_threadpool(
+                app.state.cache.use_model, loaded.path, variant=cache_variant
+            )
+        return loaded.info()
+
+    @app.get("/metrics")
+    async def metrics():
+        stats = app.state.batcher.stats()
+        stats["model"] = app.state.manager.stats()
+        if app.state.cache is not None:
+            stats["prediction_cache"] = app.state.cache.stats()
+        return stats
+
+    def cached_prediction(cache, model_path, data: bytes):
+        version = cache.use_model(model_path, variant=cache_variant)
+        image_hash = cache.hash_bytes(data)
+        return image_hash, version, cache.get(image_hash, version)
+
+    @app.post("/predict")
+    async def predict(file: UploadFile = File(...)):
+        data = await file.read()
+
+        cache = app.state.cache
+        probs = None
+        if cache is not None:
+            # version captured before scoring, put() drops the result if a
+            # reload binds the cache to another model in the meantime
+            image_hash, version, probs = await run_in_threadpool(
+                cached_prediction, cache, app.state.manager.current.path, data
+            )
+
+        if probs is None:
+            try:
+                image = await run_in_threadpool(decoder.decode_image_bytes, data)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+
+            probs = await app.state.batcher.submit(image)
+            if cache is not None:
+                await run_in_threadpool(cache.put, image_hash, probs, version)
+
+        class_names = app.state.class_names
+        idx = int(np.argmax(probs))
+
+        return {
+            "class": class_names[idx],
+            "confidence": float(probs[idx]),
+            "probabilities": {
+                name: float(p) for name, p in zip(class_names, probs)
+            }
+        }
+
+    return app
+
+
+app = create_app()
+
+
+def main():
+    serving_cfg = load_config(MODEL_PARAMS_FILE).get(SERVING, {})
+    uvicorn.run(
+        app,
+        host=serving_cfg.get("host", "0.0.0.0"),
+        port=serving_cfg.get("port", 8000)
+    )
+
+
+if __name__ == "__main__":
+    main()
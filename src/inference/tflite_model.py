@@ -0,0 +1,50 @@
+import threading
+import numpy as np
+
+
+class TFLiteModel:
+    """
+    Wraps a `.tflite` model behind the subset of the Keras model API used
+    for inference (`predict` and `model(x, training=False)`), so callers
+    do not need to know which format was loaded.
+
+    The interpreter is resized on demand to the incoming batch size.
+    Calls are serialized because a TFLite interpreter is not thread-safe.
+    """
+
+    def __init__(self, model_path: str, num_threads: int | None = None):
+        import tensorflow as tf
+
+        self.model_path = str(model_path)
+        self._interpreter = tf.lite.Interpreter(
+            model_path=self.model_path,
+            num_threads=num_threads
+        )
+        self._interpreter.allocate_tensors()
+
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        self._lock = threading.Lock()
+
+    @property
+    def input_shape(self) -> tuple:
+        return (None, *self._input["shape"][1:])
+
+    def predict(self, x, **kwargs) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+
+        with self._lock:
+            if x.shape[0] != self._batch_size:
+                self._interpreter.resize_tensor_input(
+                    self._input["index"], list(x.shape)
+                )
+                self._interpreter.allocate_tensors()
+                self._batch_size = x.shape[0]
+
+            self._interpreter.set_tensor(self._input["index"], x)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output["index"]).copy()
+
+    def __call__(self, x, training: bool = False) -> np.ndarray:
+        return self.predict(x)
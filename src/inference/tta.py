@@ -0,0 +1,144 @@
+import math
+import numpy as np
+
+AGGREGATIONS = ("mean", "max")
+
+# low-discrepancy step, spreads zoom values independently of the rotation grid
+_GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+class TestTimeAugmentation:
+    """
+    Scores every image under several augmented views in one forward pass.
+
+    The views use the transforms of `DataPreprocessing.augmentation`
+    (horizontal flip, rotation up to `rotation` * 2π, zoom by up to
+    `zoom`), but on a fixed grid instead of random draws, so repeated
+    predictions (and cached ones) are deterministic. View 0 is always
+    the unaugmented image.
+
+    For a batch of B images, all B * num_views views are produced by a
+    single projective transform (`src.data.augmentation`) and run through
+    `predict_fn` as one batch; the per-view probabilities are then reduced
+    per image by `aggregation` ("mean", or "max" renormalized to sum to 1).
+    """
+
+    def __init__(
+        self,
+        num_views: int = 8,
+        aggregation: str = "mean",
+        horizontal_flip: bool = True,
+        rotation: float = 0.1,
+        zoom: float = 0.1
+    ):
+        if num_views < 1:
+            raise ValueError(f"num_views must be at least 1, got {num_views}")
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{aggregation}', expected one of {AGGREGATIONS}")
+
+        self.num_views = num_views
+        self.aggregation = aggregation
+        self.horizontal_flip = horizontal_flip
+        self.rotation = rotation
+        self.zoom = zoom
+
+        self._flips, self._angles, self._scales = self._view_grid()
+        self._expand = None
+
+    @classmethod
+    def from_config(cls, tta_cfg: dict, aug_cfg: dict) -> "TestTimeAugmentation | None":
+        """
+        Builds TTA from `inference.tta` with the ranges of `augmentation`,
+        None when it is disabled.
+        """
+        if not tta_cfg.get("enabled", False):
+            return None
+        return cls(
+            num_views=tta_cfg.get("num_views", 8),
+            aggregation=tta_cfg.get("aggregation", "mean"),
+            horizontal_flip=aug_cfg.get("horizontal_flip", True),
+            rotation=aug_cfg.get("rotation", 0.1),
+            zoom=aug_cfg.get("zoom", 0.1)
+        )
+
+    def signature(self) -> str:
+        """
+        Identifies the settings, for caches of TTA predictions.
+        """
+        return (
+            f"tta:{self.num_views}:{self.aggregation}:"
+            f"{int(self.horizontal_flip)}:{self.rotation}:{self.zoom}"
+        )
+
+    def predict(self, predict_fn, images) -> np.ndarray:
+        """
+        Args:
+            predict_fn: maps an image batch to probabilities, e.g.
+                `make_predict_fn(model)`.
+            images: (B, H, W, 3) preprocessed images.
+
+        Returns:
+            (B, num_classes) aggregated probabilities.
+        """
+        if self.num_views == 1:
+            return np.asarray(predict_fn(images))
+
+        views = self.expand(images)
+        probs = np.asarray(predict_fn(views))
+        probs = probs.reshape(-1, self.num_views, probs.shape[-1])
+
+        if self.aggregation == "mean":
+            return probs.mean(axis=1)
+
+        probs = probs.max(axis=1)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def expand(self, images):
+        """
+        (B, H, W, 3) -> (B * num_views, H, W, 3), views of an image adjacent.
+        """
+        if self._expand is None:
+            self._expand = self._build_expand()
+        return self._expand(images)
+
+    def _build_expand(self):
+        import tensorflow as tf
+        from src.data.augmentation import affine_transforms, apply_transforms
+
+        flips = tf.constant(self._flips, dtype=tf.float32)
+        angles = tf.constant(self._angles, dtype=tf.float32)
+        scales = tf.constant(self._scales, dtype=tf.float32)
+
+        @tf.function(reduce_retracing=True)
+        def expand(images):
+            images = tf.convert_to_tensor(images, dtype=tf.float32)
+            shape = tf.shape(images)
+
+            # flip, rotation and zoom of every view in one resampling pass
+            transforms = affine_transforms(flips, angles, scales, shape[1], shape[2])
+            views = tf.repeat(images, len(self._flips), axis=0)
+            return apply_transforms(views, tf.tile(transforms, [shape[0], 1]))
+
+        return expand
+
+    def _view_grid(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per view: horizontal flip (0 / 1), rotation angle in radians and zoom.
+        """
+        flips, angles, scales = [0.0], [0.0], [1.0]
+
+        augmented = self.num_views - 1
+        for i in range(augmented):
+            # rotations evenly over [-max, max], zooms spread by the golden ratio
+            t = (2 * i / (augmented - 1) - 1) if augmented > 1 else 1.0
+            u = 2 * ((i * _GOLDEN_RATIO) % 1.0) - 1
+
+            flips.append(float(self.horizontal_flip and i % 2 == 0))
+            angles.append(t * self.rotation * 2 * math.pi)
+            scales.append(1.0 + u * self.zoom)
+
+        return (
+            np.asarray(flips, dtype=np.float32),
+            np.asarray(angles, dtype=np.float32),
+            np.asarray(scales, dtype=np.float32)
+        )
@@ -0,0 +1,585 @@
+import os
+import time
+import queue
+import threading
+import numpy as np
+import multiprocessing as mp
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+
+from src.utilities.utils import get_logger
+from src.constants.training import DEFAULT_INPUT_SHAPE
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PoolModel:
+    """
+    The model every worker of an `InferenceWorkerPool` currently serves.
+    """
+    spec: str
+    path: Path
+    version: str
+    num_workers: int
+    loaded_at: float = field(default_factory=time.time)
+
+    def info(self) -> dict:
+        return {
+            "spec": self.spec,
+            "model_path": str(self.path),
+            "version": self.version,
+            "num_workers": self.num_workers,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class SharedRing:
+    """
+    Shared-memory slots through which one worker receives image batches
+    and returns probabilities.
+
+    Slot `i` holds up to `max_batch_size` images (float32, `input_shape`)
+    and the matching rows of class probabilities. Only slot indices and
+    batch sizes travel through the process queues; the arrays themselves
+    are never pickled.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        max_batch_size: int,
+        input_shape: tuple,
+        num_classes: int,
+        name: str | None = None
+    ):
+        self.slots = slots
+        self.max_batch_size = max_batch_size
+        self.input_shape = tuple(input_shape)
+        self.num_classes = num_classes
+
+        input_shape = (slots, max_batch_size, *self.input_shape)
+        output_shape = (slots, max_batch_size, num_classes)
+        input_bytes = int(np.prod(input_shape)) * 4
+        output_bytes = int(np.prod(output_shape)) * 4
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=input_bytes + output_bytes
+        )
+        if not self.owner:
+            # the creating process owns the segment; without this the
+            # resource tracker unlinks it when a worker exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.inputs = np.ndarray(input_shape, dtype=np.float32, buffer=self.shm.buf)
+        self.outputs = np.ndarray(
+            output_shape, dtype=np.float32, buffer=self.shm.buf, offset=input_bytes
+        )
+
+    def spec(self) -> dict:
+        """
+        Everything a worker process needs to attach to the ring.
+        """
+        return {
+            "slots": self.slots,
+            "max_batch_size": self.max_batch_size,
+            "input_shape": self.input_shape,
+            "num_classes": self.num_classes,
+            "name": self.shm.name,
+        }
+
+    def close(self) -> None:
+        # views into the buffer have to go before the mapping is closed
+        self.inputs = self.outputs = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class InferenceWorkerPool:
+    """
+    Serves predictions from `num_workers` processes, each holding its own
+    copy of the model, so decoding in the front end and the forward
+    passes are not bound by one interpreter's GIL.
+
+    - every worker runs with `threads_per_worker` TensorFlow / TFLite
+      threads (default: the CPUs split evenly) and, with `pin_cores`,
+      is pinned to its own block of cores
+    - batches are written to a free slot of a worker's `SharedRing` and
+      the worker is only sent the slot index; `slots_per_worker` batches
+      can be in flight per worker, so the next batch is copied in while
+      the current one runs
+    - `predict` is thread-safe and blocks until its batch is scored;
+      batches go to whichever worker frees a slot first
+    - `activate(spec)` loads another model on every worker; batches
+      already queued finish on the previous one. If a worker fails to
+      load it, every worker is switched back to the current model (the
+      pool is marked `degraded` when that fails as well). `current`,
+      `activate` and `stats` match `ModelManager`, so the server uses either
+    - a worker that dies fails its in-flight batches and its slots are
+      not handed out again; `predict` raises once no worker is left
+
+    Workers are spawned (TensorFlow is not fork-safe) and read the same
+    config, so test-time augmentation (`inference.tta`) runs inside them.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        num_classes: int,
+        max_batch_size: int = 32,
+        threads_per_worker: int | None = None,
+        slots_per_worker: int = 2,
+        pin_cores: bool = True,
+        input_shape: tuple = DEFAULT_INPUT_SHAPE,
+        start_timeout_s: float = 300.0,
+        liveness_interval_s: float = 1.0
+    ):
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") \
+            else list(range(os.cpu_count() or 1))
+
+        self.num_workers = num_workers
+        self.num_classes = num_classes
+        self.max_batch_size = max_batch_size
+        self.threads_per_worker = threads_per_worker or max(1, len(cpus) // num_workers)
+        self.slots_per_worker = slots_per_worker
+        self.input_shape = tuple(input_shape)
+        self.start_timeout_s = start_timeout_s
+        self.liveness_interval_s = liveness_interval_s
+
+        self._cores = [None] * num_workers
+        if pin_cores and hasattr(os, "sched_setaffinity"):
+            t = self.threads_per_worker
+            self._cores = [
+                [cpus[(i * t + j) % len(cpus)] for j in range(t)]
+                for i in range(num_workers)
+            ]
+
+        self._ctx = mp.get_context("spawn")
+        self._rings: list[SharedRing] = []
+        self._tasks: list = []
+        self._processes: list = []
+        self._results = None
+        self._collector: threading.Thread | None = None
+
+        self._free: queue.Queue = queue.Queue()
+        self._pending: dict[tuple, Future] = {}
+        self._acks: dict[int, Future] = {}
+        self._load_generation = 0
+        self._lock = threading.Lock()
+        self._stopping = False
+
+        self._current: PoolModel | None = None
+        self.degraded = False
+        self._batches = [0] * num_workers
+        self._images = 0
+        self._started_at = None
+
+    @classmethod
+    def from_config(
+        cls,
+        pool_cfg: dict,
+        num_classes: int,
+        max_batch_size: int
+    ) -> "InferenceWorkerPool | None":
+        """
+        Builds the pool from `serving.worker_pool`, None when
+        `num_workers` is 0 (in-process serving).
+        """
+        num_workers = pool_cfg.get("num_workers", 0)
+        if not num_workers:
+            return None
+        return cls(
+            num_workers=num_workers,
+            num_classes=num_classes,
+            max_batch_size=max_batch_size,
+            threads_per_worker=pool_cfg.get("threads_per_worker"),
+            slots_per_worker=pool_cfg.get("slots_per_worker", 2),
+            pin_cores=pool_cfg.get("pin_cores", True)
+        )
+
+    @property
+    def current(self) -> PoolModel:
+        loaded = self._current
+        if loaded is None:
+            raise RuntimeError("Worker pool not started, call start() first")
+        return loaded
+
+    @property
+    def capacity(self) -> int:
+        """
+        Batches that can be in flight at once.
+        """
+        return self.num_workers * self.slots_per_worker
+
+    def start(self, spec: str = "latest") -> PoolModel:
+        """
+        Spawns the workers, each loading and warming up the model for
+        `spec`, and blocks until all of them are ready.
+        """
+        from src.inference.model_manager import ModelManager
+
+        path = ModelManager.resolve(spec)
+        self._results = self._ctx.Queue()
+
+        for worker_id in range(self.num_workers):
+            ring = SharedRing(
+                self.slots_per_worker, self.max_batch_size, self.input_shape, self.num_classes
+            )
+            tasks = self._ctx.Queue()
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(
+                    worker_id, ring.spec(), str(path), self.threads_per_worker,
+                    self._cores[worker_id], tasks, self._results
+                ),
+                name=f"inference-worker-{worker_id}",
+                daemon=True
+            )
+            self._rings.append(ring)
+            self._tasks.append(tasks)
+            self._processes.append(process)
+            self._acks[worker_id] = Future()
+            process.start()
+
+        # slot-major, so consecutive batches go to different workers
+        for slot in range(self.slots_per_worker):
+            for worker_id in range(self.num_workers):
+                self._free.put((worker_id, slot))
+
+        self._collector = threading.Thread(
+            target=self._collect, name="inference-pool-results", daemon=True
+        )
+        self._collector.start()
+
+        try:
+            self._wait_for_acks(self.start_timeout_s)
+        except BaseException:
+            self.stop()
+            raise
+
+        self._current = self._pool_model(spec, path)
+        self._started_at = time.perf_counter()
+        logger.info(
+            f"Inference worker pool ready: {self.num_workers} workers x "
+            f"{self.threads_per_worker} threads, model {path}"
+        )
+        return self._current
+
+    def activate(self, spec: str = "latest") -> PoolModel:
+        """
+        Loads the model for `spec` on every worker and makes it current.
+
+        When a worker fails to load it, every worker is switched back to
+        the current model before the error is raised, so the pool never
+        serves two models; if that fails too, the pool is `degraded`.
+        """
+        from src.inference.model_manager import ModelManager
+
+        path = ModelManager.resolve(spec)
+        try:
+            self._load_all(path)
+        except BaseException:
+            previous = self._current
+            if previous is None:
+                raise
+            try:
+                self._load_all(previous.path)
+                logger.warning(f"Loading {path} failed, workers back on model {previous.path}")
+            except Exception as e:
+                self.degraded = True
+                logger.error(
+                    f"Worker pool degraded, workers may serve different models: {e}"
+                )
+            raise
+
+        self.degraded = False
+        self._current = self._pool_model(spec, path)
+        logger.info(f"Worker pool switched to model {path}")
+        return self._current
+
+    def predict(self, images) -> np.ndarray:
+        """
+        Scores a (B, H, W, 3) batch on the next free worker.
+        """
+        images = np.asarray(images, dtype=np.float32)
+        if len(images) > self.max_batch_size:
+            return np.concatenate([
+                self.predict(images[i:i + self.max_batch_size])
+                for i in range(0, len(images), self.max_batch_size)
+            ])
+
+        worker_id, slot = self._next_slot()
+        try:
+            ring = self._rings[worker_id]
+            n = len(images)
+            ring.inputs[slot, :n] = images
+
+            future = Future()
+            with self._lock:
+                self._pending[(worker_id, slot)] = future
+            self._tasks[worker_id].put(("predict", slot, n))
+            self._wait_for_batch(worker_id, future)
+
+            # copied out before the slot can be reused
+            probs = ring.outputs[slot, :n].copy()
+        finally:
+            # slots of a dead worker are dropped, not handed out again
+            if self._alive(worker_id):
+                self._free.put((worker_id, slot))
+
+        with self._lock:
+            self._batches[worker_id] += 1
+            self._images += n
+        return probs
+
+    def stats(self) -> dict:
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "current": self._current.info() if self._current else None,
+            "num_workers": self.num_workers,
+            "threads_per_worker": self.threads_per_worker,
+            "alive_workers": sum(p.is_alive() for p in self._processes),
+            "degraded": self.degraded,
+            "batches_per_worker": list(self._batches),
+            "images": self._images,
+            "images_per_sec": self._images / elapsed if elapsed else 0.0,
+        }
+
+    def stop(self) -> None:
+        """
+        Stops the workers and releases the shared memory.
+        """
+        self._stopping = True
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+        if self._results is not None:
+            self._results.put(None)
+        if self._collector is not None:
+            self._collector.join(timeout=10)
+
+        # replies still missing will never come; fail them before the
+        # rings go, callers would otherwise wait forever
+        self._fail_pending(RuntimeError("Inference worker pool stopped"))
+
+        for ring in self._rings:
+            ring.close()
+        self._rings, self._tasks, self._processes = [], [], []
+        logger.info("Inference worker pool stopped")
+
+    def _fail_pending(self, error: Exception) -> None:
+        """
+        Fails every batch and load still waiting for a worker reply.
+        """
+        with self._lock:
+            futures = list(self._pending.values()) + list(self._acks.values())
+            self._pending.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _pool_model(self, spec: str, path: Path) -> PoolModel:
+        from src.inference.prediction_cache import model_version
+        return PoolModel(
+            spec=spec,
+            path=path,
+            version=model_version(path),
+            num_workers=self.num_workers
+        )
+
+    def _alive(self, worker_id: int) -> bool:
+        return worker_id < len(self._processes) and self._processes[worker_id].is_alive()
+
+    def _next_slot(self) -> tuple[int, int]:
+        """
+        A free slot of a live worker, waiting for one if needed.
+        """
+        while True:
+            try:
+                worker_id, slot = self._free.get(timeout=self.liveness_interval_s)
+            except queue.Empty:
+                if not any(self._alive(i) for i in range(self.num_workers)):
+                    raise RuntimeError("No inference worker alive")
+                continue
+            if self._alive(worker_id):
+                return worker_id, slot
+
+    def _wait_for_batch(self, worker_id: int, future: Future) -> None:
+        """
+        Waits for a batch, failing it as soon as its worker is found dead.
+        """
+        while True:
+            try:
+                return future.result(timeout=self.liveness_interval_s)
+            except FutureTimeout:
+                if not self._alive(worker_id):
+                    self._check_workers()
+
+    def _load_all(self, path: Path) -> None:
+        """
+        Loads `path` on every worker and waits for all of them.
+        """
+        with self._lock:
+            self._load_generation += 1
+            generation = self._load_generation
+            self._acks = {worker_id: Future() for worker_id in range(self.num_workers)}
+        for tasks in self._tasks:
+            tasks.put(("load", str(path), generation))
+        self._wait_for_acks(self.start_timeout_s)
+
+    def _wait_for_acks(self, timeout: float) -> None:
+        """
+        Waits for every worker's load reply (not only up to the first
+        failure, so no reply is left to match a later load), then raises
+        the first error.
+        """
+        deadline = time.monotonic() + timeout
+        errors = []
+        for future in list(self._acks.values()):
+            try:
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def _collect(self) -> None:
+        """
+        Routes worker replies to the callers waiting for them, checking
+        on every round that the workers are alive.
+        """
+        while True:
+            self._check_workers()
+            try:
+                message = self._results.get(timeout=self.liveness_interval_s)
+            except queue.Empty:
+                continue
+            if message is None:
+                return
+
+            worker_id, kind, slot, error = message
+            with self._lock:
+                if kind == "predict":
+                    future = self._pending.pop((worker_id, slot), None)
+                elif slot == self._load_generation:
+                    future = self._acks.get(worker_id)
+                else:
+                    # reply to an earlier load that was given up on
+                    future = None
+
+            if future is None or future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(RuntimeError(f"Worker {worker_id}: {error}"))
+
+    def _check_workers(self) -> None:
+        """
+        Fails the batches of a worker that died instead of letting
+        their callers wait forever.
+        """
+        if self._stopping:
+            return
+        for worker_id, process in enumerate(self._processes):
+            if process.is_alive():
+                continue
+            with self._lock:
+                futures = [
+                    self._pending.pop(key) for key in list(self._pending)
+                    if key[0] == worker_id
+                ]
+                ack = self._acks.get(worker_id)
+                if ack is not None and not ack.done():
+                    futures.append(ack)
+            for future in futures:
+                future.set_exception(RuntimeError(
+                    f"Inference worker {worker_id} exited with code {process.exitcode}"
+                ))
+            if futures:
+                logger.error(f"Inference worker {worker_id} exited with code {process.exitcode}")
+
+
+def _worker_main(
+    worker_id: int,
+    ring_spec: dict,
+    model_path: str,
+    num_threads: int,
+    cores: list[int] | None,
+    tasks,
+    results
+) -> None:
+    """
+    Worker process: loads the model, then scores the batches written
+    to its ring until it receives None.
+    """
+    if cores:
+        os.sched_setaffinity(0, cores)
+    # read by the TensorFlow / oneDNN runtimes when they start
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    ring = SharedRing(**ring_spec)
+    predict_fn = None
+    try:
+        predict_fn = _load_predict_fn(model_path, num_threads, ring.max_batch_size)
+        results.put((worker_id, "load", 0, None))
+    except Exception as e:
+        results.put((worker_id, "load", 0, repr(e)))
+
+    while True:
+        message = tasks.get()
+        if message is None:
+            break
+
+        # ("load", model path, load generation) or ("predict", slot, batch size)
+        kind, arg, n = message
+        reply = n if kind == "load" else arg
+        try:
+            if kind == "load":
+                predict_fn = _load_predict_fn(arg, num_threads, ring.max_batch_size)
+            else:
+                ring.outputs[arg, :n] = predict_fn(ring.inputs[arg, :n])
+            results.put((worker_id, kind, reply, None))
+        except Exception as e:
+            results.put((worker_id, kind, reply, repr(e)))
+
+    ring.close()
+
+
+def _load_predict_fn(model_path: str, num_threads: int, max_batch_size: int):
+    from src.inference.predictor import load_inference_model, make_predict_fn
+    from src.inference.tta import TestTimeAugmentation
+    from src.utilities.utils import load_config
+    from src.constants.paths import MODEL_PARAMS_FILE
+    from src.constants.config_keys import AUGMENTATION, INFERENCE
+
+    config = load_config(MODEL_PARAMS_FILE)
+    tta = TestTimeAugmentation.from_config(
+        config.get(INFERENCE, {}).get("tta", {}), config.get(AUGMENTATION, {})
+    )
+
+    model_fn = make_predict_fn(load_inference_model(model_path, num_threads=num_threads))
+    predict_fn = model_fn
+    if tta is not None:
+        predict_fn = lambda images: tta.predict(model_fn, images)
+
+    # trace single and full batches before the first request
+    for batch_size in sorted({1, max_batch_size}):
+        predict_fn(np.zeros((batch_size, *DEFAULT_INPUT_SHAPE), dtype=np.float32))
+    return predict_fn
@@ -1,21 +1,74 @@
 import os
+import argparse
 from datetime import datetime
-os.environ["RUN_ID"] = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+# callers such as the benchmarks may pin the RUN_ID
+os.environ.setdefault("RUN_ID", datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
 
-from src.utilities.utils import get_logger
-from src.pipelines.data_pipeline import DataPipeline
-from src.pipelines.train_pipeline import TrainingPipeline
+from src.utilities.utils import get_logger, load_environment
 
 logger = get_logger(__name__)
 
-def main():
+
+def build_parser() -> argparse.ArgumentParser:
+    from src.pipelines.stage_cache import STAGES
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main",
+        description=(
+            "Run the data and training pipelines end to end. Stages whose "
+            "inputs are unchanged reuse the outputs of an earlier run."
+        )
+    )
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--from-stage",
+        choices=STAGES,
+        help="rerun this stage and every later one, even if cached"
+    )
+    selection.add_argument(
+        "--only-stage",
+        choices=STAGES,
+        help="rerun only this stage, on the cached outputs of the stages it uses"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="run every stage, ignoring cached outputs"
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # threading / oneDNN settings only apply before TensorFlow starts
+    from src.training.performance import PerformanceProfile
+    PerformanceProfile().apply()
+
+    # multi-worker collectives must be configured before the first op
+    from src.training.distributed import DistributedTraining
+    DistributedTraining().setup()
+
+    # pipelines pull in TensorFlow, mlflow, pandas and matplotlib
+    from src.pipelines.data_pipeline import DataPipeline
+    from src.pipelines.train_pipeline import TrainingPipeline
+    from src.pipelines.stage_cache import StageCache, StageSelection
+
+    load_environment()
     logger.info("Application started")
 
+    stage_cache = StageCache(StageSelection(
+        from_stage=args.from_stage,
+        only_stage=args.only_stage,
+        use_cache=not args.no_cache
+    ))
+
     data_pipeline = DataPipeline()
-    data_artifact = data_pipeline.run()
+    data_artifact = data_pipeline.run(stage_cache)
 
-    training_pipeline = TrainingPipeline()
-    trainer_artifact = training_pipeline.run(data_artifact)
+    if not stage_cache.skip("training"):
+        training_pipeline = TrainingPipeline()
+        trainer_artifact = training_pipeline.run(data_artifact, stage_cache)
 
     logger.info("Application finished successfully")
 
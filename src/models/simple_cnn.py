@@ -29,7 +29,8 @@ class SimpleCNN(BaseModel):
 
             layers.Flatten(),
             layers.Dense(128, activation="relu"),
-            layers.Dense(num_classes, activation="softmax")
+            # softmax stays float32 under mixed precision
+            layers.Dense(num_classes, activation="softmax", dtype="float32")
         ])
 
         logger.info("SimpleCNN architecture built")
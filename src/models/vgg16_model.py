@@ -10,6 +10,10 @@ logger = get_logger(__name__)
 class VGG16Model(BaseModel):
     """
     Transfer Learning using pretrained VGG16 backbone.
+
+    The model is split into:
+    - feature_extractor: VGG16 convolutional base + global average pooling
+    - head: Dense/Dropout classifier operating on pooled features
     """
 
     def __init__(self):
@@ -17,6 +21,9 @@ class VGG16Model(BaseModel):
         self.config = load_config(MODEL_PARAMS_FILE)
         self.tl_config = self.config.get("transfer_learning", {})
 
+        self.feature_extractor = None
+        self.head = None
+
     def build(self, input_shape: tuple[int, int, int],
               num_classes: int) -> None:
         """
@@ -24,8 +31,9 @@ class VGG16Model(BaseModel):
         """
 
         # load pretrained VGG16 without top
+        # (weights: null builds a randomly initialized backbone, for offline use)
         base_model = VGG16(
-            weights="imagenet",
+            weights=self.tl_config.get("weights", "imagenet"),
             include_top=False,
             input_shape=input_shape
         )
@@ -37,17 +45,22 @@ class VGG16Model(BaseModel):
         if unfreeze_n > 0:
             for layer in base_model.layers[-unfreeze_n:]:
                 layer.trainable = True
-            
+
+        pooled = layers.GlobalAveragePooling2D()(base_model.output)
+        self.feature_extractor = models.Model(
+            inputs=base_model.input,
+            outputs=pooled,
+            name="vgg16_features"
+        )
+
         # custom classification head
-        x = base_model.output
-        x = layers.GlobalAveragePooling2D()(x)
-        x = layers.Dense(256, activation="relu")(x)
-        x = layers.Dropout(0.5)(x)
-        output = layers.Dense(num_classes, activation="softmax")(x)
+        self.head = self._build_head(pooled.shape[-1], num_classes)
+
+        output = self.head(self.feature_extractor.output)
 
-        self.model = models.Model(inputs=base_model.input,
+        self.model = models.Model(inputs=self.feature_extractor.input,
                                   outputs=output)
-        
+
         logger.info("VGG16 transfer learning model built")
 
     def compile(self, **kwargs) -> None:
@@ -55,4 +68,24 @@ class VGG16Model(BaseModel):
         Compiles the VGG16 model
         """
         self.model.compile(**kwargs)
-        logger.info("VGG16 model compiled successfully")
\ No newline at end of file
+        logger.info("VGG16 model compiled successfully")
+
+    def backbone_is_frozen(self) -> bool:
+        """
+        True when no backbone weight is updated during training, i.e.
+        the pooled features of an image never change.
+        """
+        return (
+            self.tl_config.get("freeze_base_model", True)
+            and self.tl_config.get("unfreeze_last_n_layers", 0) == 0
+        )
+
+    @staticmethod
+    def _build_head(feature_dim: int, num_classes: int):
+        return models.Sequential([
+            layers.Input(shape=(feature_dim,)),
+            layers.Dense(256, activation="relu"),
+            layers.Dropout(0.5),
+            # softmax stays float32 under mixed precision
+            layers.Dense(num_classes, activation="softmax", dtype="float32")
+        ], name="classification_head")
@@ -1,8 +1,13 @@
+import os
 from src.data.data_ingestion import DataIngestion
 from src.data.data_preprocessing import DataPreprocessing
 from src.data.data_validation import DataValidation
+from src.training.distributed import DistributedTraining
 from src.entity.data_ingestion_entity import DataIngestionArtifact
 from src.utilities.utils import get_logger
+from src.utilities.profiling import get_profiler
+from src.pipelines.stage_cache import StageCache, code_digest
+from src.constants.config_keys import DATA_CONFIG, VALIDATION
 
 logger = get_logger(__name__)
 
@@ -11,21 +16,43 @@ class DataPipeline:
     Orchestrates data ingestion and preprocessing workflow.
     """
 
-    def run(self) -> DataIngestionArtifact:
+    def run(self, stage_cache: StageCache | None = None) -> DataIngestionArtifact:
         logger.info("Starting data pipeline")
+        profiler = get_profiler()
+        stage_cache = stage_cache or StageCache()
 
-        DataValidation().validate()
+        # the chief validates once for the whole multi-worker run,
+        # unchanged data is not validated again
+        if DistributedTraining().is_chief and not stage_cache.skip("validation"):
+            with profiler.stage("data_validation"):
+                validation = DataValidation()
+                stage_cache.run(
+                    "validation",
+                    inputs={
+                        "data": stage_cache.data_fingerprint(),
+                        "config": stage_cache.config_subset(DATA_CONFIG, VALIDATION),
+                        "code": code_digest("src.data.data_validation"),
+                    },
+                    outputs={
+                        "manifest": validation.manifest_path,
+                        "report": validation.report_path,
+                    },
+                    fn=validation.validate,
+                    run_id=os.getenv("RUN_ID")
+                )
 
-        ingestion = DataIngestion()
-        train_ds, test_ds, class_names, num_classes = ingestion.load()
+        with profiler.stage("data_ingestion"):
+            ingestion = DataIngestion()
+            train_ds, test_ds, class_names, num_classes = ingestion.load()
 
         logger.info(f"Train batches: {len(train_ds)}")
         logger.info(f"Test batches: {len(test_ds)}")
         logger.info(f"Classes: {class_names}")
         logger.info(f"Num classes: {num_classes}")
 
-        data_preprocessor = DataPreprocessing()
-        train_ds, test_ds = data_preprocessor.process(train_ds, test_ds)
+        with profiler.stage("data_preprocessing"):
+            data_preprocessor = DataPreprocessing()
+            train_ds, test_ds = data_preprocessor.process(train_ds, test_ds)
 
         logger.info("Data pipeline completed successfully")
 
@@ -0,0 +1,345 @@
+import os
+import ast
+import json
+import shutil
+import inspect
+import hashlib
+from pathlib import Path
+from datetime import datetime
+
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE, STAGE_CACHE_DIR
+from src.constants.config_keys import DATA_CONFIG, DISTRIBUTED, STAGE_CACHE, SWEEP_TRIAL
+
+logger = get_logger(__name__)
+
+# project root, so digests do not depend on the working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# pipeline stages in execution order
+STAGES = (
+    "validation",
+    "training",
+    "plotting",
+    "evaluation",
+    "distillation_report",
+    "export",
+)
+
+# stages whose outputs another stage consumes
+UPSTREAM = {
+    "validation": (),
+    "training": (),
+    "plotting": ("training",),
+    "evaluation": ("training",),
+    "distillation_report": ("training", "evaluation"),
+    "export": ("training",),
+}
+
+
+def file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def module_files(*modules: str) -> list[Path]:
+    """
+    Source files of `modules` and of every `src` module they import,
+    directly or transitively (including imports inside functions).
+    """
+    seen: dict[str, Path] = {}
+    pending = list(modules)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        path = _module_path(name)
+        if path is None:
+            continue
+        seen[name] = path
+
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Import):
+                pending += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+                # `from src.package import module`
+                pending += [f"{node.module}.{alias.name}" for alias in node.names]
+
+    return sorted(seen.values())
+
+
+def _module_path(name: str) -> Path | None:
+    if name != "src" and not name.startswith("src."):
+        return None
+    base = PROJECT_ROOT.joinpath(*name.split("."))
+    for path in (base.with_suffix(".py"), base / "__init__.py"):
+        if path.is_file():
+            return path
+    return None
+
+
+def code_digest(*sources) -> str:
+    """
+    Hash of the code a stage runs, so the stage reruns when it changes.
+
+    Each source is a module name (the module and every `src` module it
+    imports are hashed, see `module_files`) or a Python object (function,
+    class) whose source alone is hashed, which keeps e.g. plotting
+    independent of evaluation code living in the same module.
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        if isinstance(source, str):
+            for file in module_files(source):
+                digest.update(file.relative_to(PROJECT_ROOT).as_posix().encode())
+                digest.update(file.read_bytes())
+        else:
+            digest.update(inspect.getsource(source).encode())
+    return digest.hexdigest()
+
+
+class StageSelection:
+    """
+    Which stages run and which may reuse cached outputs.
+
+    - default: every stage whose fingerprint is unchanged is reused
+    - from_stage: that stage and every later one run again
+    - only_stage: that stage runs again; the stages it consumes must be
+      cached, every other stage is skipped
+    - use_cache=False: every stage runs (outputs are still recorded)
+    """
+
+    def __init__(
+        self,
+        from_stage: str | None = None,
+        only_stage: str | None = None,
+        use_cache: bool = True
+    ):
+        for stage in (from_stage, only_stage):
+            if stage is not None and stage not in STAGES:
+                raise ValueError(f"Unknown stage '{stage}', expected one of {STAGES}")
+        if from_stage and only_stage:
+            raise ValueError("from_stage and only_stage are mutually exclusive")
+
+        self.from_stage = from_stage
+        self.only_stage = only_stage
+        self.use_cache = use_cache
+
+    def force(self, stage: str) -> bool:
+        """
+        True when `stage` has to run even if its outputs are cached.
+        """
+        if not self.use_cache:
+            return True
+        if self.only_stage:
+            return stage == self.only_stage
+        if self.from_stage:
+            return STAGES.index(stage) >= STAGES.index(self.from_stage)
+        return False
+
+    def skip(self, stage: str) -> bool:
+        """
+        True when `stage` is not part of this run at all.
+        """
+        return (
+            self.only_stage is not None
+            and stage != self.only_stage
+            and stage not in UPSTREAM[self.only_stage]
+        )
+
+    def require_cached(self, stage: str) -> bool:
+        """
+        True when `stage` may only be restored, not run.
+        """
+        return (
+            self.use_cache
+            and self.only_stage is not None
+            and stage in UPSTREAM[self.only_stage]
+        )
+
+
+class StageCache:
+    """
+    Content-addressed outputs of pipeline stages.
+
+    A stage declares its inputs (config subset, data listing, code digest,
+    digests of upstream outputs); their hash is the stage fingerprint.
+    After a stage runs, copies of its output files are stored under the
+    fingerprint (copies, since e.g. a resumed run rewrites its model file
+    in place):
+
+        artifacts/stages/<stage>/<fingerprint>/
+            <output files>
+            record.json     inputs, output digests, producing run
+
+    A later run with the same fingerprint places those files at the paths
+    of the current run instead of running the stage.
+
+    Disabled for sweep trials (each trial has to train and report) and
+    multi-worker runs (every worker has to take part in training).
+    """
+
+    def __init__(self, selection: StageSelection | None = None):
+        """
+        Configuration keys used:
+        - stage_cache.enabled
+        - stage_cache.dir
+        """
+        self.config = load_config(MODEL_PARAMS_FILE)
+        cache_cfg = self.config.get(STAGE_CACHE, {})
+
+        self.selection = selection or StageSelection()
+        self.root = Path(cache_cfg.get("dir", STAGE_CACHE_DIR))
+        self.enabled = (
+            cache_cfg.get("enabled", True)
+            and not self.config.get(SWEEP_TRIAL)
+            and not self.config.get(DISTRIBUTED, {}).get("enabled", False)
+        )
+        self._data_fingerprint = None
+
+    @staticmethod
+    def fingerprint(inputs: dict) -> str:
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+
+    def skip(self, stage: str) -> bool:
+        return self.selection.skip(stage)
+
+    def data_fingerprint(self) -> str | None:
+        """
+        Path, label, size and mtime of every train and test image
+        (None when the cache is disabled, the listing is not needed).
+        """
+        if self.enabled and self._data_fingerprint is None:
+            from src.data.image_index import ImageIndex
+
+            data_cfg = self.config[DATA_CONFIG]
+            train_index = ImageIndex.from_directory(data_cfg["TRAIN_DIR"])
+            test_index = ImageIndex.from_directory(
+                data_cfg["TEST_DIR"],
+                train_index.class_names
+            )
+            self._data_fingerprint = hashlib.sha256(
+                f"{train_index.stat_fingerprint()}|{test_index.stat_fingerprint()}".encode()
+            ).hexdigest()
+        return self._data_fingerprint
+
+    def config_subset(self, *keys: str) -> dict:
+        return {key: self.config.get(key) for key in keys}
+
+    def lookup(self, stage: str, inputs: dict) -> dict | None:
+        """
+        The record of an earlier run of `stage` with the same inputs,
+        None when the stage has to run.
+        """
+        if not self.enabled or self.selection.force(stage):
+            return None
+
+        record_path = self.root / stage / self.fingerprint(inputs) / "record.json"
+        if not record_path.exists():
+            if self.selection.require_cached(stage):
+                raise RuntimeError(
+                    f"Stage '{stage}' has no cached outputs for the current inputs, "
+                    f"run it first (e.g. --from-stage {stage})"
+                )
+            return None
+
+        with open(record_path, "r") as f:
+            record = json.load(f)
+        logger.info(
+            f"Stage '{stage}' unchanged, reusing outputs of run {record['run_id']}"
+        )
+        return record
+
+    def save(
+        self,
+        stage: str,
+        inputs: dict,
+        outputs: dict,
+        run_id: str,
+        meta: dict | None = None
+    ) -> dict | None:
+        """
+        Stores `outputs` (name -> file written by this run) under the
+        fingerprint of `inputs`. Returns the record.
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self.root / stage / self.fingerprint(inputs)
+        tmp_dir = entry_dir.with_name(f"{entry_dir.name}.tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        stored = {}
+        for name, path in outputs.items():
+            if path is None or not Path(path).exists():
+                continue
+            target = tmp_dir / f"{name}{Path(path).suffix}"
+            shutil.copy2(path, target)
+            stored[name] = {"file": target.name, "digest": file_digest(target)}
+
+        record = {
+            "stage": stage,
+            "run_id": run_id,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "inputs": inputs,
+            "outputs": stored,
+            "meta": meta or {},
+        }
+        with open(tmp_dir / "record.json", "w") as f:
+            json.dump(record, f, indent=2, default=str)
+
+        # swapped in whole, a concurrent lookup never sees a partial entry
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.rename(tmp_dir, entry_dir)
+
+        logger.info(f"Stage '{stage}' outputs cached at {entry_dir}")
+        return record
+
+    def restore(self, record: dict, targets: dict) -> dict:
+        """
+        Places the cached outputs at `targets` (name -> path of the
+        current run). Returns name -> restored path.
+        """
+        entry_dir = self.root / record["stage"] / self.fingerprint(record["inputs"])
+        restored = {}
+        for name, target in targets.items():
+            output = record["outputs"].get(name)
+            if output is None:
+                continue
+            target = Path(target)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(entry_dir / output["file"], target)
+            restored[name] = target
+        return restored
+
+    def run(self, stage: str, inputs: dict, outputs: dict, fn, run_id: str) -> dict | None:
+        """
+        Restores `outputs` from the cache, or calls `fn()` and caches
+        the files it wrote. Returns the record.
+        """
+        record = self.lookup(stage, inputs)
+        if record is not None:
+            self.restore(record, outputs)
+            return record
+
+        fn()
+        return self.save(stage, inputs, outputs, run_id)
+
+    @staticmethod
+    def digests(record: dict | None) -> dict:
+        """
+        Output digests of a record, the inputs of downstream stages.
+        """
+        if record is None:
+            return {}
+        return {name: output["digest"] for name, output in record["outputs"].items()}
+
@@ -1,9 +1,53 @@
 import os
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
 from src.utilities.utils import get_logger
+from src.utilities.profiling import get_profiler
 from src.training.model_trainer import ModelTrainer
 from src.training.evaluation import ModelEvaluator
+from src.training.export import ModelExporter
+from src.training.distillation import DistillationReport, TeacherCache
+from src.training.distributed import DistributedTraining
+from src.experiment.mlflow_tracking import shutdown as shutdown_tracking
 from src.entity.data_ingestion_entity import DataIngestionArtifact
 from src.entity.model_trainer_entity import ModelTrainerArtifact
+from src.inference.prediction_cache import model_version
+from src.pipelines.stage_cache import StageCache, code_digest
+from src.constants.paths import ARTIFACTS_DIR, MODEL_DIR
+from src.constants.config_keys import (
+    DATA_CONFIG,
+    DISTILLATION,
+    EXPORT,
+    MODEL_CONFIG,
+    INFERENCE,
+    PREPROCESSING,
+    PROFILING,
+    SERVING,
+    STAGE_CACHE,
+    TRACKING,
+    VALIDATION
+)
+
+# config sections that do not change the trained model
+TRAINING_INDEPENDENT_KEYS = {
+    EXPORT,
+    INFERENCE,
+    PROFILING,
+    SERVING,
+    STAGE_CACHE,
+    TRACKING,
+    VALIDATION,
+}
+
+# modules (with everything they import) behind each stage's outputs
+TRAINING_CODE = (
+    "src.training.model_trainer",
+    "src.data.data_ingestion",
+    "src.data.data_preprocessing",
+)
+DATASET_CODE = ("src.data.data_ingestion", "src.data.data_preprocessing")
 
 logger = get_logger(__name__)
 
@@ -14,7 +58,8 @@ class TrainingPipeline:
 
     def run(
         self,
-        data_artifact: DataIngestionArtifact
+        data_artifact: DataIngestionArtifact,
+        stage_cache: StageCache | None = None
     ) -> ModelTrainerArtifact:
 
         logger.info("Starting training pipeline")
@@ -23,13 +68,204 @@ class TrainingPipeline:
         if not run_id:
             raise RuntimeError("RUN_ID not set in environment")
 
-        trainer = ModelTrainer()
-        trainer_artifact = trainer.train(data_artifact)
+        profiler = get_profiler()
+        stage_cache = stage_cache or StageCache()
 
+        with profiler.stage("training"):
+            trainer_artifact, training = self._train(data_artifact, stage_cache, run_id)
+
+        # other workers of a multi-worker run only contribute gradients
+        if not DistributedTraining().is_chief:
+            profiler.write()
+            logger.info("Training pipeline completed on non-chief worker")
+            return trainer_artifact
+
+        model_digest = StageCache.digests(training).get("model")
         evaluator = ModelEvaluator()
-        evaluator.plot_training_curves(trainer_artifact, run_id)
-        evaluator.evaluate(data_artifact, trainer_artifact, run_id)
+        plots_dir = Path(ARTIFACTS_DIR) / "plots"
+        report_dir = Path(ARTIFACTS_DIR) / "evaluation"
+
+        if not stage_cache.skip("plotting"):
+            with profiler.stage("plotting"):
+                stage_cache.run(
+                    "plotting",
+                    inputs={
+                        "history": StageCache.digests(training).get("history"),
+                        "code": code_digest(ModelEvaluator.plot_training_curves),
+                    },
+                    outputs={"plot": plots_dir / f"training_curves_{run_id}.png"},
+                    fn=lambda: evaluator.plot_training_curves(trainer_artifact, run_id),
+                    run_id=run_id
+                )
+
+        evaluation = None
+        if not stage_cache.skip("evaluation"):
+            with profiler.stage("evaluation"):
+                evaluation = stage_cache.run(
+                    "evaluation",
+                    inputs={
+                        "model": model_digest,
+                        "data": stage_cache.data_fingerprint(),
+                        "config": stage_cache.config_subset(DATA_CONFIG, PREPROCESSING),
+                        "code": code_digest("src.training.evaluation", *DATASET_CODE),
+                    },
+                    outputs={
+                        "report": report_dir / f"classification_report_{run_id}.csv",
+                        "probabilities": report_dir / f"probabilities_{run_id}.npy",
+                        "labels": report_dir / f"labels_{run_id}.npy",
+                    },
+                    fn=lambda: evaluator.evaluate(
+                        data_artifact,
+                        self._with_model(trainer_artifact),
+                        run_id
+                    ),
+                    run_id=run_id
+                )
+
+        if trainer_artifact.teacher_model_path and not stage_cache.skip("distillation_report"):
+            with profiler.stage("distillation_report"):
+                stage_cache.run(
+                    "distillation_report",
+                    inputs={
+                        "model": model_digest,
+                        "evaluation": StageCache.digests(evaluation),
+                        "teacher": model_version(trainer_artifact.teacher_model_path),
+                        "config": stage_cache.config_subset(DATA_CONFIG, DISTILLATION),
+                        "code": code_digest(DistillationReport),
+                    },
+                    outputs={"report": report_dir / f"distillation_report_{run_id}.json"},
+                    fn=lambda: DistillationReport().write(
+                        data_artifact,
+                        self._with_model(trainer_artifact),
+                        run_id
+                    ),
+                    run_id=run_id
+                )
+
+        exporter = ModelExporter()
+        if exporter.enabled and not stage_cache.skip("export"):
+            with profiler.stage("export"):
+                stage_cache.run(
+                    "export",
+                    inputs={
+                        "model": model_digest,
+                        "data": stage_cache.data_fingerprint(),
+                        "config": stage_cache.config_subset(DATA_CONFIG, PREPROCESSING, EXPORT),
+                        "code": code_digest("src.training.export", *DATASET_CODE),
+                    },
+                    outputs={
+                        "report": exporter.output_dir / f"export_report_{run_id}.json",
+                        "int8": exporter.output_dir / f"{run_id}_int8.tflite",
+                        "float16": exporter.output_dir / f"{run_id}_float16.tflite",
+                    },
+                    fn=lambda: exporter.export(
+                        data_artifact,
+                        self._with_model(trainer_artifact),
+                        run_id
+                    ),
+                    run_id=run_id
+                )
+
+        profile_path = profiler.write()
+        profiler.log_to_mlflow(trainer_artifact.mlflow_run_id)
+
+        # waits for queued metrics and the model upload, ends the MLflow run
+        shutdown_tracking()
+        logger.info(f"Run profile saved at {profile_path}")
 
         logger.info("Training pipeline completed")
 
         return trainer_artifact
+
+    def _train(
+        self,
+        data_artifact: DataIngestionArtifact,
+        stage_cache: StageCache,
+        run_id: str
+    ) -> tuple[ModelTrainerArtifact, dict | None]:
+        """
+        Trains, or restores model and history of an identical earlier run.
+        """
+        config = stage_cache.config
+        inputs = {
+            # everything except settings that only affect later stages
+            "config": {
+                key: value for key, value in config.items()
+                if key not in TRAINING_INDEPENDENT_KEYS
+            },
+            "data": stage_cache.data_fingerprint(),
+            "code": code_digest(*TRAINING_CODE),
+        }
+        if config.get(DISTILLATION, {}).get("enabled", False) and stage_cache.enabled:
+            inputs["teacher"] = model_version(TeacherCache().resolve_teacher())
+
+        model_path = Path(MODEL_DIR) / f"{run_id}.keras"
+        history_path = Path(MODEL_DIR) / f"{run_id}_history.json"
+
+        record = stage_cache.lookup("training", inputs)
+        if record is not None:
+            stage_cache.restore(record, {"model": model_path, "history": history_path})
+            with open(history_path, "r") as f:
+                history = json.load(f)
+
+            teacher_path = record["meta"].get("teacher_model_path")
+            # loaded on first use, later stages may all be cached too;
+            # no MLflow run, the cached run already logged this model
+            return ModelTrainerArtifact(
+                model=None,
+                history=SimpleNamespace(history=history),
+                model_path=str(model_path),
+                teacher_model_path=teacher_path
+            ), record
+
+        trainer_artifact = ModelTrainer().train(data_artifact)
+        if not DistributedTraining().is_chief:
+            return trainer_artifact, None
+
+        with open(history_path, "w") as f:
+            json.dump(trainer_artifact.history.history, f, default=float)
+
+        problem = self._history_problem(trainer_artifact.history.history, config)
+        if problem is not None:
+            # a cached entry is reused by every later run with these inputs
+            logger.warning(f"Training outputs not cached: {problem}")
+            return trainer_artifact, None
+
+        record = stage_cache.save(
+            "training",
+            inputs,
+            {"model": trainer_artifact.model_path, "history": history_path},
+            run_id,
+            meta={"teacher_model_path": trainer_artifact.teacher_model_path}
+        )
+        return trainer_artifact, record
+
+    @staticmethod
+    def _history_problem(history: dict, config: dict) -> str | None:
+        """
+        Why `history` cannot stand for a finished training run, None when
+        it can: it has to hold the same number of epochs for every
+        metric, as many as configured (fewer only with early stopping).
+        """
+        lengths = {len(values) for values in history.values()}
+        if not history or lengths == {0}:
+            return "the training history is empty"
+        if len(lengths) > 1:
+            return f"the history metrics cover different epoch counts {sorted(lengths)}"
+
+        epochs = lengths.pop()
+        configured = config[MODEL_CONFIG]["epochs"]
+        early_stopping = "early_stopping" in config.get("callbacks", {})
+        if epochs > configured or (epochs < configured and not early_stopping):
+            return f"the history covers {epochs} epochs, the model was trained for {configured}"
+        return None
+
+    @staticmethod
+    def _with_model(trainer_artifact: ModelTrainerArtifact) -> ModelTrainerArtifact:
+        """
+        Loads the model of a restored training stage.
+        """
+        if trainer_artifact.model is None:
+            from src.inference.predictor import load_inference_model
+            trainer_artifact.model = load_inference_model(trainer_artifact.model_path)
+        return trainer_artifact
@@ -0,0 +1,320 @@
+import os
+import json
+import queue
+import shutil
+import threading
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+
+from src.utilities.utils import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+def optimizer_variables(optimizer) -> list:
+    """
+    Optimizer state variables (a property on current Keras optimizers,
+    a method on legacy ones).
+    """
+    variables = optimizer.variables
+    return list(variables() if callable(variables) else variables)
+
+
+class CheckpointStore:
+    """
+    Training checkpoints of one run on disk.
+
+    Layout:
+        directory/
+            epoch_0003/
+                weights.npz     model weights
+                optimizer.npz   optimizer state (iterations, slots)
+                meta.json       epoch, monitored value
+            history.json        logs of every epoch (kept by retention)
+
+    Checkpoints are written to a temporary directory and renamed into
+    place, so a crash never leaves a partial checkpoint behind.
+    """
+
+    def __init__(self, directory: str, monitor: str = "val_loss", mode: str = "min"):
+        if mode not in ("min", "max"):
+            raise ValueError(f"Unknown mode '{mode}', expected 'min' or 'max'")
+
+        self.directory = Path(directory)
+        self.monitor = monitor
+        self.mode = mode
+
+    def write(
+        self,
+        epoch: int,
+        value,
+        weights: list,
+        optimizer_state: list,
+        logs: dict | None = None
+    ) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        final_dir = self.directory / f"epoch_{epoch:04d}"
+        tmp_dir = self.directory / f".epoch_{epoch:04d}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir()
+
+        np.savez(tmp_dir / "weights.npz", *weights)
+        np.savez(tmp_dir / "optimizer.npz", *optimizer_state)
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump({"epoch": epoch, self.monitor: value}, f, indent=2)
+
+        if final_dir.exists():
+            shutil.rmtree(final_dir)
+        os.rename(tmp_dir, final_dir)
+
+        if logs is not None:
+            self._record_epoch(epoch, logs)
+        return final_dir
+
+    def history(self, until_epoch: int | None = None) -> dict:
+        """
+        Keras-style history (metric -> per-epoch values) of the epochs
+        before `until_epoch` (default: all recorded epochs).
+        """
+        epochs = self._read_history()
+        if until_epoch is None:
+            until_epoch = len(epochs)
+
+        history = {}
+        for epoch in range(until_epoch):
+            for name, value in epochs.get(str(epoch), {}).items():
+                history.setdefault(name, []).append(value)
+        return history
+
+    def _read_history(self) -> dict:
+        path = self.directory / "history.json"
+        if not path.exists():
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _record_epoch(self, epoch: int, logs: dict) -> None:
+        epochs = self._read_history()
+        epochs[str(epoch)] = {name: float(value) for name, value in logs.items()}
+
+        # replaced in whole, like the checkpoints
+        tmp_path = self.directory / ".history.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(epochs, f, indent=2)
+        os.replace(tmp_path, self.directory / "history.json")
+
+    def list(self) -> list[dict]:
+        """
+        Metadata of every complete checkpoint, oldest first.
+        """
+        if not self.directory.exists():
+            return []
+
+        checkpoints = []
+        for meta_path in self.directory.glob("epoch_*/meta.json"):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            meta["path"] = meta_path.parent
+            checkpoints.append(meta)
+
+        return sorted(checkpoints, key=lambda m: m["epoch"])
+
+    def best(self) -> dict | None:
+        scored = [m for m in self.list() if m.get(self.monitor) is not None]
+        if not scored:
+            return None
+        pick = min if self.mode == "min" else max
+        return pick(scored, key=lambda m: m[self.monitor])
+
+    @staticmethod
+    def load_weights(checkpoint: dict) -> list:
+        with np.load(checkpoint["path"] / "weights.npz") as data:
+            return [data[f"arr_{i}"] for i in range(len(data.files))]
+
+    def apply_retention(self, keep_last: int, keep_best: int) -> None:
+        """
+        Deletes every checkpoint that is neither among the `keep_last`
+        most recent nor the `keep_best` best ones.
+        """
+        checkpoints = self.list()
+
+        keep = {m["epoch"] for m in checkpoints[-keep_last:]} if keep_last else set()
+
+        scored = [m for m in checkpoints if m.get(self.monitor) is not None]
+        scored.sort(key=lambda m: m[self.monitor], reverse=self.mode == "max")
+        keep |= {m["epoch"] for m in scored[:keep_best]}
+
+        for meta in checkpoints:
+            if meta["epoch"] not in keep:
+                shutil.rmtree(meta["path"], ignore_errors=True)
+
+    def restore_latest(self, model: tf.keras.Model) -> int:
+        """
+        Loads weights and optimizer state of the most recent checkpoint
+        into the compiled `model`.
+
+        Returns:
+            initial_epoch (int): epoch to continue from, 0 if there is
+            no checkpoint
+        """
+        checkpoints = self.list()
+        if not checkpoints:
+            return 0
+
+        latest = checkpoints[-1]
+        model.set_weights(self.load_weights(latest))
+
+        # optimizer slots are created lazily, build them before assigning
+        model.optimizer.build(model.trainable_variables)
+        variables = optimizer_variables(model.optimizer)
+        with np.load(latest["path"] / "optimizer.npz") as data:
+            if len(data.files) == len(variables):
+                for i, variable in enumerate(variables):
+                    variable.assign(data[f"arr_{i}"])
+            else:
+                logger.warning(
+                    f"Optimizer state of {latest['path']} does not match the "
+                    f"optimizer ({len(data.files)} vs {len(variables)} variables), "
+                    "starting with a fresh optimizer"
+                )
+
+        logger.info(f"Resumed from {latest['path']} (epoch {latest['epoch'] + 1})")
+        return latest["epoch"] + 1
+
+
+def resume_fit(
+    model: tf.keras.Model,
+    store: CheckpointStore,
+    epochs: int,
+    initial_epoch: int,
+    **fit_kwargs
+) -> tf.keras.callbacks.History:
+    """
+    `model.fit` from `initial_epoch` (as returned by `restore_latest`),
+    with the history of the epochs trained before merged in front.
+
+    A run that already trained all `epochs` is not fit again (Keras
+    would return an empty history); its recorded history is returned.
+    """
+    previous = store.history(until_epoch=initial_epoch) if initial_epoch else {}
+
+    if initial_epoch >= epochs:
+        logger.info(f"All {epochs} epochs already trained, skipping fit")
+        history = tf.keras.callbacks.History()
+        history.set_model(model)
+        history.history = previous
+        history.epoch = list(range(initial_epoch))
+        return history
+
+    history = model.fit(epochs=epochs, initial_epoch=initial_epoch, **fit_kwargs)
+    if previous:
+        history.history = {
+            name: previous.get(name, []) + list(values)
+            for name, values in history.history.items()
+        }
+        history.epoch = list(range(initial_epoch)) + list(history.epoch)
+    return history
+
+
+class AsyncCheckpoint(tf.keras.callbacks.Callback):
+    """
+    Non-blocking replacement for `ModelCheckpoint`.
+
+    At the end of every epoch the weights and optimizer state are copied
+    to host memory; a background thread serializes the copy into a
+    `CheckpointStore` and applies the keep_last / keep_best retention.
+    Training only waits when two checkpoints are already pending.
+
+    The best weights (by `monitor`) are kept in memory. When training ends
+    they are loaded back into the model and `export_model` (the model
+    that contains it, e.g. the full model around a trained head) is saved
+    to `export_path` as a `.keras` file.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        export_model: tf.keras.Model | None = None,
+        export_path: str | None = None,
+        keep_last: int = 2,
+        keep_best: int = 1
+    ):
+        super().__init__()
+        self.store = store
+        self.export_model = export_model
+        self.export_path = export_path
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+
+        self._queue = queue.Queue(maxsize=2)
+        self._thread = None
+        self._best_value = None
+        self._best_weights = None
+
+    def on_train_begin(self, logs=None):
+        # a resumed run competes with the best checkpoint written before
+        best = self.store.best()
+        if best is not None:
+            self._best_value = best[self.store.monitor]
+            self._best_weights = self.store.load_weights(best)
+
+        self._thread = threading.Thread(
+            target=self._work,
+            name="checkpoint-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.store.monitor)
+        value = float(value) if value is not None else None
+
+        weights = self.model.get_weights()
+        optimizer_state = [v.numpy() for v in optimizer_variables(self.model.optimizer)]
+
+        if value is not None and self._improved(value):
+            self._best_value = value
+            self._best_weights = weights
+
+        self._queue.put((epoch, value, weights, optimizer_state, dict(logs or {})))
+
+    def on_train_end(self, logs=None):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+        if self.export_path is None:
+            return
+
+        if self._best_weights is not None:
+            self.model.set_weights(self._best_weights)
+            logger.info(f"Restored best weights ({self.store.monitor}={self._best_value:.4f})")
+
+        model = self.export_model or self.model
+        model.save(self.export_path)
+        logger.info(f"Best model saved at {self.export_path}")
+
+    def _improved(self, value: float) -> bool:
+        if self._best_value is None:
+            return True
+        if self.store.mode == "min":
+            return value < self._best_value
+        return value > self._best_value
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            epoch, value, weights, optimizer_state, logs = item
+            try:
+                path = self.store.write(epoch, value, weights, optimizer_state, logs)
+                self.store.apply_retention(self.keep_last, self.keep_best)
+                logger.info(f"Checkpoint written to {path}")
+            except Exception as e:
+                logger.error(f"Writing checkpoint for epoch {epoch + 1} failed: {e}")
@@ -0,0 +1,439 @@
+import json
+import time
+import shutil
+import zipfile
+import hashlib
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+
+from src.data.image_index import ImageIndex
+from src.data.image_decoding import decode_resized, decoder_id
+from src.data.data_preprocessing import DataPreprocessing
+from src.utilities.utils import load_config, get_logger
+from src.entity.model_trainer_entity import ModelTrainerArtifact
+from src.entity.data_ingestion_entity import DataIngestionArtifact
+from src.constants.paths import (
+    MODEL_PARAMS_FILE, ARTIFACTS_DIR, TEACHER_CACHE_DIR, FILE_HASHES_NAME
+)
+from src.constants.config_keys import DATA_CONFIG, PREPROCESSING, DISTILLATION
+
+logger = get_logger(__name__)
+
+# probabilities are clipped before taking logs
+EPSILON = 1e-7
+
+# layers only a `VGG16Model` contains (its backbone and feature extractor)
+TEACHER_LAYERS = ("vgg16_features", "block5_conv3")
+
+
+def keras_model_has_layers(model_path, layer_names) -> bool | None:
+    """
+    True when the model config of a `.keras` file (or of the `.keras`
+    file inside an MLflow model directory) names any of `layer_names`,
+    without loading the model. None when the file format has no
+    readable config (e.g. `.tflite`).
+    """
+    model_path = Path(model_path)
+    if model_path.is_dir():
+        model_path = next(iter(sorted(model_path.rglob("*.keras"))), None)
+    if model_path is None or model_path.suffix != ".keras":
+        return None
+
+    try:
+        with zipfile.ZipFile(model_path) as archive:
+            config = json.loads(archive.read("config.json"))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+    pending, names = [config], set()
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get("name"), str):
+                names.add(node["name"])
+            pending += node.values()
+        elif isinstance(node, list):
+            pending += node
+    return any(name in names for name in layer_names)
+
+
+class TeacherCache:
+    """
+    Disk cache of a teacher model's predictions on the training images.
+
+    The teacher runs once over the clean training images; its log
+    probabilities are stored and reused as soft targets every epoch
+    (and by later runs distilling from the same teacher).
+
+    Cache entries are keyed by:
+    - content hash of every image (and its label)
+    - IMG_SIZE and the decoding path
+    - teacher model file version (path, size, mtime)
+
+    Layout:
+        cache_dir/<key>/
+            log_probs.npy   (num_images, num_classes) float32
+            meta.json
+    """
+
+    def __init__(self):
+        """
+        Configuration keys used:
+        - distillation.teacher
+        - distillation.cache_dir
+        """
+        self.config = load_config(MODEL_PARAMS_FILE)
+        data_cfg = self.config[DATA_CONFIG]
+        distill_cfg = self.config.get(DISTILLATION, {})
+
+        self.teacher_spec = distill_cfg.get("teacher", "best")
+        self.cache_dir = Path(distill_cfg.get("cache_dir", TEACHER_CACHE_DIR))
+        self.cache_images = (
+            self.config.get(PREPROCESSING, {}).get("cache", {}).get("mode", "off") != "off"
+        )
+
+        self.TRAIN_DIR = data_cfg["TRAIN_DIR"]
+        self.IMG_SIZE = tuple(data_cfg["IMG_SIZE"])
+        self.scaled_decode = data_cfg.get("scaled_jpeg_decode", True)
+        self.BATCH_SIZE = data_cfg["BATCH_SIZE"]
+        self.SEED = data_cfg["SEED"]
+
+    def resolve_teacher(self) -> Path:
+        """
+        The teacher model file, which has to be a trained VGG16 model:
+        `best` / `latest` may otherwise pick an earlier distilled student
+        from the same model directory.
+        """
+        from src.inference.model_manager import ModelManager
+
+        path = ModelManager.resolve(self.teacher_spec)
+        is_vgg16 = keras_model_has_layers(path, TEACHER_LAYERS)
+
+        if is_vgg16 is False:
+            raise ValueError(
+                f"Teacher '{self.teacher_spec}' resolved to {path}, which is not a "
+                f"VGG16 model; set distillation.teacher to a VGG16 RUN_ID or path"
+            )
+        if is_vgg16 is None:
+            if self.teacher_spec in ("best", "latest"):
+                raise ValueError(
+                    f"Cannot tell whether {path} is a VGG16 model; set "
+                    f"distillation.teacher to an explicit RUN_ID or path"
+                )
+            logger.warning(f"Cannot verify that teacher {path} is a VGG16 model")
+        return path
+
+    def build_train_dataset(
+        self,
+        teacher_path: Path,
+        class_names: list[str]
+    ) -> tf.data.Dataset:
+        """
+        Returns batches of (image, (label, teacher_log_probs)), shuffled
+        and augmented like the `DataPreprocessing` training set.
+        """
+        index = ImageIndex.from_directory(self.TRAIN_DIR, class_names)
+        if len(index) == 0:
+            raise ValueError(f"No images found in {self.TRAIN_DIR}")
+
+        log_probs = self._load_or_compute(teacher_path, index)
+        if log_probs.shape[1] != len(class_names):
+            raise ValueError(
+                f"Teacher {teacher_path} predicts {log_probs.shape[1]} classes, "
+                f"the data has {len(class_names)}"
+            )
+
+        ds = tf.data.Dataset.from_tensor_slices((
+            index.paths,
+            np.asarray(index.labels, dtype=np.int32),
+            log_probs
+        )).map(
+            lambda path, y, t: (self._load_image(path), (y, t)),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+        if self.cache_images:
+            ds = ds.cache()
+
+        ds = ds.shuffle(
+            len(index),
+            seed=self.SEED,
+            reshuffle_each_iteration=True
+        ).batch(self.BATCH_SIZE)
+
+        augmentation = DataPreprocessing().augmentation
+        if augmentation is not None:
+            ds = ds.map(
+                lambda x, targets: (augmentation(x, training=True), targets),
+                num_parallel_calls=tf.data.AUTOTUNE
+            )
+
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+    def _load_or_compute(self, teacher_path: Path, index: ImageIndex) -> np.ndarray:
+        from src.inference.prediction_cache import model_version
+
+        key = hashlib.sha256(json.dumps({
+            "images": index.content_fingerprint(self.cache_dir / FILE_HASHES_NAME),
+            "img_size": list(self.IMG_SIZE),
+            "decoder": decoder_id(self.scaled_decode),
+            "teacher": model_version(teacher_path),
+        }, sort_keys=True).encode()).hexdigest()[:32]
+        entry_dir = self.cache_dir / key
+
+        if (entry_dir / "meta.json").exists():
+            logger.info(f"Teacher cache hit: {entry_dir}")
+        else:
+            logger.info(f"Teacher cache miss, scoring {len(index)} images with {teacher_path}")
+            self._compute(teacher_path, index, entry_dir)
+
+        return np.load(entry_dir / "log_probs.npy")
+
+    def _compute(self, teacher_path: Path, index: ImageIndex, entry_dir: Path) -> None:
+        from src.inference.predictor import load_inference_model, make_predict_fn
+
+        predict_fn = make_predict_fn(load_inference_model(teacher_path))
+
+        images_ds = tf.data.Dataset.from_tensor_slices(index.paths).map(
+            self._load_image,
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).batch(self.BATCH_SIZE).prefetch(tf.data.AUTOTUNE)
+
+        log_probs = np.concatenate([
+            np.log(np.clip(predict_fn(images), EPSILON, 1.0))
+            for images in images_ds
+        ]).astype(np.float32)
+
+        teacher_accuracy = float(np.mean(log_probs.argmax(axis=1) == np.asarray(index.labels)))
+
+        # write to a temporary directory first so an interrupted run
+        # never leaves a half-written entry behind
+        tmp_dir = entry_dir.with_name(entry_dir.name + ".tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        np.save(tmp_dir / "log_probs.npy", log_probs)
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump({
+                "teacher": str(teacher_path),
+                "num_images": len(index),
+                "num_classes": int(log_probs.shape[1]),
+                "teacher_train_accuracy": teacher_accuracy,
+            }, f, indent=2)
+
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        tmp_dir.rename(entry_dir)
+
+        logger.info(
+            f"Teacher predictions cached at {entry_dir} "
+            f"(train accuracy {teacher_accuracy:.4f})"
+        )
+
+    def _load_image(self, path):
+        """
+        Decodes and resizes an image the same way as `DataIngestion`,
+        then normalizes it as `DataPreprocessing` does.
+        """
+        img = decode_resized(tf.io.read_file(path), self.IMG_SIZE, self.scaled_decode)
+        return img / 255.0
+
+
+class Distiller(tf.keras.Model):
+    """
+    Trains `student` on a mix of hard labels and teacher soft targets:
+
+        loss = alpha * T^2 * KL(softmax(teacher / T) || softmax(student / T))
+               + (1 - alpha) * cross_entropy(labels, student)
+
+    Both models end in a softmax, so log probabilities are used as
+    logits. Training batches are (image, (label, teacher_log_probs));
+    validation batches are plain (image, label) and report the hard
+    label loss, so `val_loss` means the same as for regular training.
+
+    Weights are the student's, so checkpoints and early stopping work
+    on the Distiller while the student is what gets exported.
+    """
+
+    def __init__(self, student: tf.keras.Model, temperature: float = 4.0, alpha: float = 0.9):
+        super().__init__()
+        self.student = student
+        self.temperature = float(temperature)
+        self.alpha = float(alpha)
+
+        self.loss_tracker = tf.keras.metrics.Mean(name="loss")
+        self.kd_loss_tracker = tf.keras.metrics.Mean(name="kd_loss")
+        self.accuracy = tf.keras.metrics.SparseCategoricalAccuracy(name="accuracy")
+
+    @property
+    def metrics(self):
+        return [self.loss_tracker, self.kd_loss_tracker, self.accuracy]
+
+    def call(self, inputs, training=False):
+        return self.student(inputs, training=training)
+
+    def train_step(self, data):
+        images, (labels, teacher_log_probs) = data
+
+        with tf.GradientTape() as tape:
+            probs = self.student(images, training=True)
+            hard_loss = self._hard_loss(labels, probs)
+            kd_loss = self._kd_loss(teacher_log_probs, probs)
+            loss = self.alpha * kd_loss + (1.0 - self.alpha) * hard_loss
+            # gradients are summed over replicas
+            scaled_loss = loss / self.distribute_strategy.num_replicas_in_sync
+            # Keras 3 optimizers scale the loss here and unscale the
+            # gradients in apply_gradients (a no-op without loss scaling);
+            # the Keras 2 LossScaleOptimizer needs both steps explicitly
+            keras3_scaling = hasattr(self.optimizer, "scale_loss")
+            if keras3_scaling:
+                scaled_loss = self.optimizer.scale_loss(scaled_loss)
+            elif hasattr(self.optimizer, "get_scaled_loss"):
+                scaled_loss = self.optimizer.get_scaled_loss(scaled_loss)
+
+        variables = self.student.trainable_variables
+        gradients = tape.gradient(scaled_loss, variables)
+        if not keras3_scaling and hasattr(self.optimizer, "get_unscaled_gradients"):
+            gradients = self.optimizer.get_unscaled_gradients(gradients)
+        self.optimizer.apply_gradients(zip(gradients, variables))
+
+        self.loss_tracker.update_state(loss)
+        self.kd_loss_tracker.update_state(kd_loss)
+        self.accuracy.update_state(labels, probs)
+        return {m.name: m.result() for m in self.metrics}
+
+    def test_step(self, data):
+        images, labels = data
+        probs = self.student(images, training=False)
+
+        self.loss_tracker.update_state(self._hard_loss(labels, probs))
+        self.accuracy.update_state(labels, probs)
+        return {"loss": self.loss_tracker.result(), "accuracy": self.accuracy.result()}
+
+    @staticmethod
+    def _hard_loss(labels, probs):
+        return tf.reduce_mean(
+            tf.keras.losses.sparse_categorical_crossentropy(labels, probs)
+        )
+
+    def _kd_loss(self, teacher_log_probs, probs):
+        t = self.temperature
+        teacher = tf.nn.softmax(teacher_log_probs / t, axis=-1)
+        teacher_log = tf.nn.log_softmax(teacher_log_probs / t, axis=-1)
+        student_log = tf.nn.log_softmax(
+            tf.math.log(tf.clip_by_value(probs, EPSILON, 1.0)) / t, axis=-1
+        )
+        kl = tf.reduce_sum(teacher * (teacher_log - student_log), axis=-1)
+        # T^2 keeps the soft-target gradients on the scale of the hard loss
+        return tf.reduce_mean(kl) * t * t
+
+
+class DistillationReport:
+    """
+    Compares teacher and student on the test set: accuracy (with the
+    `ModelEvaluator` metrics), images/sec of batched inference and
+    parameter count.
+    """
+
+    def __init__(self):
+        """
+        Configuration keys used:
+        - distillation.benchmark_repeats
+        """
+        self.config = load_config(MODEL_PARAMS_FILE)
+        distill_cfg = self.config.get(DISTILLATION, {})
+        self.repeats = distill_cfg.get("benchmark_repeats", 20)
+
+    def write(
+        self,
+        data_artifact: DataIngestionArtifact,
+        model_artifact: ModelTrainerArtifact,
+        run_id: str
+    ) -> Path:
+        """
+        Returns:
+            Path to `distillation_report_<run_id>.json`.
+        """
+        from src.training.evaluation import ModelEvaluator
+        from src.inference.predictor import load_inference_model
+
+        teacher = load_inference_model(model_artifact.teacher_model_path)
+        evaluator = ModelEvaluator()
+
+        summary = {}
+        for name, model, path in (
+            ("teacher", teacher, model_artifact.teacher_model_path),
+            ("student", model_artifact.model, model_artifact.model_path),
+        ):
+            summary[name] = self._measure(evaluator, model, data_artifact)
+            summary[name]["model_path"] = str(path)
+
+        summary["speedup"] = (
+            summary["student"]["images_per_sec"] / summary["teacher"]["images_per_sec"]
+        )
+        summary["accuracy_delta"] = (
+            summary["student"]["accuracy"] - summary["teacher"]["accuracy"]
+        )
+
+        logger.info(
+            f"Distillation: student {summary['speedup']:.1f}x faster than the teacher, "
+            f"accuracy {summary['student']['accuracy']:.4f} vs "
+            f"{summary['teacher']['accuracy']:.4f} ({summary['accuracy_delta']:+.4f})"
+        )
+
+        report_dir = Path(ARTIFACTS_DIR) / "evaluation"
+        report_dir.mkdir(parents=True, exist_ok=True)
+        report_path = report_dir / f"distillation_report_{run_id}.json"
+        with open(report_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Distillation report saved at {report_path}")
+
+        self._log_to_mlflow(model_artifact.mlflow_run_id, summary, report_path)
+
+        return report_path
+
+    def _measure(self, evaluator, model, data_artifact: DataIngestionArtifact) -> dict:
+        from src.inference.predictor import make_predict_fn
+
+        predict_fn = make_predict_fn(model)
+        report = evaluator.compute_report(
+            predict_fn, data_artifact.test_ds, data_artifact.class_names
+        )
+
+        images, _ = next(iter(data_artifact.test_ds))
+        images = np.asarray(images)
+        predict_fn(images)  # tracing
+        timings = []
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            predict_fn(images)
+            timings.append(time.perf_counter() - start)
+
+        return {
+            "accuracy": float(report["accuracy"]),
+            "images_per_sec": len(images) / float(np.median(timings)),
+            "params": int(model.count_params()) if hasattr(model, "count_params") else None,
+        }
+
+    @staticmethod
+    def _log_to_mlflow(mlflow_run_id: str | None, summary: dict, report_path: Path) -> None:
+        if not mlflow_run_id:
+            return
+
+        from mlflow.tracking import MlflowClient
+        from mlflow.entities import Metric
+
+        timestamp = int(time.time() * 1000)
+        metrics = [
+            Metric("distill_speedup", summary["speedup"], timestamp, 0),
+            Metric("distill_accuracy_delta", summary["accuracy_delta"], timestamp, 0),
+            Metric("teacher_accuracy", summary["teacher"]["accuracy"], timestamp, 0),
+            Metric("teacher_images_per_sec", summary["teacher"]["images_per_sec"], timestamp, 0),
+            Metric("student_images_per_sec", summary["student"]["images_per_sec"], timestamp, 0),
+        ]
+
+        client = MlflowClient()
+        client.log_batch(mlflow_run_id, metrics=metrics)
+        client.log_artifact(mlflow_run_id, str(report_path))
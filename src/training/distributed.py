@@ -0,0 +1,286 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import yaml
+import tensorflow as tf
+
+from src.utilities.utils import load_config, get_logger, worker_task
+from src.constants.paths import MODEL_PARAMS_FILE
+from src.constants.config_keys import DISTRIBUTED, PERFORMANCE
+
+logger = get_logger(__name__)
+
+COMMUNICATION = {
+    "auto": "AUTO",
+    "ring": "RING",
+    "nccl": "NCCL",
+}
+
+# collective ops can only be configured once per process
+_strategy = None
+
+
+class DistributedTraining:
+    """
+    Multi-worker data-parallel training with
+    `tf.distribute.MultiWorkerMirroredStrategy`.
+
+    The cluster comes from the TF_CONFIG environment variable or, when it
+    is not set, from `distributed.workers` (host:port list) together with
+    the WORKER_INDEX environment variable.
+
+    - data_config.BATCH_SIZE stays the per-worker batch size; with
+      `scale_batch_size` the global batch is BATCH_SIZE * num_workers
+    - with `scale_learning_rate` the learning rate is scaled by
+      num_workers, ramped up linearly over `warmup_epochs`
+    - only the chief worker logs to MLflow and writes checkpoints
+
+    When disabled, the default (single device) strategy is used.
+    """
+
+    def __init__(self):
+        config = load_config(MODEL_PARAMS_FILE)
+        dist_cfg = config.get(DISTRIBUTED, {})
+
+        self.enabled = dist_cfg.get("enabled", False)
+        self.communication = dist_cfg.get("communication", "ring")
+        self.scale_batch_size = dist_cfg.get("scale_batch_size", True)
+        self.scale_learning_rate = dist_cfg.get("scale_learning_rate", True)
+        self.warmup_epochs = dist_cfg.get("warmup_epochs", 2)
+
+        if self.communication not in COMMUNICATION:
+            raise ValueError(
+                f"Unknown communication '{self.communication}', "
+                f"expected one of {sorted(COMMUNICATION)}"
+            )
+
+        workers = dist_cfg.get("workers") or []
+        if self.enabled and workers and not os.getenv("TF_CONFIG"):
+            os.environ["TF_CONFIG"] = json.dumps({
+                "cluster": {"worker": workers},
+                "task": {"type": "worker", "index": int(os.getenv("WORKER_INDEX", "0"))},
+            })
+
+        self.task_type, self.task_index, self.num_workers = worker_task()
+        if not self.enabled:
+            self.num_workers = 1
+
+    @property
+    def is_chief(self) -> bool:
+        """
+        The "chief" task, or worker 0 of a cluster without one.
+        """
+        if not self.enabled or self.task_type == "chief":
+            return True
+        has_chief = "chief" in json.loads(os.getenv("TF_CONFIG") or "{}").get("cluster", {})
+        return self.task_type == "worker" and self.task_index == 0 and not has_chief
+
+    def setup(self) -> None:
+        """
+        Creates the strategy. Has to run before TensorFlow executes any op,
+        so entry points call it right after the performance profile.
+        """
+        if self.enabled:
+            logger.info(f"Distribution strategy ready: {type(self.strategy).__name__}")
+
+    @property
+    def strategy(self) -> tf.distribute.Strategy:
+        if not self.enabled:
+            return tf.distribute.get_strategy()
+
+        global _strategy
+        if _strategy is None:
+            implementation = getattr(
+                tf.distribute.experimental.CommunicationImplementation,
+                COMMUNICATION[self.communication]
+            )
+            _strategy = tf.distribute.MultiWorkerMirroredStrategy(
+                communication_options=tf.distribute.experimental.CommunicationOptions(
+                    implementation=implementation
+                )
+            )
+            logger.info(
+                f"Multi-worker strategy: {self.task_type} {self.task_index} "
+                f"of {self.num_workers} workers, "
+                f"{_strategy.num_replicas_in_sync} replicas in sync"
+            )
+        return _strategy
+
+    def global_batch_size(self, per_worker_batch_size: int) -> int:
+        if self.scale_batch_size:
+            return per_worker_batch_size * self.num_workers
+        return per_worker_batch_size
+
+    def distribute(self, train_ds, val_ds, per_worker_batch_size: int):
+        """
+        Re-batches both datasets to the global batch size and shards them
+        by element, so every worker trains on a disjoint part of each
+        global batch.
+
+        Training drops the last partial batch: every worker has to run the
+        same number of steps or the gradient all-reduce never completes.
+        """
+        if not self.enabled:
+            return train_ds, val_ds
+
+        global_batch = self.global_batch_size(per_worker_batch_size)
+
+        options = tf.data.Options()
+        options.experimental_distribute.auto_shard_policy = (
+            tf.data.experimental.AutoShardPolicy.DATA
+        )
+
+        train_ds = train_ds.rebatch(global_batch, drop_remainder=True).with_options(options)
+        val_ds = val_ds.rebatch(global_batch).with_options(options)
+
+        logger.info(
+            f"Global batch size {global_batch} "
+            f"({global_batch // self.num_workers} per worker)"
+        )
+        return train_ds, val_ds
+
+    def callbacks(self) -> list:
+        if not self.enabled or not self.scale_learning_rate or self.num_workers == 1:
+            return []
+        return [LearningRateWarmup(self.num_workers, self.warmup_epochs)]
+
+
+class LearningRateWarmup(tf.keras.callbacks.Callback):
+    """
+    Linearly ramps the learning rate from the compiled value to
+    `multiplier` times that value over `warmup_epochs`
+    (Goyal et al., "Accurate, Large Minibatch SGD").
+    """
+
+    def __init__(self, multiplier: float, warmup_epochs: int):
+        super().__init__()
+        self.multiplier = multiplier
+        self.warmup_epochs = warmup_epochs
+        self._epoch = 0
+
+    def on_train_begin(self, logs=None):
+        self.base_lr = float(self.model.optimizer.learning_rate.numpy())
+        self.target_lr = self.base_lr * self.multiplier
+        logger.info(
+            f"Learning rate warmup {self.base_lr:g} -> {self.target_lr:g} "
+            f"over {self.warmup_epochs} epochs"
+        )
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch = epoch
+
+    def on_train_batch_begin(self, batch, logs=None):
+        steps = self.params.get("steps")
+        if steps:
+            total = self.warmup_epochs * steps
+            done = self._epoch * steps + batch
+        else:
+            # unknown epoch length: ramp once per epoch
+            total, done = self.warmup_epochs, self._epoch
+        if total == 0 or done >= total:
+            lr = self.target_lr
+        else:
+            lr = self.base_lr + (self.target_lr - self.base_lr) * done / total
+        self.model.optimizer.learning_rate.assign(lr)
+
+    def on_epoch_end(self, epoch, logs=None):
+        if logs is not None:
+            logs["learning_rate"] = float(self.model.optimizer.learning_rate.numpy())
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def launch_local(num_workers: int, threads_per_worker: int | None = None) -> int:
+    """
+    Runs `python -m src.main` as `num_workers` cooperating processes on
+    this host, for testing multi-worker training without a cluster.
+
+    Shared artifacts (validation manifest, materialized shards) are
+    prepared once up front so the workers do not race writing them.
+    """
+    from src.data.data_validation import DataValidation
+    from src.data.data_ingestion import DataIngestion
+    from src.data.data_materialization import DataMaterialization
+
+    config = load_config(MODEL_PARAMS_FILE)
+
+    DataValidation().validate()
+    if DataMaterialization().enabled:
+        DataIngestion().load()
+
+    config.setdefault(DISTRIBUTED, {})["enabled"] = True
+    config[DISTRIBUTED].pop("workers", None)
+
+    # workers share the host's cores instead of each using all of them
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+    perf_cfg = config.setdefault(PERFORMANCE, {})
+    profile = perf_cfg.setdefault("profiles", {}).setdefault(
+        perf_cfg.get("profile", "default"), {}
+    )
+    profile["intra_op_threads"] = threads
+
+    workers = [f"localhost:{_free_port()}" for _ in range(num_workers)]
+    run_id = os.getenv("RUN_ID") or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    with tempfile.TemporaryDirectory(prefix="distributed_") as tmp:
+        config_path = Path(tmp) / "model_parameters.yaml"
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+
+        processes = []
+        for index in range(num_workers):
+            env = {
+                **os.environ,
+                "MODEL_PARAMS_FILE": str(config_path),
+                "RUN_ID": run_id if index == 0 else f"{run_id}_worker{index}",
+                "TF_CONFIG": json.dumps({
+                    "cluster": {"worker": workers},
+                    "task": {"type": "worker", "index": index},
+                }),
+            }
+            processes.append(
+                subprocess.Popen([sys.executable, "-m", "src.main"], env=env)
+            )
+        logger.info(
+            f"Started {num_workers} workers ({threads} threads each), RUN_ID={run_id}"
+        )
+
+        # a failed worker blocks the others in the next all-reduce
+        while True:
+            codes = [p.poll() for p in processes]
+            if any(code not in (None, 0) for code in codes):
+                for p in processes:
+                    if p.poll() is None:
+                        p.terminate()
+                for p in processes:
+                    p.wait()
+                failed = [i for i, code in enumerate(codes) if code not in (None, 0)]
+                logger.error(f"Worker(s) {failed} failed, stopped the remaining workers")
+                return 1
+            if all(code == 0 for code in codes):
+                return 0
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m src.training.distributed",
+        description="Run multi-worker training as several local processes."
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads-per-worker", type=int)
+    args = parser.parse_args()
+
+    sys.exit(launch_local(args.workers, args.threads_per_worker))
@@ -1,8 +1,5 @@
 import numpy as np
-import pandas as pd
 from pathlib import Path
-import matplotlib.pyplot as plt
-from sklearn.metrics import classification_report
 
 from src.utilities.utils import load_config, get_logger
 from src.entity.model_trainer_entity import ModelTrainerArtifact
@@ -27,18 +24,24 @@ class ModelEvaluator:
 
         logger.info("Model evaluation started")
 
-        y_true, y_pred = [], []
+        import pandas as pd
+        import tensorflow as tf
 
-        for images, labels in data_artifact.test_ds:
-            preds = model_artifact.model.predict(images)
-            y_true.extend(labels.numpy())
-            y_pred.extend(np.argmax(preds, axis=1))
+        model = model_artifact.model
+        predict_step = tf.function(
+            lambda x: model(x, training=False),
+            reduce_retracing=True
+        )
+
+        y_true, probabilities, confusion = self._stream_predictions(
+            predict_step,
+            data_artifact.test_ds,
+            data_artifact.num_classes
+        )
 
-        report = classification_report(
-            y_true,
-            y_pred,
-            target_names=data_artifact.class_names,
-            output_dict=True
+        report = self._report_from_confusion(
+            confusion,
+            data_artifact.class_names
         )
 
         df = pd.DataFrame(report).transpose()
@@ -49,16 +52,154 @@ class ModelEvaluator:
         report_path = report_dir / f"classification_report_{run_id}.csv"
         df.to_csv(report_path)
 
+        # raw outputs, so later analysis does not need to re-run inference
+        probs_path = report_dir / f"probabilities_{run_id}.npy"
+        np.save(probs_path, probabilities.astype(np.float16))
+        np.save(report_dir / f"labels_{run_id}.npy", y_true)
+
         logger.info(f"Classification report saved at {report_path}")
+        logger.info(f"Test probabilities saved at {probs_path}")
 
         return report_path
 
+    def compute_report(
+        self,
+        predict_fn,
+        dataset,
+        class_names: list[str]
+    ) -> dict:
+        """
+        Classification report of any batch -> probabilities callable
+        (Keras or TFLite) over `dataset`.
+        """
+        _, _, confusion = self._stream_predictions(
+            predict_fn, dataset, len(class_names)
+        )
+        return self._report_from_confusion(confusion, class_names)
+
+    @staticmethod
+    def _stream_predictions(
+        predict_fn,
+        dataset,
+        num_classes: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Runs `predict_fn` once over every batch of `dataset`.
+
+        Labels and probabilities are written into preallocated arrays
+        and the confusion matrix is accumulated batch by batch.
+
+        Returns:
+            y_true (np.ndarray): (num_samples,) int32 labels
+            probabilities (np.ndarray): (num_samples, num_classes) float32
+            confusion (np.ndarray): (num_classes, num_classes) int64,
+                rows are true classes, columns predicted classes
+        """
+        num_batches = int(dataset.cardinality())
+        confusion = np.zeros((num_classes, num_classes), dtype=np.int64)
+
+        y_true = probabilities = None
+        count = 0
+
+        for images, labels in dataset:
+            batch_probs = np.asarray(predict_fn(images), dtype=np.float32)
+            batch_labels = np.asarray(labels, dtype=np.int32)
+            n = len(batch_labels)
+
+            if y_true is None:
+                capacity = n * num_batches if num_batches > 0 else n
+                y_true = np.empty(capacity, dtype=np.int32)
+                probabilities = np.empty((capacity, num_classes), dtype=np.float32)
+
+            if count + n > len(y_true):
+                capacity = max(2 * len(y_true), count + n)
+                y_true = np.resize(y_true, capacity)
+                probabilities = np.resize(probabilities, (capacity, num_classes))
+
+            y_true[count:count + n] = batch_labels
+            probabilities[count:count + n] = batch_probs
+            count += n
+
+            batch_pred = batch_probs.argmax(axis=1)
+            confusion += np.bincount(
+                batch_labels * num_classes + batch_pred,
+                minlength=num_classes * num_classes
+            ).reshape(num_classes, num_classes)
+
+        if y_true is None:
+            raise ValueError("Evaluation dataset is empty")
+
+        return y_true[:count], probabilities[:count], confusion
+
+    @staticmethod
+    def _report_from_confusion(
+        confusion: np.ndarray,
+        class_names: list[str]
+    ) -> dict:
+        """
+        Builds a classification report from a confusion matrix.
+
+        The layout matches `sklearn.metrics.classification_report`
+        with `output_dict=True` (undefined ratios are reported as 0).
+        """
+        true_positives = np.diag(confusion).astype(np.float64)
+        support = confusion.sum(axis=1)
+        predicted = confusion.sum(axis=0)
+
+        precision = np.divide(
+            true_positives, predicted,
+            out=np.zeros_like(true_positives), where=predicted > 0
+        )
+        recall = np.divide(
+            true_positives, support,
+            out=np.zeros_like(true_positives), where=support > 0
+        )
+        denom = precision + recall
+        f1 = np.divide(
+            2 * precision * recall, denom,
+            out=np.zeros_like(true_positives), where=denom > 0
+        )
+
+        total = int(support.sum())
+        report = {}
+
+        for i, name in enumerate(class_names):
+            report[name] = {
+                "precision": precision[i],
+                "recall": recall[i],
+                "f1-score": f1[i],
+                "support": int(support[i])
+            }
+
+        report["accuracy"] = true_positives.sum() / total if total else 0.0
+
+        report["macro avg"] = {
+            "precision": precision.mean(),
+            "recall": recall.mean(),
+            "f1-score": f1.mean(),
+            "support": total
+        }
+
+        weights = support / total if total else np.zeros_like(true_positives)
+        report["weighted avg"] = {
+            "precision": float(np.dot(precision, weights)),
+            "recall": float(np.dot(recall, weights)),
+            "f1-score": float(np.dot(f1, weights)),
+            "support": total
+        }
+
+        return report
+
     def plot_training_curves(
         self,
         model_artifact: ModelTrainerArtifact,
         run_id: str
     ) -> Path:
 
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
         plots_dir = Path(ARTIFACTS_DIR) / "plots"
         plots_dir.mkdir(parents=True, exist_ok=True)
 
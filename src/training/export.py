@@ -0,0 +1,167 @@
+import json
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+
+from src.data.image_index import ImageIndex
+from src.data.image_decoding import decode_resized
+from src.training.evaluation import ModelEvaluator
+from src.inference.predictor import make_predict_fn
+from src.inference.tflite_model import TFLiteModel
+from src.utilities.utils import load_config, get_logger
+from src.entity.model_trainer_entity import ModelTrainerArtifact
+from src.entity.data_ingestion_entity import DataIngestionArtifact
+from src.constants.paths import MODEL_PARAMS_FILE, EXPORT_DIR
+from src.constants.config_keys import DATA_CONFIG, EXPORT
+
+logger = get_logger(__name__)
+
+
+class ModelExporter:
+    """
+    Exports a trained Keras model to TFLite for CPU serving.
+
+    Variants:
+    - int8: post-training integer quantization, calibrated on a sample
+      of the training images decoded and normalized as at serving time,
+      without augmentation (float32 input/output are kept)
+    - float16: float16 weight quantization
+
+    Each variant is evaluated on the test set with the `ModelEvaluator`
+    metrics and compared against the float Keras model.
+    """
+
+    def __init__(self):
+        """
+        Configuration keys used:
+        - export.enabled
+        - export.int8
+        - export.float16
+        - export.calibration_samples
+        - export.output_dir
+        """
+        self.config = load_config(MODEL_PARAMS_FILE)
+        export_cfg = self.config.get(EXPORT, {})
+        data_cfg = self.config[DATA_CONFIG]
+
+        self.enabled = export_cfg.get("enabled", False)
+        self.int8 = export_cfg.get("int8", True)
+        self.float16 = export_cfg.get("float16", True)
+        self.calibration_samples = export_cfg.get("calibration_samples", 200)
+        self.output_dir = Path(export_cfg.get("output_dir", EXPORT_DIR))
+
+        self.TRAIN_DIR = data_cfg["TRAIN_DIR"]
+        self.IMG_SIZE = tuple(data_cfg["IMG_SIZE"])
+        self.scaled_decode = data_cfg.get("scaled_jpeg_decode", True)
+        self.SEED = data_cfg["SEED"]
+
+    def export(
+        self,
+        data_artifact: DataIngestionArtifact,
+        model_artifact: ModelTrainerArtifact,
+        run_id: str
+    ) -> Path:
+        """
+        Writes the TFLite variants and an accuracy comparison report.
+
+        Returns:
+            Path to `export_report_<run_id>.json`.
+        """
+        logger.info("Model export started")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        evaluator = ModelEvaluator()
+        class_names = data_artifact.class_names
+
+        baseline = evaluator.compute_report(
+            make_predict_fn(model_artifact.model),
+            data_artifact.test_ds,
+            class_names
+        )
+        summary = {"keras": self._summarize(baseline, model_artifact.model_path)}
+
+        variants = []
+        if self.int8:
+            variants.append(("int8", self._convert_int8))
+        if self.float16:
+            variants.append(("float16", self._convert_float16))
+
+        for name, convert in variants:
+            tflite_path = self.output_dir / f"{run_id}_{name}.tflite"
+            tflite_path.write_bytes(convert(model_artifact.model, class_names))
+            logger.info(f"{name} TFLite model saved at {tflite_path}")
+
+            report = evaluator.compute_report(
+                make_predict_fn(TFLiteModel(tflite_path)),
+                data_artifact.test_ds,
+                class_names
+            )
+            summary[name] = self._summarize(report, tflite_path)
+            summary[name]["accuracy_delta"] = (
+                summary[name]["accuracy"] - summary["keras"]["accuracy"]
+            )
+            logger.info(
+                f"{name}: accuracy {summary[name]['accuracy']:.4f} "
+                f"(delta {summary[name]['accuracy_delta']:+.4f})"
+            )
+
+        report_path = self.output_dir / f"export_report_{run_id}.json"
+        with open(report_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Export report saved at {report_path}")
+
+        return report_path
+
+    def _convert_int8(self, model, class_names: list[str]) -> bytes:
+        samples = self._calibration_dataset(class_names)
+
+        def representative_dataset():
+            for images in samples:
+                yield [images]
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        return converter.convert()
+
+    def _calibration_dataset(self, class_names: list[str]) -> tf.data.Dataset:
+        """
+        `calibration_samples` training images (a seeded random sample
+        across classes), decoded and normalized like the served images.
+        The processed training set is not used: it is augmented, and
+        quantization ranges have to match un-augmented inputs.
+        """
+        index = ImageIndex.from_directory(self.TRAIN_DIR, class_names)
+        if len(index) == 0:
+            raise ValueError(f"No calibration images found in {self.TRAIN_DIR}")
+
+        rng = np.random.default_rng(self.SEED)
+        picked = rng.permutation(len(index))[:self.calibration_samples]
+        paths = [index.paths[i] for i in sorted(picked)]
+
+        def load(path):
+            img = decode_resized(tf.io.read_file(path), self.IMG_SIZE, self.scaled_decode)
+            return img / 255.0
+
+        return tf.data.Dataset.from_tensor_slices(paths).map(load).batch(1)
+
+    @staticmethod
+    def _convert_float16(model, class_names: list[str]) -> bytes:
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+        return converter.convert()
+
+    @staticmethod
+    def _summarize(report: dict, model_path) -> dict:
+        return {
+            "model_path": str(model_path),
+            "size_mb": (
+                Path(model_path).stat().st_size / 1024 ** 2
+                if model_path and Path(model_path).exists() else None
+            ),
+            "accuracy": float(report["accuracy"]),
+            "macro_f1": float(report["macro avg"]["f1-score"]),
+        }
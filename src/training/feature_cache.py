@@ -0,0 +1,296 @@
+import json
+import shutil
+import hashlib
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from src.data.image_index import ImageIndex
+from src.data.image_decoding import decode_resized, decoder_id
+from src.data.data_preprocessing import DataPreprocessing
+from src.models.vgg16_model import VGG16Model
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE, FEATURE_CACHE_DIR, FILE_HASHES_NAME
+from src.constants.config_keys import DATA_CONFIG, TRANSFER_LEARNING, AUGMENTATION
+
+logger = get_logger(__name__)
+
+
+class FeatureCache:
+    """
+    Disk cache of pooled VGG16 backbone features.
+
+    With a frozen backbone the pooled features of an image never change,
+    so they are computed once and stored as memory-mapped `.npy` files.
+    Training then only runs the classification head.
+
+    Cache entries are keyed by:
+    - content hash of every image (and its label)
+    - IMG_SIZE and the decoding path
+    - backbone weights and output shape
+    - mixed-precision policy the features are computed under
+    - number of augmented views (and the augmentation config)
+
+    Layout:
+        cache_dir/<key>/
+            features.npy   (views, num_images, feature_dim) float32
+            labels.npy     (num_images,) int32
+            meta.json
+    """
+
+    def __init__(self):
+        """
+        Configuration keys used:
+        - transfer_learning.feature_cache.enabled
+        - transfer_learning.feature_cache.cache_dir
+        - transfer_learning.feature_cache.augmented_views
+        """
+        self.config = load_config(MODEL_PARAMS_FILE)
+        data_cfg = self.config[DATA_CONFIG]
+        cache_cfg = self.config.get(TRANSFER_LEARNING, {}).get("feature_cache", {})
+        self.aug_config = self.config.get(AUGMENTATION, {})
+
+        self.enabled = cache_cfg.get("enabled", False)
+        self.cache_dir = Path(cache_cfg.get("cache_dir", FEATURE_CACHE_DIR))
+        self.augmented_views = int(cache_cfg.get("augmented_views", 0))
+
+        self.TRAIN_DIR = data_cfg["TRAIN_DIR"]
+        self.TEST_DIR = data_cfg["TEST_DIR"]
+        self.IMG_SIZE = tuple(data_cfg["IMG_SIZE"])
+        self.scaled_decode = data_cfg.get("scaled_jpeg_decode", True)
+        self.BATCH_SIZE = data_cfg["BATCH_SIZE"]
+        self.SEED = data_cfg["SEED"]
+
+    def applies_to(self, model) -> bool:
+        """
+        True when the feature cache can be used to train `model`.
+        """
+        return (
+            self.enabled
+            and isinstance(model, VGG16Model)
+            and model.backbone_is_frozen()
+        )
+
+    def build_datasets(
+        self,
+        model: VGG16Model,
+        class_names: list[str]
+    ) -> tuple[tf.data.Dataset, tf.data.Dataset]:
+        """
+        Returns (train_ds, test_ds) of (pooled_features, label) batches,
+        computing and caching backbone features where needed.
+
+        Augmentation:
+        - augmented_views == 0: augmentation is disabled
+        - augmented_views == N: the clean view plus N augmented views are
+          cached, and every epoch samples one view per image
+        """
+        train_views = 0
+        if self.aug_config.get("enabled", False):
+            train_views = self.augmented_views
+            if train_views == 0:
+                logger.warning(
+                    "Augmentation is disabled while training on cached features "
+                    "(set feature_cache.augmented_views > 0 to keep it)"
+                )
+
+        train_features, train_labels = self._load_or_compute(
+            model, self.TRAIN_DIR, class_names, train_views
+        )
+        test_features, test_labels = self._load_or_compute(
+            model, self.TEST_DIR, class_names, 0
+        )
+
+        train_ds = self._to_dataset(train_features, train_labels, shuffle=True)
+        test_ds = self._to_dataset(test_features, test_labels, shuffle=False)
+
+        return train_ds, test_ds
+
+    def _load_or_compute(
+        self,
+        model: VGG16Model,
+        directory: str,
+        class_names: list[str],
+        augmented_views: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+
+        index = ImageIndex.from_directory(directory, class_names)
+        if len(index) == 0:
+            raise ValueError(f"No images found in {directory}")
+
+        key = self._cache_key(model, index, augmented_views)
+        entry_dir = self.cache_dir / key
+
+        if (entry_dir / "meta.json").exists():
+            logger.info(f"Feature cache hit for {directory}: {entry_dir}")
+        else:
+            # concurrent runs (e.g. sweep trials) wait for the one
+            # computing this entry instead of computing it again
+            with self._entry_lock(entry_dir):
+                if (entry_dir / "meta.json").exists():
+                    logger.info(f"Feature cache filled by another run: {entry_dir}")
+                else:
+                    logger.info(f"Feature cache miss for {directory}, computing features")
+                    self._compute(model, index, augmented_views, entry_dir)
+
+        features = np.load(entry_dir / "features.npy", mmap_mode="r")
+        labels = np.load(entry_dir / "labels.npy")
+
+        return features, labels
+
+    @contextmanager
+    def _entry_lock(self, entry_dir: Path):
+        if fcntl is None:
+            yield
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(entry_dir.with_name(entry_dir.name + ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _cache_key(
+        self,
+        model: VGG16Model,
+        index: ImageIndex,
+        augmented_views: int
+    ) -> str:
+        weights_digest = hashlib.sha256()
+        for weights in model.feature_extractor.get_weights():
+            weights_digest.update(np.ascontiguousarray(weights).tobytes())
+
+        key_parts = {
+            "images": index.content_fingerprint(self.cache_dir / FILE_HASHES_NAME),
+            "img_size": list(self.IMG_SIZE),
+            "decoder": decoder_id(self.scaled_decode),
+            "backbone_weights": weights_digest.hexdigest(),
+            "backbone_output": list(model.feature_extractor.output_shape[1:]),
+            # bfloat16 / float16 features differ from float32 ones
+            "precision": tf.keras.mixed_precision.global_policy().name,
+            "augmented_views": augmented_views,
+            "augmentation": self.aug_config if augmented_views else None,
+        }
+
+        return hashlib.sha256(
+            json.dumps(key_parts, sort_keys=True).encode()
+        ).hexdigest()[:32]
+
+    def _compute(
+        self,
+        model: VGG16Model,
+        index: ImageIndex,
+        augmented_views: int,
+        entry_dir: Path
+    ) -> None:
+        num_images = len(index)
+        num_views = 1 + augmented_views
+        feature_dim = model.feature_extractor.output_shape[-1]
+
+        # write to a temporary directory first so an interrupted run
+        # never leaves a half-written entry behind
+        tmp_dir = entry_dir.with_name(entry_dir.name + ".tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        features = np.lib.format.open_memmap(
+            tmp_dir / "features.npy",
+            mode="w+",
+            dtype=np.float32,
+            shape=(num_views, num_images, feature_dim)
+        )
+
+        augmentation = DataPreprocessing().augmentation if augmented_views else None
+        extract = tf.function(
+            lambda x: model.feature_extractor(x, training=False)
+        )
+
+        images_ds = tf.data.Dataset.from_tensor_slices(index.paths).map(
+            self._load_image,
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).batch(self.BATCH_SIZE).prefetch(tf.data.AUTOTUNE)
+
+        for view in range(num_views):
+            offset = 0
+            for images in images_ds:
+                if view > 0:
+                    images = augmentation(images, training=True)
+                batch_features = extract(images).numpy()
+                features[view, offset:offset + len(batch_features)] = batch_features
+                offset += len(batch_features)
+            logger.info(f"Cached backbone features for view {view + 1}/{num_views}")
+
+        features.flush()
+        del features
+
+        np.save(tmp_dir / "labels.npy", np.asarray(index.labels, dtype=np.int32))
+
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump({
+                "num_images": num_images,
+                "num_views": num_views,
+                "feature_dim": int(feature_dim),
+                "img_size": list(self.IMG_SIZE),
+            }, f, indent=2)
+
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        tmp_dir.rename(entry_dir)
+
+        logger.info(f"Feature cache written to {entry_dir}")
+
+    def _load_image(self, path):
+        """
+        Decodes and resizes an image the same way as `DataIngestion`,
+        then normalizes it as `DataPreprocessing` does.
+        """
+        img = decode_resized(tf.io.read_file(path), self.IMG_SIZE, self.scaled_decode)
+        return img / 255.0
+
+    def _to_dataset(
+        self,
+        features: np.ndarray,
+        labels: np.ndarray,
+        shuffle: bool
+    ) -> tf.data.Dataset:
+        """
+        Batches of (features, label). Only the indices live in the
+        dataset; each batch reads its rows from the memory-mapped
+        `features`, so the cache is never loaded into memory as a whole.
+        """
+        num_views, num_images, feature_dim = features.shape
+
+        def gather(views, indices):
+            return np.ascontiguousarray(features[views, indices], dtype=np.float32)
+
+        def lookup(i, y):
+            views = tf.zeros_like(i)
+            if num_views > 1:
+                views = tf.random.uniform(tf.shape(i), 0, num_views, dtype=tf.int32)
+            x = tf.numpy_function(gather, [views, i], tf.float32)
+            x.set_shape((None, feature_dim))
+            return x, y
+
+        ds = tf.data.Dataset.from_tensor_slices(
+            (np.arange(num_images, dtype=np.int32), labels)
+        )
+        if shuffle:
+            ds = ds.shuffle(
+                num_images,
+                seed=self.SEED,
+                reshuffle_each_iteration=True
+            )
+
+        return ds.batch(self.BATCH_SIZE).map(
+            lookup,
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).prefetch(tf.data.AUTOTUNE)
@@ -1,18 +1,36 @@
 import os
 from pathlib import Path
-from src.utilities.utils import load_config, get_logger
+from src.utilities.utils import load_config, get_logger, load_environment
 from src.models.simple_cnn import SimpleCNN
+from src.training.feature_cache import FeatureCache
+from src.training.performance import PerformanceProfile
+from src.training.distributed import DistributedTraining
+from src.training.checkpointing import AsyncCheckpoint, CheckpointStore, resume_fit
+from src.training.distillation import TeacherCache, Distiller
+from src.experiment.asha import SweepTrialCallback
+from src.experiment.mlflow_tracking import AsyncMlflowLogger, MlflowMetricsCallback
+from src.data.data_cache import CacheTimingCallback
+from src.training.profiling_callbacks import (
+    InputPipelineTimingCallback,
+    TFProfilerCallback
+)
 from src.entity.data_ingestion_entity import DataIngestionArtifact
 from src.entity.model_trainer_entity import ModelTrainerArtifact
-from src.constants.paths import MODEL_PARAMS_FILE, MODEL_DIR
-from src.constants.config_keys import MODEL_CONFIG
-from src.constants.training import DEFAULT_INPUT_SHAPE
+from src.constants.paths import MODEL_PARAMS_FILE, MODEL_DIR, CHECKPOINT_DIR, PROFILING_DIR
+from src.constants.config_keys import (
+    MODEL_CONFIG,
+    OPTIMIZER_CONFIG,
+    CHECKPOINTING,
+    DISTILLATION,
+    PREPROCESSING,
+    PROFILING,
+    SWEEP_TRIAL,
+    TRACKING
+)
+from src.constants.training import DEFAULT_INPUT_SHAPE, MLFLOW_EXPERIMENT_NAME
 
-import mlflow
-import mlflow.tensorflow
-mlflow.set_experiment("brain_tumor_classification")
-
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+import tensorflow as tf
+from tensorflow.keras.callbacks import EarlyStopping
 
 logger = get_logger(__name__)
 
@@ -31,88 +49,261 @@ class ModelTrainer:
 
         logger.info("Starting model training")
 
+        # mlflow is only needed (and the tracking server only contacted)
+        # once training actually starts
+        import mlflow
+
+        load_environment()
+        experiment = mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+        tracking_cfg = self.config.get(TRACKING, {})
+
         model_cfg = self.config[MODEL_CONFIG]
 
         run_id = os.getenv("RUN_ID")
         if not run_id:
             raise EnvironmentError("RUN_ID not found")
-        
-        mlflow.start_run(run_name=run_id)
 
-        callbacks, best_model_path = self._get_callbacks(run_id)
+        # only the chief worker of a multi-worker run reports to MLflow
+        distributed = DistributedTraining()
+        is_chief = distributed.is_chief
+
+        # sweep trials are logged as child runs of the sweep
+        sweep_trial = self.config.get(SWEEP_TRIAL)
+        tags = None
+        if sweep_trial and sweep_trial.get("parent_run_id"):
+            tags = {"mlflow.parentRunId": sweep_trial["parent_run_id"]}
+
+        # metrics, params and the model are sent from a background thread
+        tracker = None
+        if is_chief:
+            tracker = AsyncMlflowLogger.start_run(
+                experiment.experiment_id,
+                run_name=run_id,
+                tags=tags,
+                flush_interval_s=tracking_cfg.get("flush_interval_s", 5.0)
+            )
+
+        # precision policy must be set before any layer is built
+        performance = PerformanceProfile()
+        performance.apply()
 
         model_type = self.config.get("model_type", "simple_cnn")
 
+        # distillation trains the (small) student under a trained teacher
+        distill_cfg = self.config.get(DISTILLATION, {})
+        distill = distill_cfg.get("enabled", False)
+        teacher_cache = teacher_path = None
+        if distill:
+            model_type = distill_cfg.get("student", "simple_cnn")
+            teacher_cache = TeacherCache()
+            teacher_path = teacher_cache.resolve_teacher()
+            logger.info(f"Distilling {teacher_path} into a {model_type} student")
+
         if model_type == "vgg16":
             from src.models.vgg16_model import VGG16Model
             model = VGG16Model()
         else:
             model = SimpleCNN()
 
-        model.build(
-            input_shape=DEFAULT_INPUT_SHAPE,
-            num_classes=data_artifact.num_classes
-        )
+        batch_size = self.config["data_config"]["BATCH_SIZE"]
 
-        # model parameters
-        mlflow.log_params({
+        params = {
+            # model parameters
             "optimizer": model_cfg["optimizer"],
             "loss": model_cfg["loss"],
-            "epochs": model_cfg["epochs"]
-        })
+            "epochs": model_cfg["epochs"],
+            # data parameters
+            "batch_size": batch_size,
+            "img_size": self.config["data_config"]["IMG_SIZE"],
+            # performance parameters
+            "performance_profile": performance.name,
+            "jit_compile": performance.settings["jit_compile"],
+            "steps_per_execution": performance.settings["steps_per_execution"],
+            # distribution parameters
+            "num_workers": distributed.num_workers,
+            "global_batch_size": distributed.global_batch_size(batch_size),
+            **self.config.get(OPTIMIZER_CONFIG, {})
+        }
+        if sweep_trial:
+            params.update(sweep_trial.get("params", {}))
+        if distill:
+            params.update({
+                "model_type": model_type,
+                "teacher": str(teacher_path),
+                "distill_temperature": distill_cfg.get("temperature", 4.0),
+                "distill_alpha": distill_cfg.get("alpha", 0.9),
+            })
 
-        # data parameters
-        mlflow.log_params({
-            "batch_size": self.config["data_config"]["BATCH_SIZE"],
-            "img_size": self.config["data_config"]["IMG_SIZE"]
-        })
+        train_ds, val_ds = data_artifact.train_ds, data_artifact.test_ds
 
-
-        model.compile(
-            optimizer=model_cfg["optimizer"],
-            loss=model_cfg["loss"],
-            metrics=model_cfg["metrics"]
+        # frozen backbone: train only the head on cached pooled features
+        # (single worker only, workers on one host would race filling the cache)
+        feature_cache = FeatureCache()
+        use_feature_cache = (
+            feature_cache.applies_to(model) and not distributed.enabled and not distill
         )
 
-        history = model.fit(
-            data_artifact.train_ds,
-            validation_data=data_artifact.test_ds,
-            epochs=model_cfg["epochs"],
-            callbacks=callbacks
-        )
+        # variables have to be created under the strategy to be mirrored
+        with distributed.strategy.scope():
+            model.build(
+                input_shape=DEFAULT_INPUT_SHAPE,
+                num_classes=data_artifact.num_classes
+            )
 
-        for epoch, (acc, val_acc, loss, val_loss) in enumerate(
-            zip(
-                history.history["accuracy"],
-                history.history["val_accuracy"],
-                history.history["loss"],
-                history.history["val_loss"]
+            model.compile(
+                optimizer=self._build_optimizer(),
+                loss=model_cfg["loss"],
+                metrics=model_cfg["metrics"],
+                **performance.compile_kwargs()
             )
-        ):
-            mlflow.log_metrics({
-                "train_accuracy": acc,
-                "val_accuracy": val_acc,
-                "train_loss": loss,
-                "val_loss": val_loss
-            }, step=epoch)
-
-        mlflow.tensorflow.log_model(
-            model=model.model,
-            artifact_path="model"
+            fit_model = model.model
+
+            if distill:
+                fit_model = Distiller(
+                    model.model,
+                    temperature=distill_cfg.get("temperature", 4.0),
+                    alpha=distill_cfg.get("alpha", 0.9)
+                )
+                fit_model.compile(
+                    optimizer=self._build_optimizer(),
+                    **performance.compile_kwargs()
+                )
+
+            if use_feature_cache:
+                fit_model = model.head
+                fit_model.compile(
+                    optimizer=self._build_optimizer(),
+                    loss=model_cfg["loss"],
+                    metrics=model_cfg["metrics"],
+                    **performance.compile_kwargs()
+                )
+
+        if use_feature_cache:
+            logger.info("Training classification head on cached backbone features")
+            train_ds, val_ds = feature_cache.build_datasets(
+                model, data_artifact.class_names
+            )
+
+        if distill:
+            # soft targets need image order, so the train set is read from the index
+            train_ds = teacher_cache.build_train_dataset(
+                teacher_path, data_artifact.class_names
+            )
+
+        train_ds, val_ds = distributed.distribute(train_ds, val_ds, batch_size)
+
+        # iterator wait is measured on the dataset, not from batch callbacks
+        input_timing = InputPipelineTimingCallback()
+        if not distributed.enabled:
+            train_ds = input_timing.wrap(train_ds)
+
+        params["precision"] = performance.settings["effective_precision"]
+        params["feature_cache"] = use_feature_cache
+        if tracker is not None:
+            tracker.log_params(params)
+
+        # the full model is exported even when only the head is trained
+        callbacks, best_model_path = self._get_callbacks(
+            run_id,
+            checkpoint=is_chief,
+            export_model=model.model
         )
+        callbacks += distributed.callbacks()
+        callbacks.append(input_timing)
+        if tracker is not None:
+            callbacks.append(
+                MlflowMetricsCallback(
+                    tracker,
+                    log_every_n_steps=tracking_cfg.get("log_every_n_steps", 0)
+                )
+            )
+        if sweep_trial:
+            callbacks.append(
+                SweepTrialCallback(
+                    sweep_trial,
+                    mlflow_run_id=tracker.run_id if tracker else None
+                )
+            )
 
+        cache_mode = self.config.get(PREPROCESSING, {}).get("cache", {}).get("mode", "off")
+        if cache_mode != "off" and not use_feature_cache:
+            callbacks.append(CacheTimingCallback())
 
-        logger.info(f"Model saved at {best_model_path}")
+        # re-running with the RUN_ID of an interrupted run continues it
+        # (single worker only, every worker would need the same state)
+        store = self._checkpoint_store(run_id)
+        initial_epoch = 0
+        if self.config.get(CHECKPOINTING, {}).get("resume", True) and not distributed.enabled:
+            initial_epoch = store.restore_latest(fit_model)
 
-        mlflow.end_run()
+        try:
+            history = resume_fit(
+                fit_model,
+                store,
+                epochs=model_cfg["epochs"],
+                initial_epoch=initial_epoch,
+                x=train_ds,
+                validation_data=val_ds,
+                callbacks=callbacks
+            )
+        except BaseException:
+            if tracker is not None:
+                tracker.close(status="FAILED")
+            raise
+
+        if initial_epoch >= model_cfg["epochs"] and is_chief:
+            # fit was skipped, so AsyncCheckpoint did not export the best weights
+            best = store.best()
+            if best is not None:
+                fit_model.set_weights(store.load_weights(best))
+            model.model.save(best_model_path)
+
+        if not is_chief:
+            logger.info("Training finished on non-chief worker")
+            return ModelTrainerArtifact(
+                model=model.model,
+                history=history,
+                model_path=str(best_model_path),
+                teacher_model_path=str(teacher_path) if distill else None
+            )
+
+        # uploaded in the background, the run is closed by the pipeline
+        tracker.log_model(model.model, artifact_path="model")
+
+        logger.info(f"Model saved at {best_model_path}")
 
         return ModelTrainerArtifact(
             model=model.model,
             history=history,
-            model_path=str(best_model_path)
+            model_path=str(best_model_path),
+            mlflow_run_id=tracker.run_id,
+            teacher_model_path=str(teacher_path) if distill else None
         )
 
-    def _get_callbacks(self, run_id: str):
+    def _build_optimizer(self):
+        """
+        model_config.optimizer configured with optimizer_config
+        (learning_rate, ...). A new instance per compiled model.
+        """
+        return tf.keras.optimizers.get({
+            "class_name": self.config[MODEL_CONFIG]["optimizer"],
+            "config": dict(self.config.get(OPTIMIZER_CONFIG, {}))
+        })
+
+    def _checkpoint_store(self, run_id: str) -> CheckpointStore:
+        ckpt_cfg = self.config.get(CHECKPOINTING, {})
+        return CheckpointStore(
+            directory=str(Path(ckpt_cfg.get("dir", CHECKPOINT_DIR)) / run_id),
+            monitor=ckpt_cfg.get("monitor", "val_loss"),
+            mode=ckpt_cfg.get("mode", "min")
+        )
+
+    def _get_callbacks(
+        self,
+        run_id: str,
+        checkpoint: bool = True,
+        export_model=None
+    ):
         callbacks = []
 
         cb_cfg = self.config.get("callbacks", {})
@@ -132,13 +323,29 @@ class ModelTrainer:
 
         best_model_path = model_dir / f"{run_id}.keras"
 
-        callbacks.append(
-            ModelCheckpoint(
-                filepath=str(best_model_path),
-                monitor="val_loss",
-                save_best_only=True,
-                save_weights_only=False
+        if checkpoint:
+            ckpt_cfg = self.config.get(CHECKPOINTING, {})
+            callbacks.append(
+                AsyncCheckpoint(
+                    store=self._checkpoint_store(run_id),
+                    export_model=export_model,
+                    export_path=str(best_model_path),
+                    keep_last=ckpt_cfg.get("keep_last", 2),
+                    keep_best=ckpt_cfg.get("keep_best", 1)
+                )
+            )
+
+
+        profiling_cfg = self.config.get(PROFILING, {})
+        tf_profiler_cfg = profiling_cfg.get("tf_profiler", {})
+        if tf_profiler_cfg.get("enabled", False):
+            trace_dir = Path(profiling_cfg.get("output_dir", PROFILING_DIR)) / "traces" / run_id
+            callbacks.append(
+                TFProfilerCallback(
+                    log_dir=str(trace_dir),
+                    start_step=tf_profiler_cfg.get("start_step", 10),
+                    stop_step=tf_profiler_cfg.get("stop_step", 20)
+                )
             )
-        )
 
         return callbacks, best_model_path
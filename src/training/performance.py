@@ -0,0 +1,109 @@
+import os
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE
+from src.constants.config_keys import PERFORMANCE
+
+logger = get_logger(__name__)
+
+DEFAULT_SETTINGS = {
+    "mixed_precision": "float32",
+    "intra_op_threads": 0,
+    "inter_op_threads": 0,
+    "jit_compile": False,
+    "steps_per_execution": 1,
+    "onednn": True,
+}
+
+# (profile name, effective precision) applied in this process;
+# threading can only be configured once
+_applied_profile: tuple[str, str] | None = None
+
+
+class PerformanceProfile:
+    """
+    Config-driven CPU performance settings for training.
+
+    A profile (performance.profiles.<name>) controls:
+    - mixed_precision: "float32", "mixed_bfloat16" or "mixed_float16";
+      bfloat16 falls back to float32 on CPUs without native support
+    - intra_op_threads / inter_op_threads: 0 keeps TensorFlow's default
+    - jit_compile: XLA-compile the train step
+    - steps_per_execution: train steps per `tf.function` call
+    - onednn: enable oneDNN optimized kernels
+
+    `apply()` must run before TensorFlow executes its first op for the
+    threading and oneDNN settings to take effect.
+    """
+
+    def __init__(self):
+        config = load_config(MODEL_PARAMS_FILE)
+        perf_cfg = config.get(PERFORMANCE, {})
+
+        self.name = perf_cfg.get("profile", "default")
+        profiles = perf_cfg.get("profiles", {})
+        if self.name not in profiles and self.name != "default":
+            raise ValueError(
+                f"Unknown performance profile '{self.name}', "
+                f"available: {sorted(profiles)}"
+            )
+
+        self.settings = {**DEFAULT_SETTINGS, **profiles.get(self.name, {})}
+
+    def apply(self) -> None:
+        global _applied_profile
+        if _applied_profile is not None and _applied_profile[0] == self.name:
+            self.settings["effective_precision"] = _applied_profile[1]
+            return
+
+        # read by TensorFlow at import time
+        os.environ.setdefault(
+            "TF_ENABLE_ONEDNN_OPTS", "1" if self.settings["onednn"] else "0"
+        )
+
+        import tensorflow as tf
+
+        intra = self.settings["intra_op_threads"]
+        inter = self.settings["inter_op_threads"]
+        try:
+            if intra:
+                tf.config.threading.set_intra_op_parallelism_threads(intra)
+            if inter:
+                tf.config.threading.set_inter_op_parallelism_threads(inter)
+        except RuntimeError:
+            logger.warning(
+                "TensorFlow runtime already initialized, "
+                "thread settings of the performance profile are ignored"
+            )
+
+        policy = self.settings["mixed_precision"]
+        if policy == "mixed_bfloat16" and not self.cpu_supports_bf16():
+            logger.warning(
+                "CPU has no native bfloat16 support, using float32 instead"
+            )
+            policy = "float32"
+        tf.keras.mixed_precision.set_global_policy(policy)
+        self.settings["effective_precision"] = policy
+        _applied_profile = (self.name, policy)
+
+        logger.info(f"Performance profile '{self.name}' applied: {self.settings}")
+
+    def compile_kwargs(self) -> dict:
+        """
+        Extra keyword arguments for `model.compile`.
+        """
+        return {
+            "jit_compile": self.settings["jit_compile"],
+            "steps_per_execution": self.settings["steps_per_execution"],
+        }
+
+    @staticmethod
+    def cpu_supports_bf16() -> bool:
+        """
+        True on x86 CPUs with AVX512-BF16 or AMX-BF16 (Linux only).
+        """
+        try:
+            with open("/proc/cpuinfo", "r") as f:
+                flags = f.read()
+        except OSError:
+            return False
+        return "avx512_bf16" in flags or "amx_bf16" in flags
@@ -0,0 +1,190 @@
+import time
+import tensorflow as tf
+
+from src.utilities.profiling import get_profiler
+from src.utilities.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class InputPipelineTimingCallback(tf.keras.callbacks.Callback):
+    """
+    Splits the training part of every epoch into input-pipeline wait and
+    step compute time.
+
+    Keras pulls the next batch inside the compiled train function, so the
+    wait is invisible to batch callbacks. `wrap(dataset)` measures it on
+    the iterator instead: a ticker zipped ahead of the dataset stamps when
+    the train step asks for an element, a pass-through map stamps when the
+    element is delivered, and the difference is the time the step was
+    blocked on `tf.data`. Compute is the rest of the time from the start
+    of the epoch to its last train batch (validation is excluded).
+
+    Without `wrap` (e.g. multi-worker runs, where auto-sharding would
+    stamp elements of other workers too) the wait is recorded as None.
+
+    With `steps_per_execution` > 1 Keras reports one batch per execution;
+    the step count is taken from the batch index Keras passes (the last
+    step of the execution), so it counts train steps, not executions.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.measuring = False
+        self._requested = 0.0
+        self._wait = 0.0
+
+    def wrap(self, dataset: tf.data.Dataset) -> tf.data.Dataset:
+        """
+        Returns `dataset` with iterator wait measurement attached.
+        """
+        self.measuring = True
+
+        def request():
+            self._requested = time.perf_counter()
+            return 0
+
+        def deliver():
+            self._wait += time.perf_counter() - self._requested
+            return 0
+
+        # zip pulls the ticker first, then blocks on the dataset
+        ticker = tf.data.Dataset.from_tensors(0).repeat().map(
+            lambda _: tf.py_function(request, [], tf.int32)
+        )
+
+        def delivered(tick, element):
+            with tf.control_dependencies([tick, tf.py_function(deliver, [], tf.int32)]):
+                return tf.nest.map_structure(tf.identity, element)
+
+        return tf.data.Dataset.zip((ticker, dataset)).map(delivered)
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._wait = 0.0
+        self._steps = 0
+        self._start = time.perf_counter()
+        self._train_end = self._start
+
+    def on_train_batch_end(self, batch, logs=None):
+        # `batch` is the epoch-relative index of the last step executed
+        self._steps = batch + 1
+        self._train_end = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        total = self._train_end - self._start
+        wait = self._wait if self.measuring else None
+        compute = total - (wait or 0.0)
+
+        get_profiler().record_epoch(
+            epoch, wait, compute, self._steps,
+            steps_per_execution=steps_per_execution(self.model)
+        )
+
+        if wait is None:
+            logger.info(f"Epoch {epoch + 1}: {total:.2f}s over {self._steps} steps")
+            return
+        share = wait / total if total else 0.0
+        logger.info(
+            f"Epoch {epoch + 1}: input wait {wait:.2f}s ({share:.0%}), "
+            f"compute {compute:.2f}s over {self._steps} steps"
+        )
+
+
+def steps_per_execution(model) -> int:
+    """
+    Train steps per `tf.function` call of a compiled Keras model.
+    """
+    value = getattr(model, "steps_per_execution", None)
+    if value is None:
+        value = getattr(model, "_steps_per_execution", None)
+    if value is None:
+        return 1
+    return int(value.numpy()) if hasattr(value, "numpy") else int(value)
+
+
+class TrainStepCounter:
+    """
+    Train steps completed across epochs, for callbacks that act on
+    global step numbers.
+
+    Taken from the batch index Keras passes (with `steps_per_execution`
+    > 1 only the last step of each execution is reported), so it counts
+    steps, not executions. A resumed run starts counting after the steps
+    of the epochs before its `initial_epoch`.
+    """
+
+    def __init__(self):
+        self.step = 0
+        self._offset = None
+
+    def begin_epoch(self, epoch: int, params: dict) -> None:
+        if self._offset is None:
+            steps_per_epoch = params.get("steps")
+            if epoch and not steps_per_epoch:
+                logger.warning(
+                    f"Steps per epoch unknown, step count restarts at 0 in epoch {epoch + 1}"
+                )
+            self._offset = epoch * (steps_per_epoch or 0)
+        else:
+            self._offset = self.step
+        self.step = self._offset
+
+    def first_step(self, batch: int) -> int:
+        """
+        Global index of the first step of the execution starting at
+        `batch` (the index Keras passes to `on_train_batch_begin`).
+        """
+        return self._offset + batch
+
+    def end_batch(self, batch: int) -> int:
+        """
+        Records the execution ending at `batch`, returns the steps done.
+        """
+        self.step = self._offset + batch + 1
+        return self.step
+
+
+class TFProfilerCallback(tf.keras.callbacks.Callback):
+    """
+    Captures a TensorFlow profiler trace for training steps
+    [start_step, stop_step), counted across epochs (see
+    `TrainStepCounter`). With `steps_per_execution` > 1 the trace covers
+    the whole executions overlapping that window.
+    """
+
+    def __init__(self, log_dir: str, start_step: int, stop_step: int):
+        super().__init__()
+        self.log_dir = log_dir
+        self.start_step = start_step
+        self.stop_step = stop_step
+        self._steps = TrainStepCounter()
+        self._active = False
+        self._done = False
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._steps.begin_epoch(epoch, self.params)
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self._active or self._done:
+            return
+        first = self._steps.first_step(batch)
+        last = first + steps_per_execution(self.model)
+        if first < self.stop_step and last > self.start_step:
+            tf.profiler.experimental.start(self.log_dir)
+            self._active = True
+            logger.info(f"TF profiler started at step {first}")
+
+    def on_train_batch_end(self, batch, logs=None):
+        step = self._steps.end_batch(batch)
+        if self._active and step >= self.stop_step:
+            self._stop()
+
+    def on_train_end(self, logs=None):
+        if self._active:
+            self._stop()
+
+    def _stop(self):
+        tf.profiler.experimental.stop()
+        self._active = False
+        self._done = True
+        logger.info(f"TF profiler trace written to {self.log_dir}")
@@ -0,0 +1,80 @@
+import sys
+import time
+import argparse
+import subprocess
+
+from src.utilities.utils import load_config
+from src.constants.paths import MODEL_PARAMS_FILE
+from src.constants.config_keys import INFERENCE
+
+DEFAULT_ENTRY_POINT = "src.inference.cli"
+
+
+def measure_import(module: str) -> tuple[float, list[tuple[str, float]]]:
+    """
+    Imports `module` in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        wall_ms (float): wall time of the whole interpreter run
+        packages (list): (root package, self import ms), heaviest first
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |   cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        # attribute each module's own time to its root package,
+        # so nested imports are not counted twice
+        top = name.strip().split(".")[0]
+        packages[top] = packages.get(top, 0.0) + int(self_us) / 1000.0
+
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return wall_ms, ranked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.utilities.import_profiler",
+        description="Report import time of an entry point against a startup budget."
+    )
+    parser.add_argument("module", nargs="?", default=DEFAULT_ENTRY_POINT)
+    parser.add_argument(
+        "--budget-ms", type=float,
+        help="default: inference.startup_budget_ms"
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    budget_ms = args.budget_ms
+    if budget_ms is None:
+        budget_ms = load_config(MODEL_PARAMS_FILE).get(INFERENCE, {}).get(
+            "startup_budget_ms", 500
+        )
+
+    wall_ms, packages = measure_import(args.module)
+
+    print(f"Import report for {args.module}")
+    print(f"{'package':<30}{'import ms':>15}")
+    for name, ms in packages[:args.top]:
+        print(f"{name:<30}{ms:>15.1f}")
+    print(f"\nInterpreter wall time: {wall_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    if wall_ms > budget_ms:
+        print("Startup budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,219 @@
 import os
+import json
+import time
+import queue
+import atexit
 import logging
+import threading
+import logging.handlers
 from datetime import datetime
 
-def app_logger(name: str) -> logging.Logger:
+import yaml
+
+from src.constants.paths import GENERAL_CONFIG_FILE
+
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] [%(message)s]"
+
+# process-wide backend, created by the first `app_logger` call
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
     """
-    Creates and returns a logger instance with:
-    - one log file per run
-    - shared RUN_ID across the application
+    One JSON object per line: time, level, logger, message, run_id
+    and the formatted exception, if any.
     """
 
-    # Read RUN_ID from environment (set once by app)
-    run_id = os.getenv("RUN_ID")
-    if not run_id:
-        run_id = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": os.getenv("RUN_ID"),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
-    project_root = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "../..")
-    )
 
-    log_dir = os.path.join(project_root, "logs")
-    os.makedirs(log_dir, exist_ok=True)
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `max_per_interval` records per call site (logger name and
+    line) through every `interval_s` seconds. The next record that passes
+    reports how many were suppressed. Warnings and errors are never limited.
+    """
 
-    log_file = os.path.join(log_dir, f"run_{run_id}.log")
+    def __init__(self, max_per_interval: int = 20, interval_s: float = 10.0):
+        super().__init__()
+        self.max_per_interval = max_per_interval
+        self.interval_s = interval_s
+        # (name, lineno) -> [window start, passed, suppressed]
+        self._windows: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        key = (record.name, record.lineno)
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval_s:
+            suppressed = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+            return True
+
+        if window[1] < self.max_per_interval:
+            window[1] += 1
+            return True
+
+        window[2] += 1
+        return False
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for the writer thread without formatting them, so
+    the calling thread only builds the record. When the queue is full the
+    record is dropped and counted instead of blocking.
+
+    In a forked child (e.g. a process pool worker) there is no writer
+    thread; records are written synchronously there.
+    """
+
+    def __init__(self, log_queue: queue.Queue, handlers: list[logging.Handler]):
+        super().__init__(log_queue)
+        self.handlers = handlers
+        self.dropped = 0
+        self._pid = os.getpid()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if os.getpid() != self._pid:
+            for handler in self.handlers:
+                handler.handle(record)
+            return
+        super().emit(record)
 
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    logger.propagate = False
 
-    if logger.handlers:
-        return logger
-    
-    formatter = logging.Formatter(
-        "[%(asctime)s] [%(levelname)s] [%(name)s] [%(message)s]"
-    )
+class _LoggingBackend:
+    """
+    One queue, one writer thread and one set of output handlers (run log
+    file + console) shared by every logger of the process.
+    """
+
+    def __init__(self):
+        logs_cfg = _logs_config()
+
+        run_id = os.getenv("RUN_ID") or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        project_root = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "../..")
+        )
+        log_dir = os.path.join(project_root, logs_cfg.get("log_dir", "logs"))
+        os.makedirs(log_dir, exist_ok=True)
+
+        log_format = os.getenv("LOG_FORMAT", logs_cfg.get("format", "text"))
+        if log_format == "json":
+            formatter = JsonFormatter()
+            log_file = os.path.join(log_dir, f"run_{run_id}.jsonl")
+        else:
+            formatter = logging.Formatter(TEXT_FORMAT)
+            log_file = os.path.join(log_dir, f"run_{run_id}.log")
+
+        # the file is only opened when the first record is written
+        file_handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+        file_handler.setFormatter(formatter)
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+
+        handlers = [file_handler, console_handler]
+        self.handler = AsyncQueueHandler(
+            queue.Queue(maxsize=logs_cfg.get("max_queue_size", 10000)),
+            handlers
+        )
+
+        rate_cfg = logs_cfg.get("rate_limit", {})
+        if rate_cfg.get("enabled", True):
+            self.handler.addFilter(RateLimitFilter(
+                max_per_interval=rate_cfg.get("max_per_interval", 20),
+                interval_s=rate_cfg.get("interval_s", 10.0)
+            ))
+
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """
+        Writes every queued record and stops the writer thread.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self.listener.stop()
+
+        if self.handler.dropped:
+            record = logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{self.handler.dropped} log records dropped, the log queue was full",
+            })
+            for handler in self.handler.handlers:
+                handler.handle(record)
+
 
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setFormatter(formatter)
+def _logs_config() -> dict:
+    try:
+        with open(GENERAL_CONFIG_FILE, "r") as f:
+            return (yaml.safe_load(f) or {}).get("logs", {}) or {}
+    except OSError:
+        return {}
 
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+def _get_backend() -> _LoggingBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _LoggingBackend()
+        return _backend
 
+
+def shutdown_logging() -> None:
+    """
+    Flushes and stops the writer thread (also done at interpreter exit).
+    """
+    if _backend is not None:
+        _backend.stop()
+
+
+def app_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger writing through the process-wide backend:
+    - one log file per run (`logs/run_<RUN_ID>.log`, `.jsonl` for JSON)
+    - records are queued and written by a single background thread
+    - shared RUN_ID across the application
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
     logger.propagate = False
 
-    return logger
\ No newline at end of file
+    if not logger.handlers:
+        logger.addHandler(_get_backend().handler)
+
+    return logger
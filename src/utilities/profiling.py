@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from src.utilities.utils import load_config, get_logger
+from src.constants.paths import MODEL_PARAMS_FILE, PROFILING_DIR
+from src.constants.config_keys import PROFILING
+
+logger = get_logger(__name__)
+
+
+def peak_rss_mb() -> float | None:
+    """
+    Peak resident set size of this process in MB (None if unknown).
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    divisor = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return rss / divisor
+
+
+class RunProfiler:
+    """
+    Collects timing information for one RUN_ID.
+
+    - stage spans: wall time, CPU time and peak RSS of a pipeline stage
+    - epochs: input-pipeline wait versus compute time per training epoch
+
+    Everything is written as JSON to `profiling.output_dir/profile_<RUN_ID>.json`
+    after every stage, so a crashed run still leaves its timings behind.
+    """
+
+    def __init__(self, run_id: str):
+        config = load_config(MODEL_PARAMS_FILE)
+        profiling_cfg = config.get(PROFILING, {})
+
+        self.run_id = run_id
+        self.output_dir = Path(profiling_cfg.get("output_dir", PROFILING_DIR))
+        self.stages: list[dict] = []
+        self.epochs: list[dict] = []
+        self._stack: list[str] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the enclosed block as a stage span. Spans can be nested;
+        nested names are recorded as "parent/child".
+        """
+        full_name = "/".join(self._stack + [name])
+        self._stack.append(name)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            self._stack.pop()
+            span = {
+                "stage": full_name,
+                "status": status,
+                "wall_s": time.perf_counter() - wall_start,
+                "cpu_s": time.process_time() - cpu_start,
+                "peak_rss_mb": peak_rss_mb(),
+            }
+            self.stages.append(span)
+            logger.info(
+                f"Stage '{full_name}' {status}: wall {span['wall_s']:.2f}s, "
+                f"cpu {span['cpu_s']:.2f}s"
+            )
+            self.write()
+
+    def record_epoch(
+        self,
+        epoch: int,
+        input_wait_s: float | None,
+        compute_s: float,
+        steps: int,
+        steps_per_execution: int = 1
+    ) -> None:
+        self.epochs.append({
+            "epoch": epoch,
+            "steps": steps,
+            "steps_per_execution": steps_per_execution,
+            "input_wait_s": input_wait_s,
+            "compute_s": compute_s,
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "stages": self.stages,
+            "epochs": self.epochs,
+        }
+
+    def write(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"profile_{self.run_id}.json"
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def metrics(self) -> tuple[dict, list[tuple[str, float, int]]]:
+        """
+        Flattened metrics for experiment tracking.
+
+        Returns:
+            stage_metrics (dict): name -> value for every stage span
+            epoch_metrics (list): (name, value, step) per epoch
+        """
+        stage_metrics = {}
+        for span in self.stages:
+            key = span["stage"].replace("/", ".")
+            stage_metrics[f"stage.{key}.wall_s"] = span["wall_s"]
+            stage_metrics[f"stage.{key}.cpu_s"] = span["cpu_s"]
+            if span["peak_rss_mb"] is not None:
+                stage_metrics[f"stage.{key}.peak_rss_mb"] = span["peak_rss_mb"]
+
+        epoch_metrics = []
+        for e in self.epochs:
+            if e["input_wait_s"] is not None:
+                epoch_metrics.append(("epoch.input_wait_s", e["input_wait_s"], e["epoch"]))
+            epoch_metrics.append(("epoch.compute_s", e["compute_s"], e["epoch"]))
+
+        return stage_metrics, epoch_metrics
+
+    def log_to_mlflow(self, mlflow_run_id: str | None) -> None:
+        """
+        Mirrors the collected timings to an existing MLflow run.
+        """
+        if not mlflow_run_id:
+            return
+
+        from mlflow.tracking import MlflowClient
+        from mlflow.entities import Metric
+
+        stage_metrics, epoch_metrics = self.metrics()
+        timestamp = int(time.time() * 1000)
+
+        metrics = [Metric(k, v, timestamp, 0) for k, v in stage_metrics.items()]
+        metrics += [Metric(k, v, timestamp, step) for k, v, step in epoch_metrics]
+
+        if metrics:
+            MlflowClient().log_batch(mlflow_run_id, metrics=metrics)
+
+
+_profiler: RunProfiler | None = None
+
+
+def get_profiler() -> RunProfiler:
+    """
+    Returns the process-wide profiler of the current RUN_ID.
+    """
+    global _profiler
+    run_id = os.getenv("RUN_ID", "unknown")
+    if _profiler is None or _profiler.run_id != run_id:
+        _profiler = RunProfiler(run_id)
+    return _profiler
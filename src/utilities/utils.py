@@ -1,14 +1,16 @@
+import os
+import json
 import yaml
 import subprocess
 from pathlib import Path
-from dotenv import load_dotenv
 from src.utilities.logger import app_logger
 
 from src.constants.paths import GENERAL_CONFIG_FILE
 from src.constants.config_keys import DATA_CONFIG
 
 logger = app_logger(__name__)
-load_dotenv()
+
+_environment_loaded = False
 
 def get_logger(name: str):
     """
@@ -19,7 +21,20 @@ def get_logger(name: str):
     return app_logger(name)
 
 
+def load_environment() -> None:
+    """
+    Loads variables from `.env` (Kaggle / MLflow credentials).
+    Called by entry points rather than at import time.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
 def data_downloader(kaggle_uri: str) -> None:
+    load_environment()
     config = load_config(GENERAL_CONFIG_FILE)
     RAW_DATA_PATH = Path(config[DATA_CONFIG]["raw_data_dir"])
     if not RAW_DATA_PATH.exists():
@@ -57,4 +72,20 @@ def load_config(config_path: str) -> dict:
         config = yaml.safe_load(f)
         logger.info(f"Config loaded from {config_path}")
 
-    return config
\ No newline at end of file
+    return config
+
+def worker_task() -> tuple[str, int, int]:
+    """
+    Role of this process in a `tf.distribute` cluster, read from TF_CONFIG.
+
+    Returns:
+        task_type (str): "chief" or "worker" ("worker" when not distributed)
+        task_index (int): index within task_type
+        num_workers (int): chief + workers, 1 when TF_CONFIG is not set
+    """
+    tf_config = json.loads(os.getenv("TF_CONFIG") or "{}")
+    cluster = tf_config.get("cluster", {})
+    task = tf_config.get("task", {})
+
+    num_workers = len(cluster.get("chief", [])) + len(cluster.get("worker", []))
+    return task.get("type", "worker"), int(task.get("index", 0)), max(num_workers, 1)
@@ -0,0 +1,56 @@
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from src.training.checkpointing import CheckpointStore, optimizer_variables, resume_fit
+
+
+def _model():
+    model = tf.keras.Sequential([tf.keras.Input((2,)), tf.keras.layers.Dense(1)])
+    model.compile(optimizer="adam", loss="mse")
+    model.optimizer.build(model.trainable_variables)
+    return model
+
+
+def _write_epochs(store, model, epochs):
+    for epoch in range(epochs):
+        store.write(
+            epoch,
+            value=1.0 / (epoch + 1),
+            weights=model.get_weights(),
+            optimizer_state=[v.numpy() for v in optimizer_variables(model.optimizer)],
+            logs={"loss": 1.0 / (epoch + 1), "val_loss": 2.0 / (epoch + 1)}
+        )
+
+
+def test_resume_of_completed_run_returns_recorded_history(tmp_path):
+    model = _model()
+    store = CheckpointStore(str(tmp_path))
+    _write_epochs(store, model, epochs=3)
+
+    initial_epoch = store.restore_latest(model)
+    assert initial_epoch == 3
+
+    # no data is passed: fitting a completed run again would fail
+    history = resume_fit(model, store, epochs=3, initial_epoch=initial_epoch)
+
+    assert history.epoch == [0, 1, 2]
+    assert history.history["loss"] == pytest.approx([1.0, 0.5, 1.0 / 3])
+    assert history.history["val_loss"] == pytest.approx([2.0, 1.0, 2.0 / 3])
+
+
+def test_resume_merges_earlier_epochs(tmp_path):
+    model = _model()
+    store = CheckpointStore(str(tmp_path))
+    _write_epochs(store, model, epochs=2)
+
+    initial_epoch = store.restore_latest(model)
+    x = tf.zeros((4, 2))
+    y = tf.zeros((4, 1))
+    history = resume_fit(
+        model, store, epochs=3, initial_epoch=initial_epoch, x=x, y=y, verbose=0
+    )
+
+    assert history.epoch == [0, 1, 2]
+    assert len(history.history["loss"]) == 3
+    assert history.history["loss"][:2] == pytest.approx([1.0, 0.5])